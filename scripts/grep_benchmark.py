@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Python grep backend benchmark
+
+Builds a synthetic source tree and measures the Python search fallback with
+the thread backend and with the process-pool backend at 1..N workers, to show
+how the process backend scales past the GIL.
+
+Usage:
+    python scripts/grep_benchmark.py [--files N] [--max-workers N] [--pattern P] [--keep DIR]
+
+Examples:
+    # Default: 50k files, 1..cpu_count workers
+    python scripts/grep_benchmark.py
+
+    # Smaller tree, regex pattern
+    python scripts/grep_benchmark.py --files 5000 --pattern "def \\w+_handler" --regex
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from tunacode.tools.grep import SHARDS_PER_WORKER  # noqa: E402
+from tunacode.utils.byte_search import BytePattern, scan_file, scan_shard  # noqa: E402
+from tunacode.utils.byte_search import shard_by_size  # noqa: E402
+
+WORDS = "alpha beta gamma delta state manager agent request config tool result cache".split()
+
+
+def build_tree(root: Path, files: int, seed: int = 0) -> int:
+    """Write ``files`` synthetic Python modules; returns total bytes."""
+    rng = random.Random(seed)
+    total = 0
+    per_dir = 500
+    for i in range(files):
+        directory = root / f"pkg{i // per_dir:03d}"
+        if i % per_dir == 0:
+            directory.mkdir(parents=True, exist_ok=True)
+        lines = []
+        for j in range(rng.randint(20, 120)):
+            name = "_".join(rng.choices(WORDS, k=2))
+            lines.append(f"def {name}_{j}(value):\n    return value + {rng.randint(0, 999)}\n")
+        if i % 97 == 0:
+            lines.append("def request_handler(event):\n    return dispatch(event)\n")
+        text = "".join(lines)
+        (directory / f"module_{i}.py").write_text(text)
+        total += len(text)
+    return total
+
+
+def collect(root: Path):
+    sized = []
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            sized.append((path, os.path.getsize(path)))
+    return sized
+
+
+def run_threads(sized, pattern, use_regex, max_hits, workers=8) -> int:
+    compiled = BytePattern(pattern, use_regex)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return sum(
+            len(hits)
+            for hits in pool.map(lambda item: scan_file(item[0], compiled, max_hits), sized)
+        )
+
+
+def run_processes(sized, pattern, use_regex, max_hits, workers) -> int:
+    shards = shard_by_size(sized, workers * SHARDS_PER_WORKER)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(scan_shard, shard, pattern, use_regex, False, max_hits) for shard in shards
+        ]
+        return sum(len(future.result()) for future in futures)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Python grep backends")
+    parser.add_argument("--files", type=int, default=50_000, help="Number of synthetic files")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--pattern", default="request_handler")
+    parser.add_argument("--regex", action="store_true", help="Treat the pattern as a regex")
+    parser.add_argument("--max-hits", type=int, default=50, help="Hits kept per file")
+    parser.add_argument("--keep", help="Build (or reuse) the tree in this directory")
+    args = parser.parse_args()
+
+    root = Path(args.keep) if args.keep else Path(tempfile.mkdtemp(prefix="grep-bench-"))
+    try:
+        root.mkdir(parents=True, exist_ok=True)
+        if not any(root.iterdir()):
+            print(f"Building {args.files:,} files in {root} ...")
+            elapsed, total = timed(build_tree, root, args.files)
+            print(f"  {total / 1024 / 1024:.1f} MB in {elapsed:.1f}s")
+        sized = collect(root)
+        total_mb = sum(size for _, size in sized) / 1024 / 1024
+        print(f"Searching {len(sized):,} files ({total_mb:.1f} MB) for {args.pattern!r}")
+        print("-" * 60)
+
+        # Warm the page cache so every run reads from memory
+        run_threads(sized, args.pattern, args.regex, args.max_hits)
+
+        baseline, hits = timed(run_threads, sized, args.pattern, args.regex, args.max_hits)
+        print(f"{'threads (8)':<16} {baseline:8.2f}s  {hits:6d} hits")
+
+        for workers in range(1, args.max_workers + 1):
+            elapsed, hits = timed(
+                run_processes, sized, args.pattern, args.regex, args.max_hits, workers
+            )
+            speedup = baseline / elapsed if elapsed else 0.0
+            print(
+                f"{f'processes ({workers})':<16} {elapsed:8.2f}s  {hits:6d} hits  "
+                f"{speedup:5.2f}x vs threads"
+            )
+    finally:
+        if not args.keep:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -137,6 +137,73 @@ class DumpCommand(SimpleCommand):
         await ui.dump_messages(context.state_manager.session.messages)
 
 
+class StatsCommand(SimpleCommand):
+    """Show latency, token and cost telemetry for the session."""
+
+    def __init__(self):
+        super().__init__(
+            CommandSpec(
+                name="stats",
+                aliases=["/stats"],
+                description="Show timing, token usage and cost for this session",
+                category=CommandCategory.DEBUG,
+            )
+        )
+
+    async def execute(self, args: List[str], context: CommandContext) -> None:
+        from tunacode.core.llm.providers import get_pool_stats
+        from tunacode.core.telemetry import TELEMETRY_FILE
+        from tunacode.utils.file_cache import FILE_CACHE
+        from tunacode.utils.system import get_session_dir
+        from tunacode.utils.token_counter import format_token_count
+
+        session = context.state_manager.session
+        summary = session.telemetry.summary()
+        if not summary["requests"]:
+            await ui.muted("No requests recorded yet")
+            return
+
+        lines = [
+            f"Requests: {summary['requests']} ({summary['model_calls']} model calls)",
+            f"Wall time: {summary['wall_time']:.2f}s "
+            f"(model {summary['model_time']:.2f}s, tools {summary['tool_time']:.2f}s)",
+            f"Tokens: {format_token_count(summary['input_tokens'])} in "
+            f"({format_token_count(summary['cached_tokens'])} cached), "
+            f"{format_token_count(summary['output_tokens'])} out",
+            f"Cost: ${summary['cost']:.4f} (session total ${session.total_cost:.4f})",
+        ]
+        if summary["tools"]:
+            lines.append("")
+            lines.append("Tools:")
+            by_time = sorted(summary["tools"].items(), key=lambda item: -item[1]["total"])
+            for name, stats in by_time:
+                avg = stats["total"] / stats["calls"]
+                errors = f", {stats['errors']} failed" if stats["errors"] else ""
+                lines.append(
+                    f"  {name}: {stats['calls']} calls, {stats['total']:.2f}s total, "
+                    f"{avg:.2f}s avg{errors}"
+                )
+        cache = FILE_CACHE.get_stats()
+        lookups = cache["hits"] + cache["misses"]
+        if lookups:
+            lines.append("")
+            lines.append(
+                f"File cache: {cache['hits']}/{lookups} hits, {cache['entries']} files "
+                f"({cache['bytes'] / 1024:.0f} KB)"
+            )
+        pool = get_pool_stats()
+        if pool["requests"]:
+            lines.append(
+                f"HTTP pool: {pool['requests']} requests, {pool['connections']} connections "
+                f"({pool['idle_connections']} idle), HTTP/2 {'on' if pool['http2'] else 'off'}, "
+                f"{pool['models_cached']} models cached"
+            )
+        lines.append("")
+        lines.append(f"Log: {get_session_dir(context.state_manager) / TELEMETRY_FILE}")
+
+        await ui.panel("Session Stats", "\n".join(lines), border_style="cyan")
+
+
 class ThoughtsCommand(SimpleCommand):
     """Toggle display of agent thoughts."""
 
@@ -361,6 +428,7 @@ class RefreshConfigCommand(SimpleCommand):
 
     async def execute(self, args: List[str], context: CommandContext) -> None:
         from tunacode.configuration.defaults import DEFAULT_USER_CONFIG
+        from tunacode.core.agents.agent_pool import AGENT_POOL
 
         # Update current session config with latest defaults
         for key, value in DEFAULT_USER_CONFIG.items():
@@ -372,6 +440,9 @@ class RefreshConfigCommand(SimpleCommand):
                     if subkey not in context.state_manager.session.user_config[key]:
                         context.state_manager.session.user_config[key][subkey] = subvalue
 
+        # Pooled sub-agents were built from the old configuration
+        AGENT_POOL.invalidate()
+
         # Show updated max_iterations
         max_iterations = context.state_manager.session.user_config.get("settings", {}).get(
             "max_iterations", 20
@@ -380,59 +451,48 @@ class RefreshConfigCommand(SimpleCommand):
 
 
 class TunaCodeCommand(SimpleCommand):
-    """Use BM25 to inspect the codebase and read relevant files."""
+    """Use BM25 to find the code chunks most relevant to a query."""
 
     def __init__(self):
         super().__init__(
             CommandSpec(
                 name="tunaCode",
                 aliases=["/tunaCode"],
-                description="Scan repo with BM25 and display key files",
+                description="Search the repo with BM25 and show matching code",
                 category=CommandCategory.DEVELOPMENT,
             )
         )
 
     async def execute(self, args: List[str], context: CommandContext) -> None:
-        from pathlib import Path
+        import asyncio
 
         from tunacode.constants import UI_COLORS
         from tunacode.utils.file_utils import DotDict
 
-        from ..tools.read_file import read_file
-        from ..utils.bm25 import BM25, tokenize
+        from ..core.retrieval import get_code_retriever
         from ..utils.text_utils import ext_to_lang
 
         colors = DotDict(UI_COLORS)
 
         query = " ".join(args) if args else "overview"
-        await ui.info("Building BM25 index of repository")
-
-        docs: List[str] = []
-        paths: List[Path] = []
-        exts = {".py", ".js", ".ts", ".java", ".c", ".cpp", ".md", ".txt"}
-        for path in Path(".").rglob("*"):
-            if path.is_file() and path.suffix in exts:
-                try:
-                    docs.append(path.read_text(encoding="utf-8"))
-                    paths.append(path)
-                except Exception:
-                    continue
-
-        if not docs:
-            await ui.error("No files found to index")
-            return
+        retriever = get_code_retriever()
+        # Index is cached on disk; only changed files are re-chunked
+        snippets = await asyncio.get_event_loop().run_in_executor(
+            None, retriever.search, query, 5
+        )
 
-        bm25 = BM25(docs)
-        scores = bm25.get_scores(tokenize(query))
-        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[:5]
+        if not snippets:
+            await ui.error("No matching code found")
+            return
 
-        for idx in ranked:
-            file_path = paths[idx]
-            content = await read_file(str(file_path))
-            lang = ext_to_lang(str(file_path))
+        for snippet in snippets:
+            lang = ext_to_lang(snippet.path)
+            title = f"{snippet.path}:{snippet.start_line}-{snippet.end_line}"
+            if snippet.name:
+                title += f" ({snippet.name})"
             await ui.panel(
-                str(file_path),
-                f"```{lang}\n{content}\n```",
+                title,
+                f"```{lang}\n{snippet.text}\n```",
                 border_style=colors.muted,
             )
 
@@ -599,12 +659,20 @@ class CompactCommand(SimpleCommand):
 
         await panels.panel("Conversation Summary", summary_text, border_style="cyan")
 
+        # Replace everything before the last complete exchange with the summary,
+        # splitting only where no tool call is separated from its return
+        from tunacode.core.agents.compaction import (build_compacted_history,
+                                                     find_compaction_split)
+
+        original_messages = context.state_manager.session.messages[:original_count]
+        split = find_compaction_split(original_messages, keep_tokens=0)
+        head = original_messages[:split] if split else original_messages
+        compacted = build_compacted_history(head, original_messages[len(head) :], summary_text)
+        context.state_manager.session.messages = compacted
+
         # Show statistics
         await ui.info(f"Current message count: {original_count}")
-        await ui.info("After compaction: 3 (summary + last 2 messages)")
-
-        # Truncate the conversation history
-        context.state_manager.session.messages = context.state_manager.session.messages[-2:]
+        await ui.info(f"After compaction: {len(compacted)} (summary + last exchange)")
 
         await ui.success("Context history has been summarized and truncated.")
 
@@ -832,6 +900,7 @@ class CommandRegistry:
         command_classes = [
             YoloCommand,
             DumpCommand,
+            StatsCommand,
             ThoughtsCommand,
             ArchitectCommand,
             IterationsCommand,
@@ -842,7 +911,7 @@ class CommandRegistry:
             UpdateCommand,
             HelpCommand,
             BranchCommand,
-            # TunaCodeCommand,  # TODO: Temporarily disabled
+            TunaCodeCommand,
             CompactCommand,
             ModelCommand,
         ]
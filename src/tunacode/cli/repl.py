@@ -19,7 +19,9 @@ from tunacode.configuration.settings import ApplicationSettings
 from tunacode.core.agents import main as agent
 from tunacode.core.agents.adaptive_orchestrator import AdaptiveOrchestrator
 from tunacode.core.agents.main import patch_tool_messages
+from tunacode.core.llm.providers import close_http_client
 from tunacode.core.tool_handler import ToolHandler
+from tunacode.core.watcher import start_file_watcher
 from tunacode.exceptions import AgentError, UserAbortError, ValidationError
 from tunacode.ui import console as ui
 from tunacode.ui.tool_ui import ToolUI
@@ -97,6 +99,10 @@ async def _tool_handler(part, node, state_manager: StateManager):
         tool_handler = ToolHandler(state_manager)
         args = _parse_args(part.args)
 
+        # Nothing to ask: skip the terminal handoff so concurrent reads don't queue on it
+        if not tool_handler.should_confirm(part.tool_name):
+            return
+
         # Use a synchronous function in run_in_terminal to avoid async deadlocks
         def confirm_func():
             # Skip confirmation if not needed
@@ -325,6 +331,10 @@ async def repl(state_manager: StateManager):
 
     instance = agent.get_or_create_agent(state_manager.session.current_model, state_manager)
 
+    watcher = None
+    if state_manager.session.user_config.get("settings", {}).get("file_watcher", True):
+        watcher = start_file_watcher()
+
     async with instance.run_mcp_servers():
         while True:
             try:
@@ -383,7 +393,12 @@ async def repl(state_manager: StateManager):
                 process_request(line, state_manager)
             )
 
+    if watcher is not None:
+        await watcher.stop()
+
     if action == "restart":
         await repl(state_manager)
     else:
+        # Agents kept for a restart still hold the pooled client, so only close it here
+        await close_http_client()
         await ui.info("Session ended. Happy coding!")
@@ -5,7 +5,8 @@ Default configuration values for the TunaCode CLI.
 Provides sensible defaults for user configuration and environment variables.
 """
 
-from tunacode.constants import GUIDE_FILE_NAME, TOOL_READ_FILE
+from tunacode.constants import (GUIDE_FILE_NAME, MAX_PARALLEL_TASKS, MAX_PARALLEL_TOOL_CALLS,
+                                TOOL_READ_FILE)
 from tunacode.types import UserConfig
 
 DEFAULT_USER_CONFIG: UserConfig = {
@@ -23,6 +24,13 @@ DEFAULT_USER_CONFIG: UserConfig = {
         "guide_file": GUIDE_FILE_NAME,
         "fallback_response": True,
         "fallback_verbosity": "normal",  # Options: minimal, normal, detailed
+        "auto_compact": True,
+        "auto_compact_threshold": 0.8,  # Fraction of the context window that triggers compaction
+        "max_parallel_tool_calls": MAX_PARALLEL_TOOL_CALLS,
+        "max_parallel_tasks": MAX_PARALLEL_TASKS,  # Orchestrator tasks running at once
+        "speculative_planning": True,  # Start predictable reads while the planner runs
+        "plan_cache": True,  # Reuse plans for repeated and templated requests
+        "file_watcher": True,  # Keep the code index and file caches in sync with edits
     },
     "mcpServers": {},
 }
@@ -17,6 +17,7 @@ CONFIG_FILE_NAME = "tunacode.json"
 
 # Default limits
 MAX_FILE_SIZE = 100 * 1024  # 100KB
+DEFAULT_READ_LINE_LIMIT = 2000  # Lines returned when a large file is read without a range
 MAX_COMMAND_OUTPUT = 5000  # 5000 chars
 
 # Command output processing
@@ -32,6 +33,21 @@ TOOL_RUN_COMMAND = "run_command"
 TOOL_BASH = "bash"
 TOOL_GREP = "grep"
 TOOL_LIST_DIR = "list_dir"
+TOOL_FIND_SYMBOL = "find_symbol"
+TOOL_FIND_REFERENCES = "find_references"
+TOOL_FIND_DEPENDENTS = "find_dependents"
+
+# Tools with no side effects, safe to run concurrently
+READ_ONLY_TOOLS = [
+    TOOL_READ_FILE,
+    TOOL_GREP,
+    TOOL_LIST_DIR,
+    TOOL_FIND_SYMBOL,
+    TOOL_FIND_REFERENCES,
+    TOOL_FIND_DEPENDENTS,
+]
+MAX_PARALLEL_TOOL_CALLS = 8
+MAX_PARALLEL_TASKS = 4  # Orchestrator sub-agents running at once
 
 # Commands
 CMD_HELP = "/help"
@@ -122,3 +138,8 @@ MSG_UPDATE_AVAILABLE = "Update available: v{latest_version}"
 MSG_UPDATE_INSTRUCTION = "Exit, and run: [bold]pip install --upgrade tunacode-cli"
 MSG_VERSION_DISPLAY = "TunaCode CLI {version}"
 MSG_FILE_SIZE_LIMIT = " Please specify a smaller file or use other tools to process it."
+MSG_FILE_RANGE = "[Lines {start}-{end} of {total}. Use offset={next} to read more.]"
+MSG_FILE_TRUNCATED = (
+    "[{filepath} is {size}; showing lines {start}-{end} of {total}. "
+    "Use offset and limit to read other parts.]"
+)
@@ -17,6 +17,7 @@ from ..analysis import (Confidence, ConstrainedPlanner, FeedbackDecision, Feedba
 from ..state import StateManager
 from . import main as agent_main
 from .readonly import ReadOnlyAgent
+from .speculation import Speculation, speculative_tasks
 
 
 @dataclass
@@ -29,6 +30,20 @@ class ExecutionResult:
     error: Optional[Exception] = None
 
 
+@dataclass
+class ToolOutput:
+    """Output of a tool call made directly, without a sub-agent."""
+
+    output: str
+
+
+@dataclass
+class SpeculativeRun:
+    """A read task answered by a tool call started while the plan was generated."""
+
+    result: ToolOutput
+
+
 class AdaptiveOrchestrator:
     """Orchestrates task execution with adaptive planning and parallel execution."""
 
@@ -38,6 +53,8 @@ class AdaptiveOrchestrator:
         self.planner = ConstrainedPlanner(state_manager)
         self.feedback_loop = FeedbackLoop(state_manager)
         self.executor = ThreadPoolExecutor(max_workers=4)
+        # Reads started while the LLM planner runs; claimed by matching plan tasks
+        self._speculation: Optional[Speculation] = None
 
         # Timeouts
         self.task_timeout = 30  # 30s per task
@@ -78,6 +95,29 @@ class AdaptiveOrchestrator:
         except Exception as e:
             console.print(f"[red]Orchestrator error: {str(e)}. Falling back to regular mode.[/red]")
             return []
+        finally:
+            await self._end_speculation()
+
+    def _start_speculation(self, intent: Any) -> None:
+        """Start the reads a plan for this request will most likely ask for."""
+        from rich.console import Console
+
+        settings = self.state.session.user_config.get("settings", {})
+        if not settings.get("speculative_planning", True):
+            return
+        speculation = Speculation(speculative_tasks(intent.file_paths, intent.search_terms))
+        speculation.start()
+        if speculation.started:
+            Console().print(
+                f"[dim]Started {speculation.started} speculative reads while planning[/dim]"
+            )
+            self._speculation = speculation
+
+    async def _end_speculation(self) -> None:
+        """Cancel speculative reads that no task claimed."""
+        speculation, self._speculation = self._speculation, None
+        if speculation is not None:
+            await speculation.cancel()
 
     async def _get_initial_tasks(
         self, request: str, intent: Any, model: ModelName
@@ -94,8 +134,9 @@ class AdaptiveOrchestrator:
                 console.print(f"[dim]Generated {len(tasks)} tasks deterministically[/dim]")
                 return tasks
 
-        # Fall back to LLM planning
+        # Fall back to LLM planning, overlapping it with the predictable reads
         console.print("[dim]Using LLM planner for complex request[/dim]")
+        self._start_speculation(intent)
         try:
             task_objects = await self.planner.plan(request, model)
             # Convert Task objects to dicts
@@ -111,6 +152,7 @@ class AdaptiveOrchestrator:
             ]
         except Exception as e:
             console.print(f"[yellow]Planning failed: {str(e)}[/yellow]")
+            await self._end_speculation()
             return None
 
     async def _execute_with_feedback(
@@ -281,6 +323,13 @@ class AdaptiveOrchestrator:
         console.print(f"\n[dim][Task {task['id']}] {task_type}[/dim]")
         console.print(f"[dim]  → {task['description']}[/dim]")
 
+        # Reuse a matching read started while the plan was generated
+        if self._speculation is not None:
+            output = await self._speculation.claim(task)
+            if output is not None:
+                console.print(f"[dim][Task {task['id']}] Reused speculative result[/dim]")
+                return SpeculativeRun(ToolOutput(output))
+
         # If task has specific tool and args, format the request
         if task.get("tool") and task.get("args"):
             # This is a specific tool call
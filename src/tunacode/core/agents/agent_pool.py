@@ -0,0 +1,76 @@
+"""Module: tunacode.core.agents.agent_pool
+
+Process-wide pool of constructed pydantic-ai agents.
+Building an agent resolves its model, which creates the provider client and
+its HTTP connection pool, and wraps every tool. Sub-agents that share a model
+and toolset are interchangeable, so the pool hands the same instance to every
+task and request that asks for it. A pydantic-ai agent keeps no per-run
+state, which makes concurrent runs on one instance safe. Like resolved
+models, agents are keyed by the API key in effect, so changing a key builds
+fresh ones. The pool is bounded and evicts the least recently used agent.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from tunacode.core.llm.providers import credential_key
+
+AGENT_POOL_SIZE = 8
+
+PoolKey = Tuple[str, str, Optional[str]]  # (model, toolset, API key)
+
+
+class AgentPool:
+    """LRU of agents keyed by model, toolset name and API key."""
+
+    def __init__(self, maxsize: int = AGENT_POOL_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[PoolKey, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, model: str, toolset: str, factory: Callable[[], Any]) -> Any:
+        """Return the pooled agent for (model, toolset), building it with factory on a miss."""
+        key = (model, toolset, credential_key(model))
+        with self._lock:
+            agent = self._entries.get(key)
+            if agent is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return agent
+            self.misses += 1
+
+        agent = factory()
+        with self._lock:
+            # Another caller may have built the same agent meanwhile; keep the first
+            agent = self._entries.setdefault(key, agent)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return agent
+
+    def invalidate(self, model: Optional[str] = None) -> None:
+        """Drop one model's agents, or every agent when no model is given."""
+        with self._lock:
+            if model is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if key[0] == model]:
+                del self._entries[key]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get pool size and hit/miss counters."""
+        with self._lock:
+            return {
+                "agents": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+AGENT_POOL = AgentPool()
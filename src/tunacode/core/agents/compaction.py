@@ -0,0 +1,208 @@
+"""Token-budgeted compaction of the conversation history.
+
+Once the history grows past a configurable fraction of the model's context
+window, older turns are summarized in the background and replaced by a single
+summary message. Splits are chosen so that every tool return stays with the
+tool call that produced it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, List, Optional, Set, Tuple
+
+from tunacode.core.background.manager import BG_MANAGER
+from tunacode.core.state import StateManager
+from tunacode.types import ModelName
+from tunacode.utils.token_counter import (MESSAGE_TOKEN_CACHE, count_message_tokens,
+                                          get_context_window, message_text)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COMPACT_THRESHOLD = 0.8  # Start summarizing at this fraction of the context window
+COMPACT_KEEP_FRACTION = 0.25  # Recent history kept verbatim, as a fraction of the window
+COMPACT_BLOCKING_FRACTION = 0.95  # Above this, wait for the summary before sending
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+SUMMARY_PROMPT = """You compress conversation history for a coding assistant.
+Summarize the transcript you are given so the assistant can continue the work.
+Keep file paths, function names, decisions, open tasks, errors and user preferences.
+Drop pleasantries and tool output that is no longer relevant. Be concise."""
+
+
+@dataclass
+class PendingCompaction:
+    """A background summary of ``head``, the oldest messages of the history."""
+
+    task: asyncio.Task
+    head: List[Any]
+
+
+def _tool_ids(message: Any) -> Tuple[Set[str], Set[str]]:
+    """Return (tool call ids, tool return ids) referenced by a message."""
+    calls, returns = set(), set()
+    for part in getattr(message, "parts", ()):
+        kind = getattr(part, "part_kind", None)
+        call_id = getattr(part, "tool_call_id", None)
+        if not call_id:
+            continue
+        if kind == "tool-call":
+            calls.add(call_id)
+        elif kind in ("tool-return", "retry-prompt"):
+            returns.add(call_id)
+    return calls, returns
+
+
+def find_compaction_split(
+    messages: List[Any], keep_tokens: int, model: Optional[ModelName] = None
+) -> int:
+    """Find where the verbatim tail of the history should begin.
+
+    The tail is the longest suffix within ``keep_tokens`` that starts on a real
+    message and contains the call for every tool return it holds. If even the
+    shortest safe suffix is over budget, that suffix is used.
+
+    Returns:
+        Index of the first kept message; 0 when nothing can be compacted.
+    """
+    calls: Set[str] = set()
+    returns: Set[str] = set()
+    tail_tokens = 0
+    best = 0
+    for i in range(len(messages) - 1, 0, -1):
+        message = messages[i]
+        message_calls, message_returns = _tool_ids(message)
+        calls |= message_calls
+        returns |= message_returns
+        tail_tokens += MESSAGE_TOKEN_CACHE.count(message, model)
+
+        if tail_tokens > keep_tokens and best:
+            break
+        if hasattr(message, "parts") and returns <= calls:
+            best = i
+            if tail_tokens > keep_tokens:
+                break
+    return best
+
+
+def build_compacted_history(head: List[Any], tail: List[Any], summary: str) -> List[Any]:
+    """Replace ``head`` with one summary request, keeping its system prompt."""
+    from pydantic_ai.messages import ModelRequest, SystemPromptPart
+
+    # pydantic-ai only adds the system prompt to an empty history, so carry it over
+    system_parts = [
+        part
+        for message in head
+        if isinstance(message, ModelRequest)
+        for part in message.parts
+        if isinstance(part, SystemPromptPart) and not part.content.startswith(SUMMARY_HEADER)
+    ]
+    summary_part = SystemPromptPart(content=f"{SUMMARY_HEADER}\n{summary}")
+    return [ModelRequest(parts=[*system_parts, summary_part]), *tail]
+
+
+def render_transcript(messages: List[Any]) -> str:
+    """Render messages as plain text for the summarizer."""
+    lines = []
+    for message in messages:
+        kind = getattr(message, "kind", None)
+        role = {"request": "User/Tools", "response": "Assistant"}.get(kind, "Note")
+        text = message_text(message).strip()
+        if text:
+            lines.append(f"[{role}]\n{text}")
+    return "\n\n".join(lines)
+
+
+async def summarize_messages(messages: List[Any], model: ModelName) -> str:
+    """Summarize a slice of the history with a tool-less agent."""
+    from tunacode.core.agents.main import get_agent_tool
+    from tunacode.core.llm.providers import get_model
+
+    Agent, _ = get_agent_tool()
+    summarizer = Agent(
+        model=get_model(model), system_prompt=SUMMARY_PROMPT, result_type=str, retries=1
+    )
+    result = await summarizer.run(render_transcript(messages))
+    return result.data.strip()
+
+
+def _forget_task(task: asyncio.Task) -> None:
+    """Drop a finished summary task from the background manager."""
+    name = task.get_name()
+    if BG_MANAGER.tasks.get(name) is task:
+        del BG_MANAGER.tasks[name]
+
+
+def _apply(state_manager: StateManager, pending: PendingCompaction) -> bool:
+    """Swap a finished summary into the history if the head is still intact."""
+    session = state_manager.session
+    if pending.task.cancelled():
+        return False
+    error = pending.task.exception()
+    if error is not None:
+        logger.warning(f"History compaction failed: {error}")
+        return False
+
+    head = pending.head
+    messages = session.messages
+    # The history may have been cleared or compacted since the summary started
+    if len(messages) < len(head) or any(a is not b for a, b in zip(messages, head)):
+        return False
+
+    session.messages = build_compacted_history(
+        head, messages[len(head) :], pending.task.result()
+    )
+    return True
+
+
+async def compact_history(state_manager: StateManager, model: ModelName) -> bool:
+    """Compact the session history when it nears the model's context window.
+
+    Summaries are produced in the background and applied on a later request.
+    Only when the history is about to overflow does this wait for the summary.
+
+    Returns:
+        True if the history was replaced by a compacted version.
+    """
+    session = state_manager.session
+    settings = session.user_config.get("settings", {})
+    if not settings.get("auto_compact", True):
+        return False
+
+    window = get_context_window(model)
+    threshold = settings.get("auto_compact_threshold", DEFAULT_COMPACT_THRESHOLD)
+    compacted = False
+
+    pending = session.pending_compaction
+    if pending is not None and pending.task.done():
+        session.pending_compaction = None
+        compacted = _apply(state_manager, pending)
+        pending = None
+
+    tokens = count_message_tokens(session.messages, model)
+    if tokens < threshold * window:
+        return compacted
+
+    if pending is None:
+        split = find_compaction_split(
+            session.messages, int(window * COMPACT_KEEP_FRACTION), model
+        )
+        if split == 0:
+            return compacted
+        head = session.messages[:split]
+        task_id = BG_MANAGER.spawn(
+            summarize_messages(head, model), name=f"compact-{session.session_id[:8]}-{split}"
+        )
+        pending = PendingCompaction(task=BG_MANAGER.tasks[task_id], head=head)
+        pending.task.add_done_callback(_forget_task)
+        session.pending_compaction = pending
+
+    if tokens >= COMPACT_BLOCKING_FRACTION * window:
+        # Sending this history would likely overflow; wait for the summary
+        await asyncio.wait([pending.task])
+        session.pending_compaction = None
+        compacted = _apply(state_manager, pending) or compacted
+
+    return compacted
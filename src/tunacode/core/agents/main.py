@@ -10,17 +10,26 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from tunacode.constants import MAX_PARALLEL_TOOL_CALLS
+from tunacode.core.agents.compaction import compact_history
+from tunacode.core.agents.tool_scheduler import ToolGate
+from tunacode.core.llm.providers import get_model
 from tunacode.core.state import StateManager
+from tunacode.core.telemetry import TELEMETRY_FILE, RequestTelemetry, timed_tool
 from tunacode.services.mcp import get_mcp_servers
 from tunacode.tools.bash import bash
+from tunacode.tools.find_dependents import find_dependents
 from tunacode.tools.grep import grep
 from tunacode.tools.list_dir import list_dir
 from tunacode.tools.read_file import read_file
 from tunacode.tools.run_command import run_command
+from tunacode.tools.symbol_lookup import find_references, find_symbol
 from tunacode.tools.update_file import update_file
 from tunacode.tools.write_file import write_file
 from tunacode.types import (AgentRun, ErrorMessage, FallbackResponse, ModelName, PydanticAgent,
                             ResponseState, SimpleResult, ToolCallback, ToolCallId, ToolName)
+from tunacode.utils.token_counter import (count_message_tokens, count_tokens,
+                                          format_token_count, get_context_window)
 
 
 # Lazy import for Agent and Tool
@@ -192,7 +201,10 @@ async def _process_node(node, tool_callback: Optional[ToolCallback], state_manag
 
 def get_or_create_agent(model: ModelName, state_manager: StateManager) -> PydanticAgent:
     if model not in state_manager.session.agents:
-        max_retries = state_manager.session.user_config.get("settings", {}).get("max_retries", 3)
+        settings = state_manager.session.user_config.get("settings", {})
+        max_retries = settings.get("max_retries", 3)
+        # Read-only tool calls overlap; writes run one at a time in issue order
+        gate = ToolGate(settings.get("max_parallel_tool_calls", MAX_PARALLEL_TOOL_CALLS))
 
         # Lazy import Agent and Tool
         Agent, Tool = get_agent_tool()
@@ -213,16 +225,19 @@ def get_or_create_agent(model: ModelName, state_manager: StateManager) -> Pydant
                 system_prompt = "You are a helpful AI assistant for software development tasks."
 
         state_manager.session.agents[model] = Agent(
-            model=model,
+            model=get_model(model),
             system_prompt=system_prompt,
             tools=[
-                Tool(bash, max_retries=max_retries),
-                Tool(grep, max_retries=max_retries),
-                Tool(list_dir, max_retries=max_retries),
-                Tool(read_file, max_retries=max_retries),
-                Tool(run_command, max_retries=max_retries),
-                Tool(update_file, max_retries=max_retries),
-                Tool(write_file, max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(bash)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(find_dependents)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(find_references)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(find_symbol)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(grep)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(list_dir)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(read_file)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(run_command)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(update_file)), max_retries=max_retries),
+                Tool(gate.wrap(timed_tool(write_file)), max_retries=max_retries),
             ],
             mcp_servers=get_mcp_servers(state_manager),
         )
@@ -402,6 +417,18 @@ async def extract_and_execute_tool_calls(
                 await ui.error(f"Error parsing code block tool call: {str(e)}")
 
 
+def _finish_request_telemetry(state_manager: StateManager, telemetry: RequestTelemetry) -> None:
+    """Charge the request's cost to the session and append its metrics to the session log."""
+    state_manager.session.total_cost += telemetry.cost
+    try:
+        from tunacode.utils.system import get_session_dir
+
+        path = get_session_dir(state_manager) / TELEMETRY_FILE
+        state_manager.session.telemetry.export_jsonl(path, telemetry)
+    except OSError:
+        pass
+
+
 async def process_request(
     model: ModelName,
     message: str,
@@ -409,6 +436,7 @@ async def process_request(
     tool_callback: Optional[ToolCallback] = None,
 ) -> AgentRun:
     agent = get_or_create_agent(model, state_manager)
+    await compact_history(state_manager, model)
     mh = state_manager.session.messages.copy()
     # Get max iterations from config (default: 20)
     max_iterations = state_manager.session.user_config.get("settings", {}).get("max_iterations", 20)
@@ -421,41 +449,64 @@ async def process_request(
     # Reset iteration tracking for this request
     state_manager.session.iteration_count = 0
 
+    # Size the prompt before sending it so oversized histories can be handled up front
+    state_manager.session.prompt_tokens = count_message_tokens(mh, model) + count_tokens(
+        message, model
+    )
+    if state_manager.session.show_thoughts:
+        from tunacode.ui import console as ui
+
+        await ui.muted(
+            f"CONTEXT: {format_token_count(state_manager.session.prompt_tokens)}/"
+            f"{format_token_count(get_context_window(model))} tokens"
+        )
+
+    telemetry = state_manager.session.telemetry.start_request(model)
+
     async with agent.iter(message, message_history=mh) as agent_run:
         i = 0
-        async for node in agent_run:
-            state_manager.session.current_iteration = i + 1
-            await _process_node(node, tool_callback, state_manager)
-            if hasattr(node, "result") and node.result and hasattr(node.result, "output"):
-                if node.result.output:
-                    response_state.has_user_response = True
-            i += 1
-            state_manager.session.iteration_count = i
-
-            # Display iteration progress if thoughts are enabled
-            if state_manager.session.show_thoughts:
-                from tunacode.ui import console as ui
+        # Keep the metrics of requests that fail, are cancelled or hit the limit
+        try:
+            with telemetry:
+                async for node in agent_run:
+                    telemetry.record_node(node, i + 1)
+                    state_manager.session.current_iteration = i + 1
+                    await _process_node(node, tool_callback, state_manager)
+                    if hasattr(node, "result") and node.result and hasattr(node.result, "output"):
+                        if node.result.output:
+                            response_state.has_user_response = True
+                    i += 1
+                    state_manager.session.iteration_count = i
+
+                    # Display iteration progress if thoughts are enabled
+                    if state_manager.session.show_thoughts:
+                        from tunacode.ui import console as ui
 
-                await ui.muted(f"\nITERATION: {i}/{max_iterations}")
+                        await ui.muted(f"\nITERATION: {i}/{max_iterations}")
 
-                # Show summary of tools used so far
-                if state_manager.session.tool_calls:
-                    tool_summary = {}
-                    for tc in state_manager.session.tool_calls:
-                        tool_name = tc.get("tool", "unknown")
-                        tool_summary[tool_name] = tool_summary.get(tool_name, 0) + 1
+                        # Show summary of tools used so far
+                        if state_manager.session.tool_calls:
+                            tool_summary = {}
+                            for tc in state_manager.session.tool_calls:
+                                tool_name = tc.get("tool", "unknown")
+                                tool_summary[tool_name] = tool_summary.get(tool_name, 0) + 1
 
-                    summary_str = ", ".join(
-                        [f"{name}: {count}" for name, count in tool_summary.items()]
-                    )
-                    await ui.muted(f"TOOLS USED: {summary_str}")
+                            summary_str = ", ".join(
+                                [f"{name}: {count}" for name, count in tool_summary.items()]
+                            )
+                            await ui.muted(f"TOOLS USED: {summary_str}")
 
-            if i >= max_iterations:
-                if state_manager.session.show_thoughts:
-                    from tunacode.ui import console as ui
+                    # Exclude display and confirmation time from the next node's latency
+                    telemetry.mark()
+
+                    if i >= max_iterations:
+                        if state_manager.session.show_thoughts:
+                            from tunacode.ui import console as ui
 
-                    await ui.warning(f"Reached maximum iterations ({max_iterations})")
-                break
+                            await ui.warning(f"Reached maximum iterations ({max_iterations})")
+                        break
+        finally:
+            _finish_request_telemetry(state_manager, telemetry)
 
         # If we need to add a fallback response, create a wrapper
         if not response_state.has_user_response and i >= max_iterations and fallback_enabled:
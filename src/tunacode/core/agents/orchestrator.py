@@ -9,16 +9,16 @@ handling provided by ``main.process_request``.
 
 from __future__ import annotations
 
-import asyncio
-import itertools
 from typing import List
 
+from ...constants import MAX_PARALLEL_TASKS
 from ...types import AgentRun, FallbackResponse, ModelName, ResponseState
 from ..llm.planner import make_plan
 from ..state import StateManager
 from . import main as agent_main
 from .planner_schema import Task
 from .readonly import ReadOnlyAgent
+from .task_scheduler import build_task_graph, run_task_graph
 
 
 class OrchestratorAgent:
@@ -48,8 +48,13 @@ class OrchestratorAgent:
         console.print(f"[dim]  → {task.description}[/dim]")
 
         if task.mutate:
-            agent_main.get_or_create_agent(model, self.state)
-            result = await agent_main.process_request(model, task.description, self.state)
+            # Writes to disjoint files may run concurrently, so each works on its own history
+            state = self.state.fork()
+            agent_main.get_or_create_agent(model, state)
+            try:
+                result = await agent_main.process_request(model, task.description, state)
+            finally:
+                self.state.join(state)
         else:
             agent = ReadOnlyAgent(model, self.state)
             result = await agent.process_request(task.description)
@@ -105,55 +110,38 @@ class OrchestratorAgent:
         # Show execution is starting
         console.print(f"\n[cyan]Executing plan with {len(tasks)} tasks...[/cyan]")
 
-        results: List[AgentRun] = []
+        # Run every task as soon as the tasks it depends on have finished
+        max_parallel = self.state.session.user_config.get("settings", {}).get(
+            "max_parallel_tasks", MAX_PARALLEL_TASKS
+        )
+        independent = sum(
+            1 for prerequisites in build_task_graph(tasks).values() if not prerequisites
+        )
+        if independent > 1 and max_parallel > 1:
+            console.print(
+                f"\n[dim][Parallel Execution] {independent} tasks can start immediately, "
+                f"running up to {max_parallel} at once...[/dim]"
+            )
+        results: List[AgentRun] = await run_task_graph(
+            tasks, lambda t: self._run_sub_task(t, model), max_parallel
+        )
+
         task_progress = []
+        for t, result in zip(tasks, results):
+            # Track task progress
+            task_progress.append(
+                {
+                    "task": t,
+                    "completed": True,
+                    "had_output": hasattr(result, "result")
+                    and result.result
+                    and getattr(result.result, "output", None),
+                }
+            )
 
-        for mutate_flag, group in itertools.groupby(tasks, key=lambda t: t.mutate):
-            if mutate_flag:
-                for t in group:
-                    result = await self._run_sub_task(t, model)
-                    results.append(result)
-
-                    # Track task progress
-                    task_progress.append(
-                        {
-                            "task": t,
-                            "completed": True,
-                            "had_output": hasattr(result, "result")
-                            and result.result
-                            and getattr(result.result, "output", None),
-                        }
-                    )
-
-                    # Check if this task produced user-visible output
-                    if hasattr(result, "response_state"):
-                        response_state.has_user_response |= result.response_state.has_user_response
-            else:
-                # Show parallel execution
-                task_list = list(group)
-                if len(task_list) > 1:
-                    console.print(
-                        f"\n[dim][Parallel Execution] Running {len(task_list)} read-only tasks concurrently...[/dim]"
-                    )
-                coros = [self._run_sub_task(t, model) for t in task_list]
-                parallel_results = await asyncio.gather(*coros)
-                results.extend(parallel_results)
-
-                # Track parallel task progress
-                for t, result in zip(task_list, parallel_results):
-                    task_progress.append(
-                        {
-                            "task": t,
-                            "completed": True,
-                            "had_output": hasattr(result, "result")
-                            and result.result
-                            and getattr(result.result, "output", None),
-                        }
-                    )
-
-                    # Check if this task produced user-visible output
-                    if hasattr(result, "response_state"):
-                        response_state.has_user_response |= result.response_state.has_user_response
+            # Check if this task produced user-visible output
+            if hasattr(result, "response_state"):
+                response_state.has_user_response |= result.response_state.has_user_response
 
         console.print("\n[green]Orchestrator completed all tasks successfully![/green]")
 
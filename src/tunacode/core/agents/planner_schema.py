@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic import BaseModel, Field
 
 
@@ -7,3 +9,13 @@ class Task(BaseModel):
     id: int = Field(..., description="1-based task index in execution order")
     description: str = Field(..., description="What the sub-agent must do")
     mutate: bool = Field(..., description="True if the task changes code")
+    reads: List[str] = Field(
+        default_factory=list, description="Relative paths of files or directories the task reads"
+    )
+    writes: List[str] = Field(
+        default_factory=list,
+        description="Relative paths of files the task creates or modifies (required when mutate)",
+    )
+    depends_on: List[int] = Field(
+        default_factory=list, description="Ids of earlier tasks whose results this task needs"
+    )
@@ -5,17 +5,27 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from ...tools.bash import bash
+from ...tools.find_dependents import find_dependents
 from ...tools.grep import grep
 from ...tools.read_file import read_file
+from ...tools.symbol_lookup import find_references, find_symbol
 from ...types import AgentRun, ModelName, ResponseState
 from ..state import StateManager
+from .agent_pool import AGENT_POOL
 
 if TYPE_CHECKING:
     from ...types import PydanticAgent
 
 
+READONLY_TOOLSET = "readonly"
+
+
 class ReadOnlyAgent:
-    """Agent configured with read-only tools for analysis tasks."""
+    """Agent configured with read-only tools for analysis tasks.
+
+    The underlying pydantic-ai agent comes from the shared agent pool, so
+    every read task on the same model reuses one agent and provider client.
+    """
 
     def __init__(self, model: ModelName, state_manager: StateManager):
         self.model = model
@@ -23,24 +33,34 @@ class ReadOnlyAgent:
         self._agent: PydanticAgent | None = None
 
     def _get_agent(self) -> PydanticAgent:
-        """Lazily create the agent with read-only tools."""
+        """Get the pooled agent with read-only tools."""
         if self._agent is None:
-            from .main import get_agent_tool
-
-            Agent, Tool = get_agent_tool()
-
-            # Create agent with only read-only tools
-            self._agent = Agent(
-                model=self.model,
-                system_prompt="You are a read-only assistant. You can analyze and read files but cannot modify them. You can also execute shell commands for inspection purposes.",
-                tools=[
-                    Tool(read_file),
-                    Tool(grep),
-                    Tool(bash),
-                ],
-            )
+            self._agent = AGENT_POOL.get(self.model, READONLY_TOOLSET, self._create_agent)
         return self._agent
 
+    def _create_agent(self) -> PydanticAgent:
+        """Create an agent with only read-only tools."""
+        from ..llm.providers import get_model
+        from .main import get_agent_tool
+
+        Agent, Tool = get_agent_tool()
+
+        return Agent(
+            model=get_model(self.model),
+            system_prompt=(
+                "You are a read-only assistant. You can analyze and read files but cannot "
+                "modify them. You can also execute shell commands for inspection purposes."
+            ),
+            tools=[
+                Tool(read_file),
+                Tool(grep),
+                Tool(bash),
+                Tool(find_symbol),
+                Tool(find_references),
+                Tool(find_dependents),
+            ],
+        )
+
     async def process_request(self, request: str) -> AgentRun:
         """Process a request using only read-only tools."""
         agent = self._get_agent()
@@ -0,0 +1,154 @@
+"""Module: tunacode.core.agents.speculation
+
+Speculative read-only work that overlaps LLM planning.
+While the planner model is generating, the reads a plan almost always starts
+with are already predictable from the request: the files it references and
+the terms it quotes. Those run immediately as direct tool calls. When the
+plan arrives, a read task asking for the same file or search takes the
+finished result instead of starting a sub-agent. Speculation that matches no
+task is cancelled; the reads it finished still warm the file cache and
+content index for the sub-agents that follow.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+MAX_SPECULATIVE_TASKS = 8
+
+# grep's keyword arguments after pattern and directory, with its defaults
+GREP_DEFAULTS: Dict[str, Any] = {
+    "case_sensitive": False,
+    "use_regex": False,
+    "include_files": None,
+    "exclude_files": None,
+    "max_results": 50,
+    "context_lines": 2,
+    "search_type": "smart",
+}
+
+SpeculationKey = Tuple[str, ...]
+
+
+def _read_key(file_path: str) -> SpeculationKey:
+    return ("read_file", os.path.normpath(file_path.lstrip("@")))
+
+
+def _grep_key(args: Dict[str, Any]) -> Optional[SpeculationKey]:
+    # Every argument counts, filled in with grep's defaults, so only identical searches match
+    if set(args) - set(GREP_DEFAULTS) - {"pattern", "directory"}:
+        return None
+    options = tuple(repr(args.get(name, default)) for name, default in GREP_DEFAULTS.items())
+    return ("grep", args["pattern"], os.path.normpath(args.get("directory") or "."), *options)
+
+
+def task_key(task: Dict[str, Any]) -> Optional[SpeculationKey]:
+    """Identify the work a read-only task asks for, if speculation can serve it."""
+    if task.get("mutate", False):
+        return None
+    args = task.get("args") or {}
+    tool = task.get("tool")
+    if tool == "read_file" and args.get("file_path"):
+        # Paged reads ask for something narrower than the whole file
+        if args.get("offset") or args.get("limit"):
+            return None
+        return _read_key(args["file_path"])
+    if tool == "grep" and args.get("pattern"):
+        return _grep_key(args)
+    return None
+
+
+def speculative_tasks(
+    file_paths: List[str], search_terms: List[str], root: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Build the read tasks a plan for this request would most likely start with.
+
+    Args:
+        file_paths: Files referenced in the request (``@file`` or quoted paths)
+        search_terms: Terms the request asks to find
+        root: Directory the paths are relative to (default: current directory)
+
+    Returns:
+        Task dicts in the analyzer's format, for files that exist and terms
+        long enough to search for.
+    """
+    root = root or os.getcwd()
+    tasks: List[Dict[str, Any]] = []
+    seen = set()
+    for path in file_paths:
+        path = path.lstrip("@")
+        if not os.path.isfile(os.path.join(root, path)):
+            continue
+        task = {"tool": "read_file", "args": {"file_path": path}}
+        if task_key(task) not in seen:
+            seen.add(task_key(task))
+            tasks.append(task)
+    for term in search_terms:
+        term = term.strip()
+        if len(term) < 3:
+            continue
+        task = {"tool": "grep", "args": {"pattern": term, "directory": "."}}
+        if task_key(task) not in seen:
+            seen.add(task_key(task))
+            tasks.append(task)
+    for i, task in enumerate(tasks[:MAX_SPECULATIVE_TASKS], 1):
+        task.update({"id": i, "description": f"Speculative {task['tool']}", "mutate": False})
+    return tasks[:MAX_SPECULATIVE_TASKS]
+
+
+async def _run_tool(task: Dict[str, Any]) -> str:
+    from tunacode.tools.grep import grep
+    from tunacode.tools.read_file import read_file
+
+    args = task["args"]
+    if task["tool"] == "read_file":
+        return await read_file(args["file_path"])
+    return await grep(**args)
+
+
+class Speculation:
+    """Read-only tool calls started ahead of the plan, claimable by matching tasks."""
+
+    def __init__(
+        self,
+        tasks: List[Dict[str, Any]],
+        run_tool: Optional[Callable[[Dict[str, Any]], Awaitable[str]]] = None,
+    ):
+        self._running: Dict[SpeculationKey, asyncio.Task] = {}
+        self._tasks = tasks
+        self._run_tool = run_tool or _run_tool
+        self.started = 0
+        self.reused = 0
+
+    def start(self) -> None:
+        """Schedule every speculative task on the running loop."""
+        for task in self._tasks:
+            key = task_key(task)
+            if key is not None and key not in self._running:
+                self._running[key] = asyncio.create_task(self._run_tool(task))
+                self.started += 1
+
+    async def claim(self, task: Dict[str, Any]) -> Optional[str]:
+        """Return the speculative result for a planned task, waiting if it is still running.
+
+        Each result is handed out once. Returns None when nothing matches or the
+        speculative call failed, in which case the task runs normally.
+        """
+        key = task_key(task)
+        running = self._running.pop(key, None) if key is not None else None
+        if running is None:
+            return None
+        try:
+            output = await running
+        except Exception:
+            return None
+        self.reused += 1
+        return output
+
+    async def cancel(self) -> None:
+        """Cancel unclaimed work and wait for it to stop."""
+        running = list(self._running.values())
+        self._running.clear()
+        for pending in running:
+            pending.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
@@ -0,0 +1,117 @@
+"""Module: tunacode.core.agents.task_scheduler
+
+Schedules the tasks of an orchestrator plan as a dependency graph.
+A task waits for the tasks it declares in ``depends_on`` and for every
+earlier task whose file sets conflict with its own: a write conflicts with
+any read or write of the same file or directory. Tasks with no pending
+prerequisites run concurrently with bounded parallelism, so independent
+reads and writes to disjoint files overlap. Tasks that leave their file
+sets undeclared (a write with no ``writes``, a read with no ``reads``) may
+touch anything and keep their plan order relative to every write.
+"""
+
+import asyncio
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from tunacode.constants import MAX_PARALLEL_TASKS
+
+from .planner_schema import Task
+
+
+def _normalize(paths: List[str]) -> Set[str]:
+    return {os.path.normpath(p.strip()) for p in paths if p and p.strip()}
+
+
+def _paths_overlap(left: Set[str], right: Set[str]) -> bool:
+    """Check whether two path sets share a file, or one contains a directory of the other."""
+    if "." in left or "." in right:
+        return bool(left and right)
+    for a in left:
+        for b in right:
+            if a == b or a.startswith(b + os.sep) or b.startswith(a + os.sep):
+                return True
+    return False
+
+
+def _is_undeclared(task: Task) -> bool:
+    return not (task.writes if task.mutate else task.reads)
+
+
+def _conflicts(earlier: Task, later: Task) -> bool:
+    """Check whether two tasks must keep their plan order."""
+    if not earlier.mutate and not later.mutate:
+        return False
+    # A task without declared paths may touch any file
+    if _is_undeclared(earlier) or _is_undeclared(later):
+        return True
+    earlier_writes, later_writes = _normalize(earlier.writes), _normalize(later.writes)
+    earlier_touches = earlier_writes | _normalize(earlier.reads)
+    later_touches = later_writes | _normalize(later.reads)
+    return _paths_overlap(earlier_writes, later_touches) or _paths_overlap(
+        later_writes, earlier_touches
+    )
+
+
+def build_task_graph(tasks: List[Task]) -> Dict[int, Set[int]]:
+    """Map each task's position in the plan to the positions it must wait for.
+
+    Declared dependencies only count when they point to an earlier task, which
+    keeps the graph acyclic whatever the planner returns.
+    """
+    position = {task.id: i for i, task in enumerate(tasks)}
+    graph: Dict[int, Set[int]] = {}
+    for i, task in enumerate(tasks):
+        prerequisites = {
+            position[dep] for dep in task.depends_on if dep in position and position[dep] < i
+        }
+        prerequisites.update(j for j in range(i) if _conflicts(tasks[j], task))
+        graph[i] = prerequisites
+    return graph
+
+
+async def run_task_graph(
+    tasks: List[Task],
+    run: Callable[[Task], Awaitable[Any]],
+    max_parallel: Optional[int] = None,
+) -> List[Any]:
+    """Run tasks as soon as their prerequisites finish.
+
+    Args:
+        tasks: Planned tasks, in plan order
+        run: Coroutine function executing one task
+        max_parallel: Most tasks running at once (default: MAX_PARALLEL_TASKS)
+
+    Returns:
+        Each task's result, in plan order.
+    """
+    limit = max(1, max_parallel or MAX_PARALLEL_TASKS)
+    pending = build_task_graph(tasks)
+    results: List[Any] = [None] * len(tasks)
+    running: Dict[asyncio.Task, int] = {}
+
+    def start_ready() -> None:
+        for i in sorted(pending):
+            if len(running) >= limit:
+                return
+            if not pending[i]:
+                del pending[i]
+                running[asyncio.create_task(run(tasks[i]))] = i
+
+    try:
+        start_ready()
+        while running:
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for finished in done:
+                i = running.pop(finished)
+                results[i] = finished.result()
+                for prerequisites in pending.values():
+                    prerequisites.discard(i)
+            start_ready()
+    except BaseException:
+        # Don't leave sibling tasks running after one fails or the user aborts
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        raise
+    return results
@@ -0,0 +1,84 @@
+"""Module: tunacode.core.agents.tool_scheduler
+
+Orders the execution of tool calls from a single model response.
+pydantic-ai starts every tool call of a response as its own task at once, in
+the order the model issued them. Tools registered through a ToolGate keep
+that concurrency for read-only calls, bounded by max_parallel, while a
+mutating call waits for every call issued before it, and calls issued after
+it wait for it. Writes therefore apply in the model's order and never
+overlap a read of the same response.
+"""
+
+import asyncio
+import functools
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Optional, Set
+
+from tunacode.constants import MAX_PARALLEL_TOOL_CALLS, READ_ONLY_TOOLS
+
+
+def is_read_only(tool_name: str) -> bool:
+    """Check whether a tool has no side effects."""
+    return tool_name in READ_ONLY_TOOLS
+
+
+class ToolGate:
+    """Reader/writer barrier over tool calls, in the order the calls start."""
+
+    def __init__(self, max_parallel: int = MAX_PARALLEL_TOOL_CALLS):
+        self.max_parallel = max(1, max_parallel)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._last_write: Optional[asyncio.Future] = None
+        self._since_write: Set[asyncio.Future] = set()
+
+    @asynccontextmanager
+    async def hold(self, read_only: bool) -> AsyncIterator[None]:
+        """Wait for this call's turn and hold it for the body of the block.
+
+        The call's place in line is taken before the first await, so calls
+        are ordered by when their tasks start.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures and semaphores belong to one event loop
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_parallel)
+            self._last_write = None
+            self._since_write = set()
+
+        done = loop.create_future()
+        waits = [self._last_write] if self._last_write is not None else []
+        if read_only:
+            self._since_write.add(done)
+        else:
+            # Earlier writes are already behind the reads issued since them
+            waits.extend(self._since_write)
+            self._last_write = done
+            self._since_write = set()
+
+        try:
+            if waits:
+                await asyncio.wait(waits)
+            if read_only:
+                async with self._semaphore:
+                    yield
+            else:
+                yield
+        finally:
+            self._since_write.discard(done)
+            if self._last_write is done:
+                self._last_write = None
+            if not done.done():
+                done.set_result(None)
+
+    def wrap(self, func: Callable) -> Callable:
+        """Wrap an async tool so its body runs under this gate."""
+        read_only = is_read_only(func.__name__)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            async with self.hold(read_only):
+                return await func(*args, **kwargs)
+
+        return wrapper
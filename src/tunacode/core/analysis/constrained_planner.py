@@ -6,7 +6,7 @@ that can't be handled by the deterministic analyzer.
 """
 
 import json
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from typing import List, Optional
 
 from ...types import ModelName
@@ -60,6 +60,8 @@ class ConstrainedPlanner:
         from rich.console import Console
 
         from ..agents.main import get_agent_tool
+        from ..llm.plan_cache import PLAN_CACHE
+        from ..llm.providers import get_model
 
         console = Console()
         Agent, _ = get_agent_tool()
@@ -69,6 +71,20 @@ class ConstrainedPlanner:
         if context:
             full_prompt = f"Context: {context}\n\nRequest: {request}"
 
+        # Context changes the plan, so only context-free requests are cached
+        settings = self.state.session.user_config.get("settings", {})
+        use_cache = context is None and settings.get("plan_cache", True)
+        cached = PLAN_CACHE.get("constrained", request, model) if use_cache else None
+        if cached is not None:
+            try:
+                tasks = self._validate_and_convert(cached)
+                console.print(
+                    f"[dim][Constrained Planning] Reusing cached plan of {len(tasks)} tasks[/dim]"
+                )
+                return tasks
+            except ValueError:
+                pass
+
         # Try to get a valid plan with retries
         last_error = None
         for attempt in range(self.max_retries):
@@ -79,7 +95,7 @@ class ConstrainedPlanner:
 
                 # Create planner with strict prompt
                 planner = Agent(
-                    model=model,
+                    model=get_model(model),
                     system_prompt=PLANNER_PROMPT,
                     result_type=str,  # Get raw string to parse ourselves
                     retries=1,  # Handle retries ourselves
@@ -99,6 +115,8 @@ class ConstrainedPlanner:
 
                 # Validate and convert to Task objects
                 tasks = self._validate_and_convert(tasks_data)
+                if use_cache:
+                    PLAN_CACHE.put("constrained", request, model, [asdict(t) for t in tasks])
 
                 console.print(
                     f"[dim][Constrained Planning] Successfully generated {len(tasks)} tasks[/dim]"
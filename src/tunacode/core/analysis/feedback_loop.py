@@ -185,6 +185,7 @@ class FeedbackLoop:
         from rich.console import Console
 
         from ..agents.main import get_agent_tool
+        from ..llm.providers import get_model
 
         console = Console()
         Agent, _ = get_agent_tool()
@@ -194,7 +195,9 @@ class FeedbackLoop:
 
         try:
             # Create analyzer agent
-            analyzer = Agent(model=model, system_prompt=FEEDBACK_PROMPT, result_type=str, retries=2)
+            analyzer = Agent(
+                model=get_model(model), system_prompt=FEEDBACK_PROMPT, result_type=str, retries=2
+            )
 
             # Get analysis
             result = await analyzer.run(context)
@@ -10,7 +10,7 @@ from dataclasses import dataclass
 from enum import Enum
 from typing import List, Optional
 
-from ..code_index import CodeIndex
+from ..code_index import get_code_index
 
 
 class RequestType(Enum):
@@ -51,8 +51,8 @@ class RequestAnalyzer:
     """Analyzes user requests to extract intent and generate tasks."""
 
     def __init__(self):
-        # Initialize code index for file lookups
-        self.code_index = CodeIndex()
+        # Shared code index for file lookups (persisted and refreshed incrementally)
+        self.code_index = get_code_index()
         
         # Patterns for different request types
         self.patterns = {
@@ -143,7 +143,7 @@ class RequestAnalyzer:
                 request_type=RequestType.COMPLEX,
                 confidence=Confidence.HIGH,
                 file_paths=self._extract_file_paths(request),
-                search_terms=[],
+                search_terms=self._extract_quoted_strings(request),
                 operations=self._extract_operations(request_lower),
                 raw_request=request,
             )
@@ -358,7 +358,7 @@ class RequestAnalyzer:
             return None
             
         # Ensure the index is built
-        if not self.code_index._indexed:
+        if not self.code_index.is_built:
             self.code_index.build_index()
         
         # Look up files that might contain this term
@@ -1,14 +1,30 @@
 """Fast in-memory code index for efficient file lookups."""
 
+import hashlib
+import json
 import os
 import threading
+import time
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 import logging
 
+from tunacode.core.symbols import CLASS_KINDS, FUNCTION_KINDS, Symbol, parse_file, parse_many
+from tunacode.utils.ignore import COMMON_IGNORE_PATTERNS, IgnoreMatcher
+from tunacode.utils.walker import parallel_walk
+
 logger = logging.getLogger(__name__)
 
+# Bump when the on-disk record layout changes so stale caches are discarded
+INDEX_CACHE_VERSION = 3
+INDEX_CACHE_SUBDIR = 'index'
+REFRESH_INTERVAL = 5.0  # Seconds between stat walks that catch edits made outside the tools
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
 
 class CodeIndex:
     """Fast in-memory code index for repository file lookups.
@@ -17,21 +33,11 @@ class CodeIndex:
     grep searches that can timeout in large repositories.
     """
     
-    # Directories to ignore during indexing
-    IGNORE_DIRS = {
-        '.git', '.hg', '.svn', '.bzr',
-        '__pycache__', '.pytest_cache', '.mypy_cache',
-        'node_modules', 'bower_components',
-        '.venv', 'venv', 'env', '.env',
-        'build', 'dist', '_build', 'target',
-        '.idea', '.vscode', '.vs',
-        'htmlcov', '.coverage', '.tox',
-        '.eggs', '*.egg-info',
-        '.bundle', 'vendor',
-        '.terraform', '.serverless',
-        '.next', '.nuxt',
-        'coverage', 'tmp', 'temp',
-    }
+    # Ignored on top of .gitignore rules: dependency, build and editor directories,
+    # plus every hidden directory
+    IGNORE_PATTERNS = COMMON_IGNORE_PATTERNS + [
+        '_build/', 'vendor/', 'htmlcov/', 'coverage/', 'tmp/', 'temp/', '.*/',
+    ]
     
     # File extensions to index
     INDEXED_EXTENSIONS = {
@@ -48,49 +54,178 @@ class CodeIndex:
         '.gitignore', '.env.example',
     }
     
-    def __init__(self, root_dir: Optional[str] = None):
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        persist: bool = True,
+    ):
         """Initialize the code index.
         
         Args:
             root_dir: Root directory to index. Defaults to current directory.
+            cache_dir: Directory for the persisted index. Defaults to ~/.tunacode/index.
+            persist: Whether to load and save the index on disk between runs.
         """
         self.root_dir = Path(root_dir or os.getcwd()).resolve()
         self._lock = threading.RLock()
+        self._persist = persist
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        
+        # Per-file signature and parse results, used for incremental rebuilds
+        self._file_records: Dict[Path, Dict[str, Any]] = {}
+        self._previous_records: Dict[Path, Dict[str, Any]] = {}
+        self._files_reused = 0
+        self._files_reparsed = 0
         
         # Primary indices
         self._basename_to_paths: Dict[str, List[Path]] = defaultdict(list)
         self._path_to_imports: Dict[Path, Set[str]] = {}
         self._all_files: Set[Path] = set()
         
-        # Symbol indices for common patterns
+        # Symbol indices for common patterns. The per-file record lists each
+        # file's own symbols, so removing a file only touches those entries.
         self._class_definitions: Dict[str, List[Path]] = defaultdict(list)
         self._function_definitions: Dict[str, List[Path]] = defaultdict(list)
+        self._symbol_definitions: Dict[str, List[Tuple[Path, Symbol]]] = defaultdict(list)
+        self._import_to_paths: Dict[str, Set[Path]] = defaultdict(set)
+        
+        # Substring lookups: lowercase path components map to the files under
+        # them, and a trigram index over the distinct components finds the
+        # components containing a query without scanning every path
+        self._component_paths: Dict[str, Set[Path]] = defaultdict(set)
+        self._component_trigrams: Dict[str, Set[str]] = defaultdict(set)
         
         # Cache for directory contents
         self._dir_cache: Dict[Path, List[Path]] = {}
         
+        # Optional content index used to narrow grep candidates
+        self._trigram_index = None
+        # Import graph, rebuilt lazily after any file record changes
+        self._dependency_graph = None
+        
+        self._ignore = IgnoreMatcher(self.root_dir, patterns=self.IGNORE_PATTERNS)
+        
         self._indexed = False
+        self._last_refresh = 0.0
     
-    def build_index(self, force: bool = False) -> None:
+    def build_index(self, force: bool = False) -> Set[Path]:
         """Build the file index for the repository.
         
         Args:
             force: Force rebuild even if already indexed.
+        
+        Returns:
+            Relative paths of the files added, changed or removed since the
+            previous records (empty when the index was already built).
         """
         with self._lock:
             if self._indexed and not force:
-                return
+                return set()
             
             logger.info(f"Building code index for {self.root_dir}")
+            
+            # Reuse records from a previous in-memory build, or from disk on first build
+            if self._file_records:
+                self._previous_records = dict(self._file_records)
+            elif self._persist:
+                self._previous_records = self._load_cache()
+            
             self._clear_indices()
+            # Pick up .gitignore edits since the last build
+            self._ignore = IgnoreMatcher(self.root_dir, patterns=self.IGNORE_PATTERNS)
+            self._files_reused = 0
+            self._files_reparsed = 0
             
+            previous = self._previous_records
             try:
                 self._scan_directory(self.root_dir)
                 self._indexed = True
-                logger.info(f"Indexed {len(self._all_files)} files")
+                self._last_refresh = time.monotonic()
+                logger.info(
+                    f"Indexed {len(self._all_files)} files "
+                    f"({self._files_reused} reused, {self._files_reparsed} re-parsed)"
+                )
             except Exception as e:
                 logger.error(f"Error building index: {e}")
                 raise
+            finally:
+                self._previous_records = {}
+            
+            # Reused records are the previous objects themselves
+            changed = {
+                rel for rel, record in self._file_records.items() if previous.get(rel) is not record
+            }
+            changed.update(previous.keys() - self._file_records.keys())
+            if self._persist and changed:
+                self.save_cache()
+            return changed
+    
+    def ensure_current(self) -> None:
+        """Catch up with edits made outside the tools before answering from the index.
+        
+        Skipped while a file watcher covers the root, since it applies every
+        change as it happens. Otherwise the tree is re-scanned at most once per
+        REFRESH_INTERVAL, reusing the record of every file whose stat
+        signature is unchanged.
+        """
+        from tunacode.core.watcher import is_watched
+        
+        with self._lock:
+            if not self._indexed:
+                self.build_index()
+            elif (
+                time.monotonic() - self._last_refresh > REFRESH_INTERVAL
+                and not is_watched(self.root_dir)
+            ):
+                self.build_index(force=True)
+    
+    def _get_cache_path(self) -> Path:
+        """Get the on-disk cache file for this repository root."""
+        if self._cache_dir is not None:
+            cache_dir = self._cache_dir
+        else:
+            from tunacode.utils.system import get_tunacode_home
+            
+            cache_dir = get_tunacode_home() / INDEX_CACHE_SUBDIR
+        
+        root_key = hashlib.sha1(str(self.root_dir).encode()).hexdigest()[:16]
+        return cache_dir / f"{root_key}.json"
+    
+    def _load_cache(self) -> Dict[Path, Dict[str, Any]]:
+        """Load persisted per-file records for this repository root."""
+        try:
+            with open(self._get_cache_path(), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable index cache: {e}")
+            return {}
+        
+        if data.get('version') != INDEX_CACHE_VERSION or data.get('root') != str(self.root_dir):
+            return {}
+        
+        return {Path(rel): record for rel, record in data.get('files', {}).items()}
+    
+    def save_cache(self) -> None:
+        """Persist the current per-file records to disk."""
+        with self._lock:
+            data = {
+                'version': INDEX_CACHE_VERSION,
+                'root': str(self.root_dir),
+                'files': {str(rel): record for rel, record in self._file_records.items()},
+            }
+        
+        try:
+            cache_path = self._get_cache_path()
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            logger.debug(f"Could not save index cache: {e}")
     
     def _clear_indices(self) -> None:
         """Clear all indices."""
@@ -99,47 +234,51 @@ class CodeIndex:
         self._all_files.clear()
         self._class_definitions.clear()
         self._function_definitions.clear()
+        self._symbol_definitions.clear()
+        self._import_to_paths.clear()
+        self._component_paths.clear()
+        self._component_trigrams.clear()
         self._dir_cache.clear()
+        self._file_records.clear()
+        self._dependency_graph = None
     
-    def _should_ignore_path(self, path: Path) -> bool:
+    def _should_ignore_path(self, path: Path, is_dir: bool = True) -> bool:
         """Check if a path should be ignored during indexing."""
-        # Check against ignore patterns
-        parts = path.parts
-        for part in parts:
-            if part in self.IGNORE_DIRS:
-                return True
-            if part.startswith('.') and part != '.':
-                # Skip hidden directories except current directory
-                return True
-        
-        return False
+        try:
+            relative_path = path.relative_to(self.root_dir)
+        except ValueError:
+            return True
+        return self._ignore.is_ignored(str(relative_path), is_dir=is_dir)
     
     def _scan_directory(self, directory: Path) -> None:
-        """Recursively scan a directory and index files."""
+        """Scan a directory tree in parallel and index its files."""
         if self._should_ignore_path(directory):
             return
         
+        to_parse: List[Tuple[Path, List[int]]] = []
         try:
-            entries = list(directory.iterdir())
-            file_list = []
-            
-            for entry in entries:
-                if entry.is_dir():
-                    self._scan_directory(entry)
-                elif entry.is_file():
-                    if self._should_index_file(entry):
-                        self._index_file(entry)
-                        file_list.append(entry)
-            
-            # Cache directory contents
-            self._dir_cache[directory] = file_list
+            # Have the walker stat each file while listing its directory
+            for entry in parallel_walk(directory, ignore=self._ignore, with_stat=True):
+                file_path = Path(entry.path)
+                if not self._should_index_file(file_path, entry.stat):
+                    continue
+                relative_path, signature, record = self._cached_record(file_path, entry.stat)
+                if record is not None:
+                    self._apply_record(relative_path, record)
+                else:
+                    to_parse.append((file_path, signature))
+                # Cache directory contents
+                self._dir_cache.setdefault(file_path.parent, []).append(file_path)
             
-        except PermissionError:
-            logger.debug(f"Permission denied: {directory}")
+            # Parse new and changed files together, in worker processes if there are many
+            parsed = parse_many([str(file_path) for file_path, _ in to_parse])
+            for (file_path, signature), fields in zip(to_parse, parsed):
+                self._apply_record(file_path.relative_to(self.root_dir), {'sig': signature, **fields})
+            self._files_reparsed += len(to_parse)
         except Exception as e:
             logger.warning(f"Error scanning {directory}: {e}")
     
-    def _should_index_file(self, file_path: Path) -> bool:
+    def _should_index_file(self, file_path: Path, stat_result: Optional[os.stat_result] = None) -> bool:
         """Check if a file should be indexed."""
         # Check extension
         if file_path.suffix.lower() not in self.INDEXED_EXTENSIONS:
@@ -161,66 +300,76 @@ class CodeIndex:
         
         # Skip very large files
         try:
-            if file_path.stat().st_size > 10 * 1024 * 1024:  # 10MB
+            size = stat_result.st_size if stat_result else file_path.stat().st_size
+            if size > 10 * 1024 * 1024:  # 10MB
                 return False
         except:
             return False
         
         return True
     
-    def _index_file(self, file_path: Path) -> None:
-        """Index a single file."""
+    def _index_file(self, file_path: Path, stat_result: Optional[os.stat_result] = None) -> None:
+        """Index a single file, reusing cached parse results when it is unchanged."""
+        relative_path, signature, record = self._cached_record(file_path, stat_result)
+        if record is None:
+            record = self._parse_file(file_path, signature)
+            self._files_reparsed += 1
+        self._apply_record(relative_path, record)
+    
+    def _cached_record(
+        self, file_path: Path, stat_result: Optional[os.stat_result] = None
+    ) -> Tuple[Path, List[int], Optional[Dict[str, Any]]]:
+        """Return (relative path, signature, previous record if still valid)."""
         relative_path = file_path.relative_to(self.root_dir)
         
+        if stat_result is None:
+            stat_result = file_path.stat()
+        signature = [stat_result.st_mtime_ns, stat_result.st_size, stat_result.st_ino]
+        
+        record = self._previous_records.get(relative_path)
+        if record is not None and record.get('sig') == signature:
+            self._files_reused += 1
+            return relative_path, signature, record
+        return relative_path, signature, None
+    
+    def _parse_file(self, file_path: Path, signature: List[int]) -> Dict[str, Any]:
+        """Parse a file into a cacheable record."""
+        record: Dict[str, Any] = {'sig': signature}
+        record.update(parse_file(str(file_path)))
+        return record
+    
+    def _apply_record(self, relative_path: Path, record: Dict[str, Any]) -> None:
+        """Add a parsed file record to the lookup indices."""
+        self._file_records[relative_path] = record
+        self._dependency_graph = None
+        
         # Add to all files set
         self._all_files.add(relative_path)
         
         # Index by basename
-        basename = file_path.name
+        basename = relative_path.name
         self._basename_to_paths[basename].append(relative_path)
         
-        # For Python files, extract additional information
-        if file_path.suffix == '.py':
-            self._index_python_file(file_path, relative_path)
-    
-    def _index_python_file(self, file_path: Path, relative_path: Path) -> None:
-        """Extract Python-specific information from a file."""
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
-            
-            imports = set()
-            
-            # Quick regex-free parsing for common patterns
-            for line in content.splitlines():
-                line = line.strip()
-                
-                # Import statements
-                if line.startswith('import ') or line.startswith('from '):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        if parts[0] == 'import':
-                            imports.add(parts[1].split('.')[0])
-                        elif parts[0] == 'from' and len(parts) >= 3:
-                            imports.add(parts[1].split('.')[0])
-                
-                # Class definitions
-                if line.startswith('class ') and ':' in line:
-                    class_name = line[6:].split('(')[0].split(':')[0].strip()
-                    if class_name:
-                        self._class_definitions[class_name].append(relative_path)
-                
-                # Function definitions
-                if line.startswith('def ') and '(' in line:
-                    func_name = line[4:].split('(')[0].strip()
-                    if func_name:
-                        self._function_definitions[func_name].append(relative_path)
-            
-            if imports:
-                self._path_to_imports[relative_path] = imports
-                
-        except Exception as e:
-            logger.debug(f"Error indexing Python file {file_path}: {e}")
+        # Index path components for substring lookups
+        for component in {part.lower() for part in relative_path.parts}:
+            paths = self._component_paths[component]
+            if not paths:
+                for trigram in _trigrams(component):
+                    self._component_trigrams[trigram].add(component)
+            paths.add(relative_path)
+        
+        for symbol in map(Symbol.from_record, record.get('symbols', ())):
+            self._symbol_definitions[symbol.name].append((relative_path, symbol))
+            if symbol.kind in CLASS_KINDS:
+                self._class_definitions[symbol.name].append(relative_path)
+            elif symbol.kind in FUNCTION_KINDS:
+                self._function_definitions[symbol.name].append(relative_path)
+        
+        imports = record.get('imports')
+        if imports:
+            self._path_to_imports[relative_path] = set(imports)
+            for module in imports:
+                self._import_to_paths[module].add(relative_path)
     
     def lookup(self, query: str, file_type: Optional[str] = None) -> List[Path]:
         """Look up files matching a query.
@@ -242,16 +391,8 @@ class CodeIndex:
             if query in self._basename_to_paths:
                 results.update(self._basename_to_paths[query])
             
-            # Partial basename match
-            query_lower = query.lower()
-            for basename, paths in self._basename_to_paths.items():
-                if query_lower in basename.lower():
-                    results.update(paths)
-            
-            # Path component match
-            for file_path in self._all_files:
-                if query_lower in str(file_path).lower():
-                    results.add(file_path)
+            # Partial basename and path component matches
+            results.update(self._path_substring_matches(query.lower()))
             
             # Symbol matches (classes and functions)
             if query in self._class_definitions:
@@ -277,6 +418,35 @@ class CodeIndex:
             
             return sorted_results
     
+    def _path_substring_matches(self, query_lower: str) -> Set[Path]:
+        """Find files whose lowercase relative path contains ``query_lower``."""
+        if os.sep in query_lower:
+            # Spans several components; rare enough to answer with a scan
+            return {p for p in self._all_files if query_lower in str(p).lower()}
+        
+        if len(query_lower) < 3:
+            components = [c for c in self._component_paths if query_lower in c]
+        else:
+            # Intersect the rarest posting lists first, then verify
+            postings = []
+            for trigram in _trigrams(query_lower):
+                names = self._component_trigrams.get(trigram)
+                if not names:
+                    return set()
+                postings.append(names)
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for names in postings[1:]:
+                candidates &= names
+                if not candidates:
+                    return set()
+            components = [c for c in candidates if query_lower in c]
+        
+        results: Set[Path] = set()
+        for component in components:
+            results.update(self._component_paths[component])
+        return results
+    
     def get_all_files(self, file_type: Optional[str] = None) -> List[Path]:
         """Get all indexed files.
         
@@ -338,29 +508,67 @@ class CodeIndex:
             if not self._indexed:
                 self.build_index()
             
-            results = []
-            for file_path, imports in self._path_to_imports.items():
-                if module_name in imports:
-                    results.append(file_path)
+            return sorted(self._import_to_paths.get(module_name, ()))
+    
+    def find_definitions(self, name: str, kind: Optional[str] = None) -> List[Tuple[Path, Symbol]]:
+        """Find where a symbol is defined.
+        
+        Args:
+            name: Symbol name, or a qualified name such as "Server.start"
+            kind: Optional kind filter (class, function, method, struct, ...)
+        
+        Returns:
+            (file path relative to root, symbol) pairs ordered by path and line.
+        """
+        with self._lock:
+            if not self._indexed:
+                self.build_index()
             
-            return sorted(results)
+            short_name = name.rsplit('.', 1)[-1]
+            results = [
+                (path, symbol)
+                for path, symbol in self._symbol_definitions.get(short_name, ())
+                if (kind is None or symbol.kind == kind)
+                and ('.' not in name or symbol.qualname == name
+                     or symbol.qualname.endswith('.' + name))
+            ]
+            return sorted(results, key=lambda item: (str(item[0]), item[1].line))
+    
+    def get_file_symbols(self, path: str) -> List[Symbol]:
+        """Get the symbols defined in one indexed file, in source order."""
+        with self._lock:
+            if not self._indexed:
+                self.build_index()
+            
+            record = self._file_records.get(Path(path)) or {}
+            return [Symbol.from_record(item) for item in record.get('symbols', ())]
     
     def refresh(self, path: Optional[str] = None) -> None:
         """Refresh the index for a specific path or the entire repository.
         
         Args:
             path: Optional specific path to refresh. If None, refreshes everything.
+                A path that no longer exists is dropped along with anything under it.
         """
         with self._lock:
+            target_path = None
             if path:
-                # Refresh a specific file or directory
                 target_path = Path(path)
                 if not target_path.is_absolute():
                     target_path = self.root_dir / target_path
+                if target_path == self.root_dir:
+                    target_path = None
+            
+            if target_path is not None:
+                # Refresh a specific file or directory
+                relative_path = target_path.relative_to(self.root_dir)
                 
                 if target_path.is_file():
+                    if self._should_ignore_path(target_path, is_dir=False):
+                        return
                     # Re-index single file
-                    relative_path = target_path.relative_to(self.root_dir)
+                    if self._trigram_index is not None:
+                        self._trigram_index.update_file(str(relative_path))
                     
                     # Remove from indices
                     self._remove_from_indices(relative_path)
@@ -368,24 +576,86 @@ class CodeIndex:
                     # Re-index if it should be indexed
                     if self._should_index_file(target_path):
                         self._index_file(target_path)
+                        self._dir_cache.setdefault(target_path.parent, []).append(target_path)
                         
                 elif target_path.is_dir():
-                    # Remove all files under this directory
-                    prefix = str(target_path.relative_to(self.root_dir))
-                    to_remove = [p for p in self._all_files if str(p).startswith(prefix)]
-                    for p in to_remove:
-                        self._remove_from_indices(p)
-                    
                     # Re-scan directory
+                    self._remove_tree(relative_path)
                     self._scan_directory(target_path)
+                    if self._trigram_index is not None:
+                        self._trigram_index.update_tree(str(relative_path))
+                
+                else:
+                    # Deleted file or directory
+                    self._remove_tree(relative_path)
+                    if self._trigram_index is not None:
+                        self._trigram_index.update_file(str(relative_path))
+                        self._trigram_index.update_tree(str(relative_path))
             else:
                 # Full refresh
                 self.build_index(force=True)
+                if self._trigram_index is not None:
+                    self._trigram_index.build()
+    
+    @property
+    def is_built(self) -> bool:
+        """Whether the index has been built (or loaded) in this process."""
+        return self._indexed
+    
+    def get_trigram_index(self, build: bool = True, exclude_dirs: Optional[Set[str]] = None):
+        """Get the trigram content index for this repository.
+        
+        Args:
+            build: Build the index if it does not exist yet.
+            exclude_dirs: Extra directory names skipped when building, on top of
+                .gitignore rules and IGNORE_PATTERNS.
+        
+        Returns:
+            The TrigramIndex, or None if it has not been built and build is False.
+        """
+        with self._lock:
+            if self._trigram_index is None and build:
+                from tunacode.core.trigram_index import TrigramIndex
+                
+                index = TrigramIndex(
+                    self.root_dir,
+                    exclude_dirs=exclude_dirs,
+                    ignore_patterns=self.IGNORE_PATTERNS,
+                )
+                index.build()
+                self._trigram_index = index
+            return self._trigram_index
+    
+    def get_dependency_graph(self):
+        """Get the module dependency graph, building it from the index if needed.
+        
+        Returns:
+            A DependencyGraph over the indexed Python files.
+        """
+        with self._lock:
+            if not self._indexed:
+                self.build_index()
+            
+            if self._dependency_graph is None:
+                from tunacode.core.dependency_graph import DependencyGraph
+                
+                self._dependency_graph = DependencyGraph(self._file_records)
+            return self._dependency_graph
+    
+    def _remove_tree(self, relative_path: Path) -> None:
+        """Remove a file, or every file under a directory, from all indices."""
+        for p in [p for p in self._all_files if p == relative_path or relative_path in p.parents]:
+            self._remove_from_indices(p)
+        full_path = self.root_dir / relative_path
+        for directory in [d for d in self._dir_cache if d == full_path or full_path in d.parents]:
+            del self._dir_cache[directory]
     
     def _remove_from_indices(self, relative_path: Path) -> None:
-        """Remove a file from all indices."""
+        """Remove a file from all indices, touching only the entries it contributed."""
         # Remove from all files
         self._all_files.discard(relative_path)
+        record = self._file_records.pop(relative_path, None) or {}
+        self._dependency_graph = None
         
         # Remove from basename index
         basename = relative_path.name
@@ -396,16 +666,53 @@ class CodeIndex:
             if not self._basename_to_paths[basename]:
                 del self._basename_to_paths[basename]
         
+        # Remove from path component index
+        for component in {part.lower() for part in relative_path.parts}:
+            paths = self._component_paths.get(component)
+            if paths is None:
+                continue
+            paths.discard(relative_path)
+            if not paths:
+                del self._component_paths[component]
+                for trigram in _trigrams(component):
+                    names = self._component_trigrams.get(trigram)
+                    if names is not None:
+                        names.discard(component)
+                        if not names:
+                            del self._component_trigrams[trigram]
+        
+        # Remove from directory cache
+        dir_files = self._dir_cache.get(self.root_dir / relative_path.parent)
+        if dir_files:
+            self._dir_cache[self.root_dir / relative_path.parent] = [
+                p for p in dir_files if p != self.root_dir / relative_path
+            ]
+        
         # Remove from import index
-        if relative_path in self._path_to_imports:
-            del self._path_to_imports[relative_path]
+        for module in self._path_to_imports.pop(relative_path, ()):
+            paths = self._import_to_paths.get(module)
+            if paths is not None:
+                paths.discard(relative_path)
+                if not paths:
+                    del self._import_to_paths[module]
         
-        # Remove from symbol indices
-        for symbol_dict in [self._class_definitions, self._function_definitions]:
-            for symbol, paths in list(symbol_dict.items()):
-                symbol_dict[symbol] = [p for p in paths if p != relative_path]
-                if not symbol_dict[symbol]:
-                    del symbol_dict[symbol]
+        # Remove from symbol indices, using the file's own symbol list
+        names = {Symbol.from_record(item).name for item in record.get('symbols', ())}
+        for name in names:
+            for symbol_dict in (self._class_definitions, self._function_definitions):
+                paths = symbol_dict.get(name)
+                if paths is None:
+                    continue
+                symbol_dict[name] = [p for p in paths if p != relative_path]
+                if not symbol_dict[name]:
+                    del symbol_dict[name]
+            definitions = self._symbol_definitions.get(name)
+            if definitions is not None:
+                definitions = [d for d in definitions if d[0] != relative_path]
+                if definitions:
+                    self._symbol_definitions[name] = definitions
+                else:
+                    del self._symbol_definitions[name]
     
     def get_stats(self) -> Dict[str, int]:
         """Get indexing statistics.
@@ -420,5 +727,55 @@ class CodeIndex:
                 'python_files': len(self._path_to_imports),
                 'classes_indexed': len(self._class_definitions),
                 'functions_indexed': len(self._function_definitions),
+                'symbols_indexed': len(self._symbol_definitions),
                 'directories_cached': len(self._dir_cache),
-            }
\ No newline at end of file
+                'files_reused': self._files_reused,
+                'files_reparsed': self._files_reparsed,
+            }
+
+
+_shared_indexes: Dict[Path, CodeIndex] = {}
+_shared_lock = threading.Lock()
+
+
+def get_code_index(root_dir: Optional[str] = None, create: bool = True) -> Optional[CodeIndex]:
+    """Get the process-wide CodeIndex for a repository root.
+    
+    Args:
+        root_dir: Root directory to index. Defaults to current directory.
+        create: Create the index if none exists yet; otherwise return None.
+    
+    Returns:
+        A shared CodeIndex instance, created on first use.
+    """
+    root = Path(root_dir or os.getcwd()).resolve()
+    with _shared_lock:
+        index = _shared_indexes.get(root)
+        if index is None and create:
+            index = CodeIndex(str(root))
+            _shared_indexes[root] = index
+        return index
+
+
+def refresh_written_file(path: str) -> None:
+    """Update every shared index covering a file that a tool just wrote.
+    
+    Runs synchronously, so a search issued right after the write sees it
+    whether or not a file watcher is running.
+    
+    Args:
+        path: The written file, absolute or relative to the current directory.
+    """
+    full_path = Path(path).resolve()
+    with _shared_lock:
+        indexes = list(_shared_indexes.values())
+    
+    for index in indexes:
+        if index.root_dir not in full_path.parents:
+            continue
+        if not index.is_built and index.get_trigram_index(build=False) is None:
+            continue  # Nothing built yet; the first build reads the file anyway
+        try:
+            index.refresh(str(full_path))
+        except Exception as e:
+            logger.debug(f"Could not refresh index for {full_path}: {e}")
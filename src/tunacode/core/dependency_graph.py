@@ -0,0 +1,164 @@
+"""Module dependency graph over the files in a CodeIndex.
+
+Import targets recorded by the symbol parser are resolved to repository files:
+relative imports against the importing file's package, absolute imports
+against every module name a file can be imported under. The graph keeps
+forward and reverse edges, so both "what does X use" and "what depends on X"
+are adjacency lookups, and transitive closures are cached until the index
+changes.
+"""
+
+from collections import deque
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+PACKAGE_INIT = "__init__.py"
+
+
+def _module_names(
+    relative_path: Path, packages: Set[Path], top_level: Set[str]
+) -> Tuple[str, List[str]]:
+    """Return (package-qualified name, every importable name) for a Python file.
+
+    The package chain walks up through directories that contain __init__.py,
+    so "src/pkg/mod.py" is "pkg.mod" when "src" is not a package. When the
+    chain could start at several directories (a stray "src/__init__.py"), the
+    outermost one that some file actually imports from is preferred. The dotted
+    path from the repository root is always importable too, which covers
+    namespace packages and scripts run from the root.
+    """
+    parts = list(relative_path.with_suffix("").parts)
+    if parts[-1] == "__init__":
+        parts.pop()
+    directory = relative_path.parent
+    start = len(relative_path.parent.parts)
+    while start > 0 and directory in packages:
+        directory = directory.parent
+        start -= 1
+    imported = [k for k in range(start, len(parts)) if parts[k] in top_level]
+    names = [".".join(parts[k:]) for k in imported]
+    qualified = names[0] if names else ".".join(parts[start:])
+    for name in (qualified, ".".join(parts)):
+        if name and name not in names:
+            names.append(name)
+    return qualified, names
+
+
+class DependencyGraph:
+    """Forward and reverse import edges between repository files."""
+
+    def __init__(self, records: Dict[Path, Dict[str, Any]]):
+        """Build the graph from CodeIndex file records.
+
+        Args:
+            records: Relative path -> parsed record, as kept by CodeIndex
+        """
+        python_files = [path for path in records if path.suffix == ".py"]
+        packages = {path.parent for path in python_files if path.name == PACKAGE_INIT}
+        top_level = {
+            module.split(".")[0]
+            for path in python_files
+            for module in records[path].get("modules", ())
+            if not module.startswith(".")
+        }
+
+        self._module_to_path: Dict[str, Path] = {}
+        self._path_to_module: Dict[Path, str] = {}
+        for path in sorted(python_files, key=lambda p: (len(p.parts), str(p))):
+            qualified, names = _module_names(path, packages, top_level)
+            self._path_to_module[path] = qualified
+            for name in names:
+                # The shallowest file wins when two files claim the same name
+                self._module_to_path.setdefault(name, path)
+
+        self._forward: Dict[Path, Set[Path]] = {}
+        self._reverse: Dict[Path, Set[Path]] = {}
+        for path in python_files:
+            targets = set()
+            for module in records[path].get("modules", ()):
+                target = self._resolve(module, path)
+                if target is not None and target != path:
+                    targets.add(target)
+            self._forward[path] = targets
+            for target in targets:
+                self._reverse.setdefault(target, set()).add(path)
+
+        self._closures: Dict[Tuple[Path, bool], Set[Path]] = {}
+
+    def _resolve(self, module: str, importer: Path) -> Optional[Path]:
+        """Resolve an import target to a file, trying the longest module prefix first."""
+        if module.startswith("."):
+            level = len(module) - len(module.lstrip("."))
+            package = self._path_to_module.get(importer, "").split(".")
+            if importer.name != PACKAGE_INIT:
+                package = package[:-1]
+            if level - 1 > len(package):
+                return None
+            base = package[: len(package) - (level - 1)]
+            rest = module[level:]
+            module = ".".join(base + ([rest] if rest else []))
+            if not module:
+                return None
+        parts = module.split(".")
+        for end in range(len(parts), 0, -1):
+            path = self._module_to_path.get(".".join(parts[:end]))
+            if path is not None:
+                return path
+        return None
+
+    def module_path(self, module: str) -> Optional[Path]:
+        """Get the file a dotted module name resolves to."""
+        return self._module_to_path.get(module)
+
+    def module_name(self, path: Path) -> Optional[str]:
+        """Get the package-qualified module name of a file."""
+        return self._path_to_module.get(Path(path))
+
+    def resolve(self, target: str) -> Optional[Path]:
+        """Resolve a relative file path or a dotted module name to an indexed file."""
+        path = Path(target)
+        if path in self._forward:
+            return path
+        return self._module_to_path.get(target)
+
+    def dependencies(self, path: Path, transitive: bool = False) -> List[Path]:
+        """Files imported by a file, directly or transitively."""
+        return sorted(self._reach(Path(path), self._forward, transitive), key=str)
+
+    def dependents(self, path: Path, transitive: bool = False) -> List[Path]:
+        """Files that import a file, directly or transitively."""
+        return sorted(self._reach(Path(path), self._reverse, transitive), key=str)
+
+    def affected_files(self, paths: Iterable[Path]) -> List[Path]:
+        """Changed files plus everything that transitively depends on them."""
+        affected: Set[Path] = set()
+        for path in paths:
+            affected.add(Path(path))
+            affected.update(self._reach(Path(path), self._reverse, True))
+        return sorted(affected, key=str)
+
+    def _reach(self, start: Path, edges: Dict[Path, Set[Path]], transitive: bool) -> Set[Path]:
+        if not transitive:
+            return set(edges.get(start, ()))
+        key = (start, edges is self._forward)
+        closure = self._closures.get(key)
+        if closure is None:
+            closure = set()
+            queue = deque(edges.get(start, ()))
+            while queue:
+                node = queue.popleft()
+                if node in closure:
+                    continue
+                closure.add(node)
+                queue.extend(edges.get(node, ()))
+            closure.discard(start)
+            self._closures[key] = closure
+        return set(closure)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get graph size statistics."""
+        return {
+            "modules": len(self._path_to_module),
+            "edges": sum(len(targets) for targets in self._forward.values()),
+            "cached_closures": len(self._closures),
+        }
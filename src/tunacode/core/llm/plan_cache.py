@@ -0,0 +1,263 @@
+"""Module: tunacode.core.llm.plan_cache
+
+Cache of planner output for repeated and templated requests.
+Requests are normalized before lookup: whitespace is folded, and file
+references (``@file`` and quoted paths) become numbered placeholders, so
+"explain @foo.py" and "explain @bar.py" share one template. Case is kept,
+since identifiers, string literals and branch names in a request are
+case-sensitive. Stored plans keep the same placeholders and are filled with
+the new request's files on reuse. Entries are keyed by planner, model and a
+cheap repository fingerprint. A near-identical template can reuse a plan
+when its word similarity, ignoring case, clears a threshold, but only a
+read-only plan: the words that differ may be the very values a mutating
+plan writes. The cache is an LRU persisted under the TunaCode home directory.
+"""
+
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PLAN_CACHE_FILE = "plan_cache.json"
+PLAN_CACHE_VERSION = 2
+PLAN_CACHE_SIZE = 200
+PLAN_SIMILARITY = 0.9  # Minimum word-level similarity for reusing a near-identical template
+
+_FILE_REF = re.compile(r"@([\w\-./]+)|([\"'`])([\w\-./]+\.\w+)\2")
+_PLACEHOLDER = "<file{}>"
+
+
+def normalize_request(request: str) -> Tuple[str, List[str]]:
+    """Fold a request into a template and the file references it abstracts.
+
+    Returns:
+        (template, refs) where the template names each distinct reference as
+        ``<fileN>`` in order of first appearance.
+    """
+    refs: List[str] = []
+
+    def abstract(match: "re.Match") -> str:
+        path = match.group(1) or match.group(3)
+        if path not in refs:
+            refs.append(path)
+        return _PLACEHOLDER.format(refs.index(path))
+
+    template = _FILE_REF.sub(abstract, request.strip())
+    template = re.sub(r"\s+", " ", template).strip().rstrip(".!?")
+    return template, refs
+
+
+def repo_fingerprint(root: Optional[str] = None, refs: Optional[List[str]] = None) -> str:
+    """Hash the repository layout and which referenced files exist.
+
+    Only the root path and its top-level entries are read, so the fingerprint
+    survives ordinary edits and commits but changes when the project layout
+    changes or a referenced file appears or disappears.
+    """
+    root_path = Path(root or os.getcwd()).resolve()
+    try:
+        entries = sorted(os.listdir(root_path))
+    except OSError:
+        entries = []
+    existing = [(root_path / ref).exists() for ref in refs or ()]
+    payload = json.dumps([str(root_path), entries, existing])
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def _is_read_only(tasks: List[Any]) -> bool:
+    return all(isinstance(task, dict) and task.get("mutate") is False for task in tasks)
+
+
+def _replace_tokens(value: Any, pattern: "re.Pattern", replacements: Dict[str, str]) -> Any:
+    if isinstance(value, str):
+        return pattern.sub(lambda match: replacements[match.group(0)], value)
+    if isinstance(value, list):
+        return [_replace_tokens(item, pattern, replacements) for item in value]
+    if isinstance(value, dict):
+        return {key: _replace_tokens(item, pattern, replacements) for key, item in value.items()}
+    return value
+
+
+def _substitute(value: Any, replacements: Dict[str, str]) -> Any:
+    """Replace whole paths inside a JSON-like structure.
+
+    A path only matches where it is not part of a longer one, so "data.py"
+    leaves "metadata.py" and "src/data.py" alone. All paths are replaced in
+    one pass, so a substituted value is never matched again.
+    """
+    if not replacements:
+        return value
+    # Longest first, so a path wins over any shorter path it contains
+    alternatives = "|".join(map(re.escape, sorted(replacements, key=len, reverse=True)))
+    # A trailing "." only continues the path when more path characters follow it
+    pattern = re.compile(rf"(?<![\w\-./])(?:{alternatives})(?![\w\-/]|\.[\w\-/])")
+    return _replace_tokens(value, pattern, replacements)
+
+
+class PlanCache:
+    """Persistent LRU of plans keyed by planner, model, repo fingerprint and request template."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        maxsize: int = PLAN_CACHE_SIZE,
+        similarity: float = PLAN_SIMILARITY,
+    ):
+        self._path = path
+        self.maxsize = maxsize
+        self.similarity = similarity
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._loaded = False
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def _get_path(self) -> Path:
+        if self._path is None:
+            from tunacode.utils.system import get_tunacode_home
+
+            self._path = get_tunacode_home() / PLAN_CACHE_FILE
+        return self._path
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self._get_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable plan cache: {e}")
+            return
+        if data.get("version") != PLAN_CACHE_VERSION:
+            return
+        for entry in data.get("entries", [])[-self.maxsize :]:
+            self._entries[self._key(entry)] = entry
+
+    def _save(self) -> None:
+        data = {"version": PLAN_CACHE_VERSION, "entries": list(self._entries.values())}
+        try:
+            path = self._get_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Could not save plan cache: {e}")
+
+    @staticmethod
+    def _key(entry: Dict[str, Any]) -> str:
+        return "\x00".join(
+            [entry["planner"], entry["model"], entry["fingerprint"], entry["template"]]
+        )
+
+    def get(
+        self, planner: str, request: str, model: str, root: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Return a cached plan for the request with its file references filled in.
+
+        Args:
+            planner: Name of the planner whose output is cached
+            request: The user request
+            model: Model the plan would be generated with
+            root: Repository root (default: current directory)
+
+        Returns:
+            The plan's task dicts, or None on a miss.
+        """
+        template, refs = normalize_request(request)
+        fingerprint = repo_fingerprint(root, refs)
+        probe = {"planner": planner, "model": model, "fingerprint": fingerprint}
+        with self._lock:
+            self._load()
+            key = self._key({**probe, "template": template})
+            entry = self._entries.get(key)
+            if entry is not None:
+                self.hits += 1
+            else:
+                entry = self._most_similar(probe, template, len(refs))
+                if entry is None:
+                    self.misses += 1
+                    return None
+                key = self._key(entry)
+                self.similar_hits += 1
+            self._entries.move_to_end(key)
+            tasks = entry["tasks"]
+
+        replacements = {_PLACEHOLDER.format(i): ref for i, ref in enumerate(refs)}
+        return _substitute(tasks, replacements)
+
+    def _most_similar(
+        self, probe: Dict[str, Any], template: str, ref_count: int
+    ) -> Optional[Dict[str, Any]]:
+        words = template.lower().split()
+        best, best_ratio = None, self.similarity
+        for entry in self._entries.values():
+            if any(entry[field] != value for field, value in probe.items()):
+                continue
+            if entry["refs"] != ref_count or not _is_read_only(entry["tasks"]):
+                continue
+            ratio = difflib.SequenceMatcher(None, words, entry["template"].lower().split()).ratio()
+            if ratio >= best_ratio:
+                best, best_ratio = entry, ratio
+        return best
+
+    def put(
+        self,
+        planner: str,
+        request: str,
+        model: str,
+        tasks: List[Dict[str, Any]],
+        root: Optional[str] = None,
+    ) -> None:
+        """Store a plan, abstracting the request's file references out of it."""
+        template, refs = normalize_request(request)
+        replacements = {ref: _PLACEHOLDER.format(i) for i, ref in enumerate(refs)}
+        entry = {
+            "planner": planner,
+            "model": model,
+            "fingerprint": repo_fingerprint(root, refs),
+            "template": template,
+            "refs": len(refs),
+            "tasks": _substitute(tasks, replacements),
+        }
+        with self._lock:
+            self._load()
+            key = self._key(entry)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            self._save()
+
+    def clear(self) -> None:
+        """Drop every cached plan, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self._loaded = True
+            self._save()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get cache size and hit/miss counters."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+            }
+
+
+PLAN_CACHE = PlanCache()
@@ -14,17 +14,25 @@ Guidelines:
 3. Mark read-only tasks (reading files, searching, analyzing) as mutate: false
 4. Mark modifying tasks (writing, updating, creating files) as mutate: true
 5. Write clear, actionable descriptions
+6. Declare the files each task reads and writes - tasks touching different files run in parallel
 
 Each task MUST have:
 - id: Sequential number starting from 1
 - description: Clear description of what needs to be done
 - mutate: true if the task modifies files/code, false if it only reads/analyzes
+- reads: relative paths of files or directories the task reads ([] if unknown)
+- writes: relative paths of files the task creates or modifies ([] for read-only tasks)
+- depends_on: ids of earlier tasks whose results this task needs ([] if none)
 
 Return ONLY a valid JSON array of tasks, no other text.
 Example:
 [
-  {"id": 1, "description": "Read the main.py file to understand the structure", "mutate": false},
-  {"id": 2, "description": "Update the function to handle edge cases", "mutate": true}
+  {"id": 1, "description": "Read the main.py file to understand the structure", "mutate": false,
+   "reads": ["main.py"], "writes": [], "depends_on": []},
+  {"id": 2, "description": "Update the function to handle edge cases", "mutate": true,
+   "reads": ["main.py"], "writes": ["main.py"], "depends_on": [1]},
+  {"id": 3, "description": "Add a test for the edge cases", "mutate": true,
+   "reads": [], "writes": ["tests/test_main.py"], "depends_on": [1]}
 ]"""
 
 
@@ -34,6 +42,8 @@ async def make_plan(request: str, model: ModelName, state_manager: StateManager)
     from rich.console import Console
 
     from ..agents.main import get_agent_tool
+    from .plan_cache import PLAN_CACHE
+    from .providers import get_model
 
     console = Console()
     Agent, _ = get_agent_tool()
@@ -45,12 +55,24 @@ async def make_plan(request: str, model: ModelName, state_manager: StateManager)
         f"[dim][Planning] Request: {request[:200]}{'...' if len(request) > 200 else ''}[/dim]"
     )
 
+    use_cache = state_manager.session.user_config.get("settings", {}).get("plan_cache", True)
+    cached = PLAN_CACHE.get("make_plan", request, model) if use_cache else None
+    if cached is not None:
+        try:
+            tasks = [Task.model_validate(task) for task in cached]
+        except Exception:
+            tasks = []
+        if tasks:
+            console.print("[dim][Planning] Reusing cached plan[/dim]")
+            _show_plan(console, tasks)
+            return tasks
+
     # Get max retries from config (same as main agent)
     max_retries = state_manager.session.user_config.get("settings", {}).get("max_retries", 3)
 
     # Create a simple planning agent
     planner = Agent(
-        model=model,
+        model=get_model(model),
         system_prompt=_SYSTEM,
         result_type=List[Task],
         retries=max_retries,
@@ -79,11 +101,17 @@ async def make_plan(request: str, model: ModelName, state_manager: StateManager)
         # Re-raise to let caller handle it properly
         raise
 
-    # Display the plan
+    if use_cache and tasks:
+        PLAN_CACHE.put("make_plan", request, model, [task.model_dump() for task in tasks])
+
+    _show_plan(console, tasks)
+    return tasks
+
+
+def _show_plan(console, tasks: List[Task]) -> None:
+    """Display the plan."""
     console.print(f"[dim][Planning] Generated {len(tasks)} tasks:[/dim]")
     for task in tasks:
         task_type = "WRITE" if task.mutate else "READ"
         console.print(f"[dim]  Task {task.id}: {task_type} - {task.description}[/dim]")
     console.print("")
-
-    return tasks
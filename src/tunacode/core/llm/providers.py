@@ -0,0 +1,148 @@
+"""Module: tunacode.core.llm.providers
+
+Process-wide model and HTTP client factory.
+Every model call goes through one pooled ``httpx.AsyncClient``, so TLS
+sessions and keep-alive connections are reused by the main agent, sub-agents,
+planners, the feedback analyzer and the history summarizer. HTTP/2 is enabled
+when the optional ``h2`` package is installed, multiplexing concurrent calls
+to one provider over a single connection. Resolved pydantic-ai models are
+cached per model name and API key, so agents built per call still share the
+provider SDK client.
+"""
+
+import importlib.util
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+HTTP_TIMEOUT = 600.0  # Matches the provider SDK defaults for long completions
+HTTP_CONNECT_TIMEOUT = 5.0
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE = 20
+HTTP_KEEPALIVE_EXPIRY = 120.0  # Seconds an idle connection stays open between calls
+
+# Provider prefix -> (provider module, provider class, API key variable)
+_PROVIDERS: Dict[str, Tuple[str, str, str]] = {
+    "openai": ("pydantic_ai.providers.openai", "OpenAIProvider", "OPENAI_API_KEY"),
+    "anthropic": ("pydantic_ai.providers.anthropic", "AnthropicProvider", "ANTHROPIC_API_KEY"),
+    "google-gla": ("pydantic_ai.providers.google_gla", "GoogleGLAProvider", "GEMINI_API_KEY"),
+    "openrouter": ("pydantic_ai.providers.openrouter", "OpenRouterProvider", "OPENROUTER_API_KEY"),
+    "deepseek": ("pydantic_ai.providers.deepseek", "DeepSeekProvider", "DEEPSEEK_API_KEY"),
+    "groq": ("pydantic_ai.providers.groq", "GroqProvider", "GROQ_API_KEY"),
+}
+
+# Provider prefix -> (model module, model class)
+_MODELS: Dict[str, Tuple[str, str]] = {
+    "openai": ("pydantic_ai.models.openai", "OpenAIModel"),
+    "openrouter": ("pydantic_ai.models.openai", "OpenAIModel"),
+    "deepseek": ("pydantic_ai.models.openai", "OpenAIModel"),
+    "anthropic": ("pydantic_ai.models.anthropic", "AnthropicModel"),
+    "google-gla": ("pydantic_ai.models.gemini", "GeminiModel"),
+    "groq": ("pydantic_ai.models.groq", "GroqModel"),
+}
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.AsyncClient] = None
+_models: Dict[Tuple[str, Optional[str]], Any] = {}
+_stats = {"requests": 0, "clients_created": 0, "models_created": 0, "model_hits": 0}
+
+
+def http2_available() -> bool:
+    """Check whether httpx can negotiate HTTP/2 (needs the ``h2`` package)."""
+    return importlib.util.find_spec("h2") is not None
+
+
+async def _count_request(request: httpx.Request) -> None:
+    _stats["requests"] += 1
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared async HTTP client, creating it on first use or after it was closed."""
+    global _http_client
+    with _lock:
+        if _http_client is None or _http_client.is_closed:
+            # Models built on a closed client cannot be reused
+            _models.clear()
+            _http_client = httpx.AsyncClient(
+                http2=http2_available(),
+                timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+                limits=httpx.Limits(
+                    max_connections=HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+                ),
+                event_hooks={"request": [_count_request]},
+            )
+            _stats["clients_created"] += 1
+        return _http_client
+
+
+def _build_model(provider_name: str, model_name: str) -> Any:
+    provider_module, provider_class, _ = _PROVIDERS[provider_name]
+    model_module, model_class = _MODELS[provider_name]
+    provider_cls = getattr(importlib.import_module(provider_module), provider_class)
+    model_cls = getattr(importlib.import_module(model_module), model_class)
+    return model_cls(model_name, provider=provider_cls(http_client=get_http_client()))
+
+
+def credential_key(model: str) -> Optional[str]:
+    """Get the API key a model is built with, or None when this factory does not build it."""
+    provider = _PROVIDERS.get(model.partition(":")[0])
+    return os.environ.get(provider[2]) if provider is not None else None
+
+
+def get_model(model: str) -> Any:
+    """Resolve a "provider:name" model string to a pydantic-ai model on the shared client.
+
+    Models are cached per name and current API key, so changing a key in the
+    environment builds a fresh model. Providers this factory does not know,
+    and models that fail to build (a missing key or SDK), are returned as the
+    plain string so pydantic-ai resolves them and reports errors as before.
+    """
+    provider_name, _, model_name = model.partition(":")
+    if not model_name or provider_name not in _PROVIDERS:
+        return model
+    key = (model, credential_key(model))
+    with _lock:
+        cached = _models.get(key)
+        if cached is not None:
+            _stats["model_hits"] += 1
+            return cached
+    try:
+        built = _build_model(provider_name, model_name)
+    except Exception:
+        return model
+    with _lock:
+        cached = _models.setdefault(key, built)
+        if cached is built:
+            _stats["models_created"] += 1
+        return cached
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Get request counters and the shared client's connection pool state."""
+    with _lock:
+        stats: Dict[str, Any] = dict(_stats)
+        stats["models_cached"] = len(_models)
+        client = _http_client
+    stats["http2"] = http2_available()
+    connections = []
+    if client is not None and not client.is_closed:
+        # httpx does not expose pool state publicly; read it best-effort
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections = list(getattr(pool, "connections", ()))
+    stats["connections"] = len(connections)
+    stats["idle_connections"] = sum(1 for c in connections if c.is_idle())
+    return stats
+
+
+async def close_http_client() -> None:
+    """Close the shared client and drop cached models that hold it."""
+    global _http_client
+    with _lock:
+        client, _http_client = _http_client, None
+        _models.clear()
+    if client is not None and not client.is_closed:
+        await client.aclose()
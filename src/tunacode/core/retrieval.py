@@ -0,0 +1,410 @@
+"""Module: tunacode.core.retrieval
+
+Chunk-level BM25 retrieval over the repository.
+Files are split into function- and class-sized chunks, indexed with SparseBM25,
+and cached on disk between runs. Only files whose mtime or size changed are
+re-chunked when the index is refreshed.
+"""
+
+import ast
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from tunacode.utils.bm25 import SparseBM25, tokenize
+from tunacode.utils.file_cache import FILE_CACHE
+from tunacode.utils.ignore import COMMON_IGNORE_PATTERNS, DEFAULT_IGNORE_PATTERNS, IgnoreMatcher
+
+logger = logging.getLogger(__name__)
+
+# Bump when the on-disk layout or chunking changes so stale caches are discarded
+RETRIEVAL_CACHE_VERSION = 1
+RETRIEVAL_CACHE_SUBDIR = "retrieval"
+
+# fmt: off
+RETRIEVAL_EXTENSIONS = {
+    ".py", ".js", ".jsx", ".ts", ".tsx", ".java", ".c", ".cpp", ".h", ".hpp",
+    ".go", ".rs", ".rb", ".php", ".cs", ".kt", ".swift", ".scala", ".sh",
+    ".md", ".rst", ".txt",
+}
+# fmt: on
+MAX_RETRIEVAL_FILE_SIZE = 512 * 1024  # Larger files are usually generated or data
+MAX_CHUNK_LINES = 80  # Oversized definitions are split into windows of this size
+MAX_SNIPPET_LINES = 40  # Lines shown per result
+REFRESH_INTERVAL = 5.0  # Seconds between automatic stat walks
+
+# Start of a definition in brace/indent languages that have no stdlib parser here
+_DEFINITION_RE = re.compile(
+    r"^(?:export\s+)?(?:default\s+)?(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:static\s+)?"
+    r"(?:def|class|function|func|fn|interface|struct|enum|impl|trait|type|module)\s+"
+    r"([A-Za-z_$][\w$]*)"
+)
+_HEADING_RE = re.compile(r"^#{1,6}\s+(.*)")
+_SUBWORD_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+@dataclass
+class Snippet:
+    """A ranked chunk of a file."""
+
+    path: str
+    start_line: int
+    end_line: int
+    name: Optional[str]
+    score: float
+    text: str
+
+
+def code_tokens(text: str) -> List[str]:
+    """Tokenize text, also emitting the parts of snake_case and camelCase identifiers."""
+    tokens = []
+    for token in re.findall(r"\w+", text):
+        lowered = token.lower()
+        tokens.append(lowered)
+        if "_" in token or not (token.islower() or token.isupper()):
+            parts = [p.lower() for p in _SUBWORD_RE.findall(token)]
+            if len(parts) > 1:
+                tokens.extend(parts)
+    return tokens
+
+
+def _split_oversized(
+    start: int, end: int, name: Optional[str]
+) -> List[Tuple[int, int, Optional[str]]]:
+    if end - start + 1 <= MAX_CHUNK_LINES:
+        return [(start, end, name)]
+    return [
+        (s, min(s + MAX_CHUNK_LINES - 1, end), name)
+        for s in range(start, end + 1, MAX_CHUNK_LINES)
+    ]
+
+
+def _fill_gaps(
+    spans: List[Tuple[int, int, Optional[str]]], total_lines: int
+) -> List[Tuple[int, int, Optional[str]]]:
+    """Cover lines between definitions (imports, module code) with unnamed chunks."""
+    chunks = []
+    line = 1
+    for start, end, name in sorted(spans):
+        if start > line:
+            chunks.extend(_split_oversized(line, start - 1, None))
+        if end >= line:
+            chunks.extend(_split_oversized(max(start, line), end, name))
+            line = end + 1
+    if line <= total_lines:
+        chunks.extend(_split_oversized(line, total_lines, None))
+    return chunks
+
+
+def _python_spans(source: str) -> Optional[List[Tuple[int, int, Optional[str]]]]:
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return None
+
+    def node_start(node) -> int:
+        decorators = getattr(node, "decorator_list", [])
+        return min([node.lineno] + [d.lineno for d in decorators])
+
+    defs = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+    spans = []
+    for node in tree.body:
+        if not isinstance(node, defs):
+            continue
+        start, end = node_start(node), node.end_lineno
+        if isinstance(node, ast.ClassDef) and end - start + 1 > MAX_CHUNK_LINES:
+            # Large classes are indexed per method plus the class header
+            methods = [n for n in node.body if isinstance(n, defs)]
+            header_end = node_start(methods[0]) - 1 if methods else end
+            spans.append((start, header_end, node.name))
+            for method in methods:
+                spans.append((node_start(method), method.end_lineno, f"{node.name}.{method.name}"))
+        else:
+            spans.append((start, end, node.name))
+    return spans
+
+
+def _regex_spans(lines: List[str], is_markdown: bool) -> List[Tuple[int, int, Optional[str]]]:
+    starts = []
+    for number, line in enumerate(lines, 1):
+        match = _HEADING_RE.match(line) if is_markdown else _DEFINITION_RE.match(line)
+        if match:
+            starts.append((number, match.group(1).strip()))
+    spans = []
+    for i, (start, name) in enumerate(starts):
+        end = starts[i + 1][0] - 1 if i + 1 < len(starts) else len(lines)
+        spans.append((start, end, name))
+    return spans
+
+
+def chunk_source(path: str, source: str) -> List[Tuple[int, int, Optional[str]]]:
+    """Split a file into (start_line, end_line, name) chunks, 1-based and inclusive."""
+    lines = source.splitlines()
+    if not lines:
+        return []
+    suffix = Path(path).suffix.lower()
+    spans = _python_spans(source) if suffix == ".py" else None
+    if spans is None:
+        spans = _regex_spans(lines, suffix in (".md", ".rst"))
+    return _fill_gaps(spans, len(lines))
+
+
+class CodeRetriever:
+    """Persistent chunk-level BM25 index for a repository."""
+
+    def __init__(
+        self,
+        root_dir: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+        persist: bool = True,
+    ):
+        """Initialize the retriever.
+
+        Args:
+            root_dir: Repository root. Defaults to current directory.
+            cache_dir: Directory for the persisted index. Defaults to ~/.tunacode/retrieval.
+            persist: Whether to load and save the index on disk between runs.
+        """
+        self.root_dir = Path(root_dir or os.getcwd()).resolve()
+        self._cache_dir = Path(cache_dir) if cache_dir else None
+        self._persist = persist
+        self._lock = threading.RLock()
+
+        self._bm25 = SparseBM25()
+        # rel path -> {"signature": [mtime_ns, size], "chunks": [[start, end, name, tokens]]}
+        self._files: Dict[str, Dict] = {}
+        self._loaded = False
+        self._last_refresh = 0.0
+
+    def _get_cache_path(self) -> Path:
+        if self._cache_dir is not None:
+            cache_dir = self._cache_dir
+        else:
+            from tunacode.utils.system import get_tunacode_home
+
+            cache_dir = get_tunacode_home() / RETRIEVAL_CACHE_SUBDIR
+        digest = hashlib.sha1(str(self.root_dir).encode("utf-8")).hexdigest()[:16]
+        return cache_dir / f"{digest}.json"
+
+    def _load_cache(self) -> None:
+        if not self._persist:
+            return
+        try:
+            with open(self._get_cache_path(), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != RETRIEVAL_CACHE_VERSION or data.get("root") != str(
+            self.root_dir
+        ):
+            return
+        for rel_path, record in data.get("files", {}).items():
+            self._add_record(rel_path, record)
+
+    def save_cache(self) -> None:
+        """Write the index to disk atomically."""
+        if not self._persist:
+            return
+        cache_path = self._get_cache_path()
+        tmp_path = cache_path.with_suffix(".tmp")
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                data = {
+                    "version": RETRIEVAL_CACHE_VERSION,
+                    "root": str(self.root_dir),
+                    "files": self._files,
+                }
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not save retrieval index: {e}")
+
+    def _add_record(self, rel_path: str, record: Dict) -> None:
+        self._files[rel_path] = record
+        path_tokens = code_tokens(rel_path)
+        for start, end, name, tokens in record["chunks"]:
+            self._bm25.add_document((rel_path, start), tokens=tokens.split() + path_tokens)
+
+    def _remove_record(self, rel_path: str) -> None:
+        record = self._files.pop(rel_path, None)
+        if record:
+            for chunk in record["chunks"]:
+                self._bm25.remove_document((rel_path, chunk[0]))
+
+    def _iter_files(self):
+        """Yield (rel_path, stat) for indexable files, respecting ignore rules."""
+        matcher = IgnoreMatcher(
+            self.root_dir,
+            patterns=COMMON_IGNORE_PATTERNS,
+            fallback_patterns=DEFAULT_IGNORE_PATTERNS,
+        )
+
+        for current, rel_root, _, files in matcher.walk():
+            for name in files:
+                if Path(name).suffix.lower() not in RETRIEVAL_EXTENSIONS:
+                    continue
+                rel_path = os.path.join(rel_root, name) if rel_root else name
+                try:
+                    st = os.stat(os.path.join(current, name))
+                except OSError:
+                    continue
+                if st.st_size <= MAX_RETRIEVAL_FILE_SIZE:
+                    yield rel_path, st
+
+    def _chunk_file(self, rel_path: str, signature: List[int]) -> Optional[Dict]:
+        try:
+            with open(self.root_dir / rel_path, "r", encoding="utf-8") as f:
+                source = f.read()
+        except (OSError, UnicodeDecodeError):
+            return None
+        lines = source.splitlines()
+        chunks = []
+        for start, end, name in chunk_source(rel_path, source):
+            text = "\n".join(lines[start - 1 : end])
+            if name:
+                text = f"{name}\n{text}"
+            tokens = code_tokens(text)
+            if tokens:
+                chunks.append([start, end, name, " ".join(tokens)])
+        return {"signature": signature, "chunks": chunks}
+
+    def refresh(self) -> Dict[str, int]:
+        """Re-chunk changed files, drop deleted ones and persist if anything changed.
+
+        Returns:
+            Counts of files that were added or updated, removed, and unchanged.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._load_cache()
+                self._loaded = True
+
+            updated = unchanged = 0
+            seen = set()
+            for rel_path, st in self._iter_files():
+                seen.add(rel_path)
+                signature = [st.st_mtime_ns, st.st_size]
+                previous = self._files.get(rel_path)
+                if previous is not None and previous["signature"] == signature:
+                    unchanged += 1
+                    continue
+                self._remove_record(rel_path)
+                record = self._chunk_file(rel_path, signature)
+                if record is not None:
+                    self._add_record(rel_path, record)
+                updated += 1
+
+            removed = [p for p in self._files if p not in seen]
+            for rel_path in removed:
+                self._remove_record(rel_path)
+
+            self._last_refresh = time.monotonic()
+            if updated or removed:
+                self.save_cache()
+            return {"updated": updated, "removed": len(removed), "unchanged": unchanged}
+
+    def update_file(self, rel_path: str) -> None:
+        """Re-index a single file, or drop it if it no longer exists."""
+        with self._lock:
+            rel_path = str(rel_path)
+            self._remove_record(rel_path)
+            try:
+                st = os.stat(self.root_dir / rel_path)
+            except OSError:
+                return
+            if (
+                Path(rel_path).suffix.lower() in RETRIEVAL_EXTENSIONS
+                and st.st_size <= MAX_RETRIEVAL_FILE_SIZE
+            ):
+                record = self._chunk_file(rel_path, [st.st_mtime_ns, st.st_size])
+                if record is not None:
+                    self._add_record(rel_path, record)
+
+    def update_path(self, rel_path: str) -> None:
+        """Apply a change to a file or directory reported by the file watcher."""
+        with self._lock:
+            if not self._loaded:
+                return  # The first search refreshes everything anyway
+            rel_path = str(rel_path)
+            full_path = self.root_dir / rel_path
+            if full_path.is_dir() or (not full_path.exists() and rel_path not in self._files):
+                # Directories are re-statted rather than tracked file by file
+                self.refresh()
+            else:
+                self.update_file(rel_path)
+
+    def search(self, query: str, k: int = 5, refresh: bool = True) -> List[Snippet]:
+        """Return the k best-matching chunks for a free-text query.
+
+        Args:
+            query: Natural language or identifier query
+            k: Maximum number of snippets
+            refresh: Re-stat the tree first if the last refresh is older than REFRESH_INTERVAL,
+                unless a file watcher is already pushing changes in
+        """
+        from tunacode.core.watcher import is_watched
+
+        with self._lock:
+            if refresh and (
+                not self._loaded
+                or (
+                    time.monotonic() - self._last_refresh > REFRESH_INTERVAL
+                    and not is_watched(self.root_dir)
+                )
+            ):
+                self.refresh()
+
+            query_tokens = code_tokens(query) or tokenize(query)
+            ranked = self._bm25.top_k(query_tokens, k)
+            chunk_info = {}
+            for (rel_path, start), _ in ranked:
+                for chunk in self._files[rel_path]["chunks"]:
+                    if chunk[0] == start:
+                        chunk_info[(rel_path, start)] = chunk
+                        break
+
+        snippets = []
+        for (rel_path, start), score in ranked:
+            _, end, name, _ = chunk_info[(rel_path, start)]
+            try:
+                lines = FILE_CACHE.read(str(self.root_dir / rel_path)).splitlines()
+            except (OSError, UnicodeDecodeError):
+                continue
+            shown_end = min(end, start + MAX_SNIPPET_LINES - 1)
+            text = "\n".join(lines[start - 1 : shown_end])
+            snippets.append(Snippet(rel_path, start, shown_end, name, score, text))
+        return snippets
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index size statistics."""
+        with self._lock:
+            return {"files": len(self._files), "chunks": len(self._bm25)}
+
+
+_shared_retrievers: Dict[Path, CodeRetriever] = {}
+_shared_lock = threading.Lock()
+
+
+def get_code_retriever(
+    root_dir: Optional[str] = None, create: bool = True
+) -> Optional[CodeRetriever]:
+    """Get the process-wide CodeRetriever for a repository root.
+
+    Returns None instead of creating one when ``create`` is False.
+    """
+    root = Path(root_dir or os.getcwd()).resolve()
+    with _shared_lock:
+        retriever = _shared_retrievers.get(root)
+        if retriever is None and create:
+            retriever = CodeRetriever(str(root))
+            _shared_retrievers[root] = retriever
+        return retriever
@@ -5,9 +5,10 @@ Handles user preferences, conversation history, and runtime state.
 """
 
 import uuid
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import Any, Optional
 
+from tunacode.core.telemetry import SessionTelemetry
 from tunacode.types import (DeviceId, InputSessions, MessageHistory, ModelName, SessionId, ToolName,
                             UserConfig)
 
@@ -35,15 +36,58 @@ class SessionState:
     tool_calls: list[dict[str, Any]] = field(default_factory=list)
     iteration_count: int = 0
     current_iteration: int = 0
+    # Token size of message history + user message sent with the last request
+    prompt_tokens: int = 0
+    # Background history summary awaiting application (see agents.compaction)
+    pending_compaction: Optional[Any] = None
+    # Per-node latency, token and cost metrics
+    telemetry: SessionTelemetry = field(default_factory=SessionTelemetry)
 
 
 class StateManager:
     def __init__(self):
         self._session = SessionState()
+        # Length of the parent's history when this manager was forked
+        self._fork_base = 0
 
     @property
     def session(self) -> SessionState:
         return self._session
 
+    def fork(self) -> "StateManager":
+        """Create a session view for a sub-agent that runs alongside others.
+
+        The view shares configuration, agents, permissions and telemetry with
+        this session, but has its own copy of the message history and its own
+        per-request counters, so concurrent sub-agents never interleave their
+        messages. Forks do not compact their history; the parent does on its
+        next request. Hand the fork's work back with ``join``.
+        """
+        session = self._session
+        settings = {**session.user_config.get("settings", {}), "auto_compact": False}
+        forked = StateManager()
+        forked._session = replace(
+            session,
+            user_config={**session.user_config, "settings": settings},
+            messages=list(session.messages),
+            total_cost=0.0,
+            files_in_context=set(session.files_in_context),
+            tool_calls=[],
+            iteration_count=0,
+            current_iteration=0,
+            prompt_tokens=0,
+            pending_compaction=None,
+        )
+        forked._fork_base = len(session.messages)
+        return forked
+
+    def join(self, forked: "StateManager") -> None:
+        """Append a fork's new messages, tool calls and cost to this session."""
+        session, child = self._session, forked.session
+        session.messages.extend(child.messages[forked._fork_base :])
+        session.tool_calls.extend(child.tool_calls)
+        session.files_in_context |= child.files_in_context
+        session.total_cost += child.total_cost
+
     def reset_session(self):
         self._session = SessionState()
@@ -0,0 +1,376 @@
+"""Symbol extraction for CodeIndex.
+
+Python files are parsed with ``ast``, which gives exact qualified names and
+line spans for classes, functions, async functions and methods. Brace-delimited
+languages (JavaScript/TypeScript, Go, Rust, Java, C#) go through a lightweight
+tokenizer: comments and string literals are blanked out, declarations are
+recognized per line, and brace depth gives each declaration its end line and
+enclosing container. Files are parsed in the shared worker process pool when
+a build has many of them to parse.
+"""
+
+import ast
+import os
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Pattern, Set, Tuple
+
+from tunacode.utils.process_pool import get_process_pool
+
+POOL_MIN_FILES = 200  # Fewer files parse faster in-process than pool dispatch costs
+POOL_CHUNK = 64  # Files per worker task
+
+# Kinds that can contain methods
+CONTAINER_KINDS = {"class", "interface", "struct", "enum", "trait", "impl"}
+CLASS_KINDS = {"class", "interface", "struct", "enum", "trait", "type"}
+FUNCTION_KINDS = {"function", "method"}
+
+
+@dataclass(frozen=True)
+class Symbol:
+    """A definition located in a file. Lines are 1-based and inclusive."""
+
+    name: str
+    kind: str  # class, function, method, interface, struct, enum, trait, type
+    qualname: str  # Dotted path of enclosing definitions, e.g. "Server.start"
+    line: int
+    end_line: int
+
+    def to_record(self) -> list:
+        return [self.kind, self.qualname, self.line, self.end_line]
+
+    @classmethod
+    def from_record(cls, record: list) -> "Symbol":
+        kind, qualname, line, end_line = record
+        return cls(qualname.rsplit(".", 1)[-1], kind, qualname, line, end_line)
+
+
+# ---------------------------------------------------------------- Python
+
+
+def _python_symbols(source: str) -> Tuple[List[Symbol], Set[str], Set[str]]:
+    tree = ast.parse(source)
+    symbols: List[Symbol] = []
+    imports: Set[str] = set()
+    # Full import targets; relative ones keep their leading dots
+    modules: Set[str] = set()
+
+    def visit(nodes, prefix: str, in_class: bool) -> None:
+        for node in nodes:
+            if isinstance(node, ast.ClassDef):
+                qualname = prefix + node.name
+                symbols.append(Symbol(node.name, "class", qualname, node.lineno, node.end_lineno))
+                visit(node.body, qualname + ".", True)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                qualname = prefix + node.name
+                kind = "method" if in_class else "function"
+                symbols.append(Symbol(node.name, kind, qualname, node.lineno, node.end_lineno))
+                visit(node.body, qualname + ".", False)
+            elif isinstance(node, ast.Import):
+                imports.update(alias.name.split(".")[0] for alias in node.names)
+                modules.update(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.module and not node.level:
+                    imports.add(node.module.split(".")[0])
+                base = "." * node.level + (node.module or "")
+                modules.add(base)
+                # "from pkg import name" may name a submodule
+                separator = "." if node.module else ""
+                modules.update(
+                    base + separator + alias.name for alias in node.names if alias.name != "*"
+                )
+            elif isinstance(node, ast.stmt):
+                # Definitions under if/try/with/for blocks keep the enclosing scope
+                for field in ("body", "orelse", "finalbody", "handlers"):
+                    visit(getattr(node, field, ()), prefix, in_class)
+            elif isinstance(node, ast.ExceptHandler):
+                visit(node.body, prefix, in_class)
+
+    visit(tree.body, "", False)
+    return symbols, imports, modules
+
+
+def _python_fallback(source: str) -> Tuple[List[Symbol], Set[str], Set[str]]:
+    """Line-based extraction for files ``ast`` cannot parse."""
+    symbols: List[Symbol] = []
+    imports: Set[str] = set()
+    modules: Set[str] = set()
+    for number, raw in enumerate(source.splitlines(), 1):
+        line = raw.strip()
+        parts = line.split()
+        if len(parts) >= 2 and parts[0] == "import":
+            imports.add(parts[1].split(".")[0])
+            modules.add(parts[1].rstrip(","))
+        elif len(parts) >= 3 and parts[0] == "from":
+            if not parts[1].startswith("."):
+                imports.add(parts[1].split(".")[0])
+            modules.add(parts[1])
+        match = re.match(r"(?:async\s+)?(class|def)\s+(\w+)", line)
+        if match:
+            kind = "class" if match.group(1) == "class" else "function"
+            symbols.append(Symbol(match.group(2), kind, match.group(2), number, number))
+    return symbols, imports, modules
+
+
+# ---------------------------------------------------------------- Brace languages
+
+_COMMENT_AND_STRING = r'//[^\n]*|/\*.*?\*/|"(?:\\.|[^"\\\n])*"|`(?:\\.|[^`\\])*`'
+_STRING_OR_COMMENT = re.compile(_COMMENT_AND_STRING + r"|'(?:\\.|[^'\\\n])*'", re.DOTALL)
+# In Rust a lone quote starts a lifetime, so only one-character literals are strings
+_RUST_STRING_OR_COMMENT = re.compile(_COMMENT_AND_STRING + r"|'(?:\\.|[^'\\\n])'", re.DOTALL)
+_BRACES = re.compile(r"[{};]")
+
+
+def _blank(match: "re.Match") -> str:
+    """Replace a comment or literal with spaces, keeping its newlines."""
+    text = match.group()
+    quote = text[0] if text[0] in "\"'`" else ""
+    body = re.sub(r"[^\n]", " ", text[len(quote) : len(text) - len(quote)])
+    return quote + body + quote
+
+
+_JS_RULES = [
+    (re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(\w+)"), "class"),
+    (re.compile(r"^\s*(?:export\s+)?(?:declare\s+)?interface\s+(\w+)"), "interface"),
+    (re.compile(r"^\s*(?:export\s+)?(?:declare\s+)?(?:const\s+)?enum\s+(\w+)"), "enum"),
+    (re.compile(r"^\s*(?:export\s+)?(?:declare\s+)?type\s+(\w+)\s*(?:<[^=]*>)?\s*="), "type"),
+    (
+        re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(\w+)"),
+        "function",
+    ),
+    (
+        re.compile(
+            r"^\s*(?:export\s+)?(?:const|let|var)\s+(\w+)\s*(?::[^=]+)?=\s*(?:async\s+)?"
+            r"(?:function\b|(?:\([^)]*\)|\w+)\s*(?::[^=]+)?=>)"
+        ),
+        "function",
+    ),
+]
+_JS_METHOD = re.compile(
+    r"^\s*(?:(?:public|private|protected|static|async|readonly|override|abstract|get|set)\s+)*"
+    r"\*?\s*(#?\w+)\s*(?:<[^>]*>)?\s*\((?:[^;]*$|[^;{]*\)[^;{]*\{)"
+)
+
+_GO_RULES = [
+    (re.compile(r"^func\s+\(\s*(?:\w+\s+)?\*?(\w+)(?:\[[^\]]*\])?\s*\)\s*(\w+)"), "method"),
+    (re.compile(r"^func\s+(\w+)"), "function"),
+    (re.compile(r"^type\s+(\w+)(?:\[[^\]]*\])?\s+struct\b"), "struct"),
+    (re.compile(r"^type\s+(\w+)(?:\[[^\]]*\])?\s+interface\b"), "interface"),
+    (re.compile(r"^type\s+(\w+)\b"), "type"),
+]
+
+_RUST_VIS = r"^\s*(?:pub(?:\([^)]*\))?\s+)?"
+_RUST_RULES = [
+    (
+        re.compile(
+            _RUST_VIS + r"(?:default\s+)?(?:const\s+)?(?:async\s+)?(?:unsafe\s+)?"
+            r'(?:extern\s+"[^"]*"\s+)?fn\s+(\w+)'
+        ),
+        "function",
+    ),
+    (re.compile(_RUST_VIS + r"struct\s+(\w+)"), "struct"),
+    (re.compile(_RUST_VIS + r"enum\s+(\w+)"), "enum"),
+    (re.compile(_RUST_VIS + r"(?:unsafe\s+)?trait\s+(\w+)"), "trait"),
+    (re.compile(_RUST_VIS + r"type\s+(\w+)"), "type"),
+    # impl blocks are containers only: their methods are qualified by the type
+    (
+        re.compile(
+            r"^\s*(?:unsafe\s+)?impl\b(?:\s*<[^{]*?>)?\s+(?:[\w:<>, &']+\s+for\s+)?"
+            r"(?:[\w]+::)*(\w+)"
+        ),
+        "impl",
+    ),
+]
+
+_JAVA_MODIFIERS = (
+    r"(?:(?:public|private|protected|internal|static|final|abstract|sealed|partial|"
+    r"virtual|override|async|synchronized|native|default|readonly|unsafe|extern|new)\s+)*"
+)
+_JAVA_RULES = [
+    (re.compile(r"^\s*" + _JAVA_MODIFIERS + r"(?:class|record)\s+(\w+)"), "class"),
+    (re.compile(r"^\s*" + _JAVA_MODIFIERS + r"(?:interface|@interface)\s+(\w+)"), "interface"),
+    (re.compile(r"^\s*" + _JAVA_MODIFIERS + r"enum\s+(\w+)"), "enum"),
+    (re.compile(r"^\s*" + _JAVA_MODIFIERS + r"struct\s+(\w+)"), "struct"),
+]
+_JAVA_METHOD = re.compile(
+    r"^\s*(?:@\w+(?:\([^)]*\))?\s+)*" + _JAVA_MODIFIERS + r"(?:<[^>]+>\s+)?"
+    r"(?:[\w.\[\]<>?,]+\s+)?(\w+)\s*\((?:[^;]*$|[^;{]*\)[^;{]*\{)"
+)
+
+_NOT_METHODS = {
+    "if", "for", "while", "switch", "catch", "return", "function", "new", "else", "do",
+    "try", "typeof", "await", "yield", "throw", "delete", "super", "this", "using", "lock",
+    "foreach", "synchronized",
+}  # fmt: skip
+
+LANGUAGES: Dict[str, Tuple[List[Tuple[Pattern, str]], Optional[Pattern]]] = {
+    "javascript": (_JS_RULES, _JS_METHOD),
+    "go": (_GO_RULES, None),
+    "rust": (_RUST_RULES, None),
+    "java": (_JAVA_RULES, _JAVA_METHOD),
+}
+
+EXTENSION_LANGUAGES = {
+    ".py": "python",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "javascript",
+    ".tsx": "javascript",
+    ".go": "go",
+    ".rs": "rust",
+    ".java": "java",
+    ".cs": "java",
+}
+
+
+def _brace_symbols(source: str, language: str) -> List[Symbol]:
+    rules, method_rule = LANGUAGES[language]
+    literals = _RUST_STRING_OR_COMMENT if language == "rust" else _STRING_OR_COMMENT
+    lines = literals.sub(_blank, source).split("\n")
+    symbols: List[Symbol] = []
+    # Open definitions: (symbol or container, depth outside its body)
+    stack: List[Tuple[Symbol, int]] = []
+    awaiting: Optional[Symbol] = None  # Declaration whose "{" has not been seen yet
+    depth = 0
+
+    def record(symbol: Symbol) -> None:
+        if symbol.kind != "impl":
+            symbols.append(symbol)
+
+    for number, line in enumerate(lines, 1):
+        container = stack[-1][0] if stack else None
+        in_body = container is not None and stack[-1][1] + 1 == depth
+        symbol = None
+
+        for regex, kind in rules:
+            match = regex.match(line)
+            if not match:
+                continue
+            if kind == "method" and language == "go":
+                receiver, name = match.group(1), match.group(2)
+                symbol = Symbol(name, "method", f"{receiver}.{name}", number, number)
+            else:
+                name = match.group(1)
+                if in_body and container.kind in CONTAINER_KINDS:
+                    qualname = f"{container.qualname}.{name}"
+                    kind = "method" if kind == "function" else kind
+                elif container is not None:
+                    qualname = f"{container.qualname}.{name}"
+                else:
+                    qualname = name
+                symbol = Symbol(name, kind, qualname, number, number)
+            break
+
+        if (
+            symbol is None
+            and method_rule is not None
+            and in_body
+            and container.kind in CONTAINER_KINDS
+        ):
+            match = method_rule.match(line)
+            if match and match.group(1) not in _NOT_METHODS:
+                name = match.group(1)
+                symbol = Symbol(name, "method", f"{container.qualname}.{name}", number, number)
+
+        if symbol is not None:
+            awaiting = symbol
+            if not ("{" in line or "(" in line or line.rstrip().endswith(("=", ","))):
+                # One-line declaration without a body, e.g. a type alias
+                record(symbol)
+                awaiting = None
+
+        for brace in _BRACES.finditer(line):
+            char = brace.group()
+            if char == "{":
+                if awaiting is not None:
+                    stack.append((awaiting, depth))
+                    awaiting = None
+                depth += 1
+            elif char == "}":
+                depth = max(0, depth - 1)
+                while stack and stack[-1][1] >= depth:
+                    opened, _ = stack.pop()
+                    record(Symbol(opened.name, opened.kind, opened.qualname, opened.line, number))
+            elif (
+                char == ";" and awaiting is not None and depth == (stack[-1][1] + 1 if stack else 0)
+            ):
+                # Declaration ended without a body (prototype, abstract method, alias)
+                record(awaiting)
+                awaiting = None
+
+        if awaiting is not None and awaiting.line < number - 5:
+            # Never found a body; keep the declaration as a single line
+            record(awaiting)
+            awaiting = None
+
+    if awaiting is not None:
+        record(awaiting)
+    for opened, _ in stack:
+        record(Symbol(opened.name, opened.kind, opened.qualname, opened.line, len(lines)))
+
+    symbols.sort(key=lambda symbol: (symbol.line, -symbol.end_line))
+    return symbols
+
+
+# ---------------------------------------------------------------- Entry points
+
+
+def language_for(path: str) -> Optional[str]:
+    return EXTENSION_LANGUAGES.get(os.path.splitext(path)[1].lower())
+
+
+def _extract(path: str, source: str) -> Tuple[List[Symbol], Set[str], Set[str]]:
+    language = language_for(path)
+    if language == "python":
+        try:
+            return _python_symbols(source)
+        except (SyntaxError, ValueError, RecursionError):
+            return _python_fallback(source)
+    if language in LANGUAGES:
+        return _brace_symbols(source, language), set(), set()
+    return [], set(), set()
+
+
+def extract_symbols(path: str, source: str) -> Tuple[List[Symbol], Set[str]]:
+    """Extract (symbols, imported top-level modules) from one file's source.
+
+    Imports are only collected for Python.
+    """
+    symbols, imports, _ = _extract(path, source)
+    return symbols, imports
+
+
+def parse_file(path: str) -> Dict[str, list]:
+    """Read and parse one file into CodeIndex record fields."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            source = f.read()
+    except OSError:
+        return {}
+    symbols, imports, modules = _extract(path, source)
+    record: Dict[str, list] = {}
+    if symbols:
+        record["symbols"] = [symbol.to_record() for symbol in symbols]
+    if imports:
+        record["imports"] = sorted(imports)
+    if modules:
+        record["modules"] = sorted(modules)
+    return record
+
+
+def parse_files(paths: List[str]) -> List[Dict[str, list]]:
+    """Worker entry point: parse a chunk of files."""
+    return [parse_file(path) for path in paths]
+
+
+def parse_many(paths: List[str]) -> List[Dict[str, list]]:
+    """Parse files, in worker processes when there are enough to be worth it."""
+    pool = get_process_pool() if len(paths) >= POOL_MIN_FILES else None
+    if pool is None:
+        return parse_files(paths)
+    chunks = [paths[i : i + POOL_CHUNK] for i in range(0, len(paths), POOL_CHUNK)]
+    try:
+        return [record for records in pool.map(parse_files, chunks) for record in records]
+    except Exception:
+        # A broken pool should not fail the build
+        return parse_files(paths)
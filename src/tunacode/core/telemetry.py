@@ -0,0 +1,195 @@
+"""Module: tunacode.core.telemetry
+
+Latency, token and cost instrumentation for the agent loop.
+Each agent node is timed as it is yielded by ``agent.iter``. Tool functions are
+wrapped so their execution time is attributed to the node that called them, and
+token usage reported on model responses is priced with ``ModelPricing``.
+"""
+
+import contextvars
+import functools
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Provider-specific usage detail keys that count cached prompt tokens
+CACHED_TOKEN_KEYS = ("cached_tokens", "cache_read_input_tokens", "cached_content_tokens")
+TELEMETRY_FILE = "telemetry.jsonl"
+
+_current_request: contextvars.ContextVar[Optional["RequestTelemetry"]] = contextvars.ContextVar(
+    "tunacode_request_telemetry", default=None
+)
+
+
+@dataclass
+class ToolTiming:
+    """One tool execution."""
+
+    tool: str
+    duration: float
+    error: bool = False
+
+
+@dataclass
+class NodeMetrics:
+    """Timing and usage for one node yielded by the agent loop."""
+
+    request_id: int
+    iteration: int
+    node_type: str
+    model: str
+    started_at: float
+    duration: float
+    model_call: bool = False  # Whether the node carries a model response
+    tools: List[ToolTiming] = field(default_factory=list)
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cost: float = 0.0
+
+
+def compute_cost(model: str, input_tokens: int, output_tokens: int, cached_tokens: int) -> float:
+    """Price token usage with the model's per-million-token pricing (0 if unknown)."""
+    from tunacode.configuration.models import ModelRegistry
+
+    config = ModelRegistry().get_model(model)
+    if config is None:
+        return 0.0
+    pricing = config.pricing
+    uncached = max(0, input_tokens - cached_tokens)
+    return (
+        uncached * pricing.input
+        + cached_tokens * pricing.cached_input
+        + output_tokens * pricing.output
+    ) / 1_000_000
+
+
+class RequestTelemetry:
+    """Collects node metrics for a single ``process_request`` call."""
+
+    def __init__(self, request_id: int, model: str):
+        self.request_id = request_id
+        self.model = model
+        self.nodes: List[NodeMetrics] = []
+        self._pending_tools: List[ToolTiming] = []
+        self._last_mark = time.perf_counter()
+        self._token = None
+
+    def __enter__(self) -> "RequestTelemetry":
+        self._token = _current_request.set(self)
+        self._last_mark = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        _current_request.reset(self._token)
+
+    def mark(self) -> None:
+        """Start the next node's interval now, excluding time spent since the last node."""
+        self._last_mark = time.perf_counter()
+
+    def record_tool(self, timing: ToolTiming) -> None:
+        self._pending_tools.append(timing)
+
+    def record_node(self, node: Any, iteration: int) -> NodeMetrics:
+        """Close the interval since the previous node and attribute it to ``node``."""
+        now = time.perf_counter()
+        metrics = NodeMetrics(
+            request_id=self.request_id,
+            iteration=iteration,
+            node_type=type(node).__name__,
+            model=self.model,
+            started_at=time.time() - (now - self._last_mark),
+            duration=now - self._last_mark,
+            tools=self._pending_tools,
+        )
+        self._pending_tools = []
+        self._last_mark = now
+
+        response = getattr(node, "model_response", None)
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            details = usage.details or {}
+            metrics.input_tokens = usage.request_tokens or 0
+            metrics.output_tokens = usage.response_tokens or 0
+            metrics.cached_tokens = sum(details.get(key, 0) for key in CACHED_TOKEN_KEYS)
+            metrics.cost = compute_cost(
+                self.model, metrics.input_tokens, metrics.output_tokens, metrics.cached_tokens
+            )
+            metrics.model_call = True
+
+        self.nodes.append(metrics)
+        return metrics
+
+    @property
+    def cost(self) -> float:
+        return sum(node.cost for node in self.nodes)
+
+
+class SessionTelemetry:
+    """Aggregates request telemetry for the session."""
+
+    def __init__(self):
+        self.requests: List[RequestTelemetry] = []
+
+    def start_request(self, model: str) -> RequestTelemetry:
+        request = RequestTelemetry(len(self.requests) + 1, model)
+        self.requests.append(request)
+        return request
+
+    @property
+    def nodes(self) -> List[NodeMetrics]:
+        return [node for request in self.requests for node in request.nodes]
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals across the session, with per-tool timing breakdown."""
+        nodes = self.nodes
+        model_nodes = [n for n in nodes if n.model_call]
+        tools: Dict[str, Dict[str, float]] = {}
+        for node in nodes:
+            for timing in node.tools:
+                stats = tools.setdefault(timing.tool, {"calls": 0, "total": 0.0, "errors": 0})
+                stats["calls"] += 1
+                stats["total"] += timing.duration
+                stats["errors"] += int(timing.error)
+        return {
+            "requests": len(self.requests),
+            "model_calls": len(model_nodes),
+            "wall_time": sum(n.duration for n in nodes),
+            "model_time": sum(n.duration for n in model_nodes),
+            "tool_time": sum(t["total"] for t in tools.values()),
+            "input_tokens": sum(n.input_tokens for n in nodes),
+            "output_tokens": sum(n.output_tokens for n in nodes),
+            "cached_tokens": sum(n.cached_tokens for n in nodes),
+            "cost": sum(n.cost for n in nodes),
+            "tools": tools,
+        }
+
+    def export_jsonl(self, path: Path, request: Optional[RequestTelemetry] = None) -> None:
+        """Append node metrics (for one request, or all of them) to a JSONL file."""
+        nodes = request.nodes if request is not None else self.nodes
+        with open(path, "a", encoding="utf-8") as f:
+            for node in nodes:
+                f.write(json.dumps(asdict(node)) + "\n")
+
+
+def timed_tool(func: Callable) -> Callable:
+    """Wrap an async tool so its runtime is recorded on the active request."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        request = _current_request.get()
+        if request is None:
+            return await func(*args, **kwargs)
+        start = time.perf_counter()
+        error = False
+        try:
+            return await func(*args, **kwargs)
+        except BaseException:
+            error = True
+            raise
+        finally:
+            request.record_tool(ToolTiming(func.__name__, time.perf_counter() - start, error))
+
+    return wrapper
@@ -0,0 +1,336 @@
+"""Trigram posting-list index for narrowing content searches.
+
+Each indexed file is reduced to the set of lowercase byte trigrams it contains.
+A search pattern is reduced to the literal strings any match must contain, so
+only files holding every trigram of those literals need to be searched. The
+index is a superset filter: it never drops a file that could match.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+
+from tunacode.utils.ignore import IgnoreMatcher
+from tunacode.utils.walker import parallel_walk
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover - older interpreters
+    import sre_parse
+
+logger = logging.getLogger(__name__)
+
+# Files above this size are never indexed and are always treated as candidates
+MAX_INDEXED_FILE_SIZE = 1024 * 1024  # 1MB
+
+# A query is a literal, an ("and"|"or", [subqueries]) node, or None (matches everything)
+Query = Union[str, Tuple[str, list], None]
+
+
+def extract_trigrams(text: str) -> Set[bytes]:
+    """Return the set of lowercase UTF-8 byte trigrams in a string."""
+    data = text.lower().encode("utf-8", errors="ignore")
+    return {data[i : i + 3] for i in range(len(data) - 2)}
+
+
+def _and(parts: List[Query]) -> Query:
+    parts = [p for p in parts if p is not None]
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    return ("and", parts)
+
+
+def _literal_query(items) -> Query:
+    """Build a query from a parsed regex sequence."""
+    required: List[Query] = []
+    run: List[str] = []
+
+    def flush():
+        if len(run) >= 3:
+            required.append("".join(run))
+        run.clear()
+
+    for op, av in items:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+        elif op is sre_parse.AT:
+            # Anchors are zero-width and do not break a literal run
+            continue
+        elif op is sre_parse.SUBPATTERN:
+            flush()
+            required.append(_literal_query(av[-1]))
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            flush()
+            min_count, _, sub = av
+            if min_count >= 1:
+                required.append(_literal_query(sub))
+        elif op is sre_parse.BRANCH:
+            flush()
+            alternatives = [_literal_query(alt) for alt in av[1]]
+            if all(alt is not None for alt in alternatives):
+                required.append(("or", alternatives))
+        else:
+            flush()
+    flush()
+
+    return _and(required)
+
+
+def build_query(pattern: str, use_regex: bool) -> Query:
+    """Reduce a search pattern to the literals any match must contain.
+
+    Args:
+        pattern: Literal text or regular expression
+        use_regex: Whether the pattern is a regular expression
+
+    Returns:
+        A query tree, or None when the pattern cannot narrow the candidate set.
+    """
+    if not use_regex:
+        return pattern if len(pattern) >= 3 else None
+
+    try:
+        parsed = sre_parse.parse(pattern)
+    except Exception:
+        return None
+    return _literal_query(list(parsed))
+
+
+class TrigramIndex:
+    """Maps lowercase byte trigrams to the files that contain them."""
+
+    def __init__(
+        self,
+        root_dir: Path,
+        exclude_dirs: Optional[Iterable[str]] = None,
+        ignore_patterns: Optional[Iterable[str]] = None,
+    ):
+        self.root_dir = Path(root_dir).resolve()
+        self.exclude_dirs = set(exclude_dirs or ())
+        self.ignore_patterns = [
+            *(ignore_patterns or ()),
+            *(f"{name}/" for name in sorted(self.exclude_dirs)),
+        ]
+        self.ignore = IgnoreMatcher(self.root_dir, patterns=self.ignore_patterns)
+        self._lock = threading.RLock()
+
+        self._postings: Dict[bytes, Set[int]] = {}
+        self._file_ids: Dict[str, int] = {}
+        self._paths: List[Optional[str]] = []
+        self._dead_ids = 0
+        # Files too large to index; always returned as candidates
+        self._unindexed: Set[str] = set()
+        # (mtime_ns, size) of every file as it was indexed, checked by sync()
+        self._signatures: Dict[str, Tuple[int, int]] = {}
+
+        self.built_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+
+    def build(self) -> None:
+        """Walk the root directory and index every readable file."""
+        with self._lock:
+            self._postings.clear()
+            self._file_ids.clear()
+            self._paths.clear()
+            self._unindexed.clear()
+            self._signatures.clear()
+            self._dead_ids = 0
+
+            # Rebuild the matcher so edited .gitignore files take effect
+            self.ignore = IgnoreMatcher(self.root_dir, patterns=self.ignore_patterns)
+            for current, _, _, files in self.ignore.walk():
+                for name in files:
+                    full_path = os.path.join(current, name)
+                    if os.path.islink(full_path):
+                        continue
+                    self._add_path(os.path.relpath(full_path, self.root_dir), full_path)
+
+            self.built_at = self.updated_at = time.time()
+            logger.info(
+                f"Built trigram index: {len(self._file_ids)} files, {len(self._postings)} trigrams"
+            )
+
+    def _add_path(
+        self, rel_path: str, full_path: str, stat_result: Optional[os.stat_result] = None
+    ) -> None:
+        try:
+            stat_result = stat_result or os.stat(full_path)
+            # Taken before reading, so an edit made during the read shows up as a change
+            self._signatures[rel_path] = (stat_result.st_mtime_ns, stat_result.st_size)
+            if stat_result.st_size > MAX_INDEXED_FILE_SIZE:
+                self._unindexed.add(rel_path)
+                return
+            with open(full_path, "r", encoding="utf-8", errors="ignore") as f:
+                content = f.read()
+        except OSError:
+            self._signatures.pop(rel_path, None)
+            return
+
+        file_id = len(self._paths)
+        self._paths.append(rel_path)
+        self._file_ids[rel_path] = file_id
+        for trigram in extract_trigrams(content):
+            postings = self._postings.get(trigram)
+            if postings is None:
+                self._postings[trigram] = {file_id}
+            else:
+                postings.add(file_id)
+
+    def update_file(self, rel_path: str) -> None:
+        """Re-index a single file (or drop it if it no longer exists)."""
+        with self._lock:
+            self.remove_file(rel_path)
+            full_path = self.root_dir / rel_path
+            if full_path.is_file() and not self.ignore.is_ignored(str(rel_path)):
+                self._add_path(str(rel_path), str(full_path))
+            self.updated_at = time.time()
+
+    def update_tree(self, rel_dir: str) -> None:
+        """Re-index every file under a directory (or drop them if it no longer exists)."""
+        with self._lock:
+            prefix = str(rel_dir).rstrip(os.sep) + os.sep
+            stale = [p for p in (*self._file_ids, *self._unindexed) if p.startswith(prefix)]
+            for rel_path in stale:
+                self.remove_file(rel_path)
+            full_dir = self.root_dir / rel_dir
+            if full_dir.is_dir() and not self.ignore.is_ignored(str(rel_dir), is_dir=True):
+                for entry in parallel_walk(full_dir, ignore=self.ignore):
+                    self._add_path(entry.rel_path, entry.path)
+            self.updated_at = time.time()
+
+    def refresh_path(self, rel_path: str) -> None:
+        """Re-index a changed file or directory, dropping whatever no longer exists.
+
+        An empty path syncs the whole tree.
+        """
+        with self._lock:
+            if not rel_path:
+                self.sync()
+                return
+            full_path = self.root_dir / rel_path
+            if not full_path.is_dir():
+                self.update_file(rel_path)
+            if not full_path.is_file():
+                self.update_tree(rel_path)
+
+    def sync(self) -> int:
+        """Bring the index in line with the file system.
+
+        The tree is listed with a stat of each file, and only files whose
+        (mtime, size) differ from when they were indexed are read again.
+
+        Returns:
+            Number of files added, changed or removed.
+        """
+        with self._lock:
+            self.ignore = IgnoreMatcher(self.root_dir, patterns=self.ignore_patterns)
+            seen: Set[str] = set()
+            changed = 0
+            for entry in parallel_walk(self.root_dir, ignore=self.ignore, with_stat=True):
+                seen.add(entry.rel_path)
+                signature = (entry.stat.st_mtime_ns, entry.stat.st_size)
+                if self._signatures.get(entry.rel_path) != signature:
+                    self.remove_file(entry.rel_path)
+                    self._add_path(entry.rel_path, entry.path, entry.stat)
+                    changed += 1
+            for rel_path in [p for p in (*self._file_ids, *self._unindexed) if p not in seen]:
+                self.remove_file(rel_path)
+                changed += 1
+            self.updated_at = time.time()
+            return changed
+
+    def remove_file(self, rel_path: str) -> None:
+        """Drop a file from the index.
+
+        Postings are cleaned lazily: the file id is tombstoned and filtered out
+        of query results until the next compaction.
+        """
+        with self._lock:
+            rel_path = str(rel_path)
+            self._unindexed.discard(rel_path)
+            self._signatures.pop(rel_path, None)
+            file_id = self._file_ids.pop(rel_path, None)
+            if file_id is None:
+                return
+            self._paths[file_id] = None
+            self._dead_ids += 1
+            if self._dead_ids > max(1000, len(self._file_ids)):
+                self._compact()
+
+    def _compact(self) -> None:
+        """Strip tombstoned file ids from every posting list."""
+        live = set(self._file_ids.values())
+        for trigram in list(self._postings):
+            postings = self._postings[trigram] & live
+            if postings:
+                self._postings[trigram] = postings
+            else:
+                del self._postings[trigram]
+        self._dead_ids = 0
+
+    def _evaluate(self, query: Query) -> Optional[Set[int]]:
+        if query is None:
+            return None
+        if isinstance(query, str):
+            result: Optional[Set[int]] = None
+            # Intersect the rarest posting lists first
+            postings = []
+            for trigram in extract_trigrams(query):
+                ids = self._postings.get(trigram)
+                if not ids:
+                    return set()
+                postings.append(ids)
+            for ids in sorted(postings, key=len):
+                result = set(ids) if result is None else result & ids
+                if not result:
+                    break
+            return result
+        kind, parts = query
+        results = [self._evaluate(part) for part in parts]
+        if kind == "and":
+            narrowed = [r for r in results if r is not None]
+            if not narrowed:
+                return None
+            result = set(min(narrowed, key=len))
+            for r in narrowed:
+                result &= r
+            return result
+        if any(r is None for r in results):
+            return None
+        return set().union(*results)
+
+    def candidates(self, pattern: str, use_regex: bool = False) -> Optional[List[str]]:
+        """Return relative paths of files that may contain a match.
+
+        Args:
+            pattern: Search pattern (literal text or regex)
+            use_regex: Whether the pattern is a regular expression
+
+        Returns:
+            Sorted relative paths, or None when the pattern cannot be narrowed.
+        """
+        query = build_query(pattern, use_regex)
+        if query is None:
+            return None
+
+        with self._lock:
+            ids = self._evaluate(query)
+            if ids is None:
+                return None
+            paths = {self._paths[i] for i in ids if self._paths[i] is not None}
+            paths.update(self._unindexed)
+            return sorted(paths)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get index size statistics."""
+        with self._lock:
+            return {
+                "files_indexed": len(self._file_ids),
+                "files_unindexed": len(self._unindexed),
+                "trigrams": len(self._postings),
+            }
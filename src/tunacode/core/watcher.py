@@ -0,0 +1,406 @@
+"""Filesystem watcher that keeps the code index and caches in sync with the tree.
+
+On Linux the watcher subscribes to inotify events for every directory that is
+not ignored. Elsewhere, or once the kernel's watch limit is reached, it
+re-stats the tree on an interval and diffs the snapshots. Changes are
+debounced, then pushed incrementally into the shared CodeIndex (and its
+trigram index), the retrieval index, and the file content and line-offset
+caches, so lookups never need a rescan while the watcher is running.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import struct
+import sys
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from tunacode.core.background.manager import BG_MANAGER
+from tunacode.utils.file_cache import FILE_CACHE
+from tunacode.utils.ignore import COMMON_IGNORE_PATTERNS, GITIGNORE_FILE, IgnoreMatcher
+from tunacode.utils.line_index import LINE_INDEX_CACHE
+from tunacode.utils.walker import parallel_walk
+
+logger = logging.getLogger(__name__)
+
+WATCHER_TASK_NAME = "file-watcher"
+WATCH_DEBOUNCE = 0.2  # Seconds without new events before a batch is applied
+WATCH_MAX_DELAY = 2.0  # Apply anyway once events have kept arriving this long
+POLL_INTERVAL = 2.0  # Seconds between snapshots for the polling backend
+
+# inotify(7) event flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_ONLYDIR
+    | IN_EXCL_UNLINK
+)
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+# Called with changed paths relative to the root; "" means everything may have changed
+Notify = Callable[[Set[str]], None]
+
+
+def _load_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    libc.inotify_init1  # AttributeError if the C library has no inotify
+    return libc
+
+
+class InotifyBackend:
+    """Watches every non-ignored directory with inotify, called through ctypes."""
+
+    def __init__(self, root: str, ignore: IgnoreMatcher):
+        self.root = root
+        self.ignore = ignore
+        self._libc = _load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._dirs: Dict[int, str] = {}  # watch descriptor -> relative directory
+        self._wds: Dict[str, int] = {}
+        self.created_dirs: List[str] = []  # New directories read_events found, still unwatched
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def watch_tree(self, rel_dir: str = "") -> None:
+        """Watch a directory and every non-ignored directory below it.
+
+        Raises:
+            OSError: The kernel's inotify watch limit was reached.
+        """
+        self.register(self.add_watches(rel_dir))
+
+    def add_watches(self, rel_dir: str) -> List[Tuple[int, str]]:
+        """Add kernel watches under a directory and return them as (wd, rel) pairs.
+
+        Walks the directory, so it can be slow; it touches no backend state and
+        is safe to run off the event loop, followed by ``register`` on it.
+
+        Raises:
+            OSError: The kernel's inotify watch limit was reached.
+        """
+        watches = []
+        top = os.path.join(self.root, rel_dir) if rel_dir else self.root
+        for _, rel, _, _ in self.ignore.walk(top):
+            path = os.path.join(self.root, rel) if rel else self.root
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), WATCH_MASK)
+            if wd < 0:
+                err = ctypes.get_errno()
+                if err in (errno.ENOSPC, errno.ENOMEM):
+                    raise OSError(err, "inotify watch limit reached")
+                continue  # Removed or unreadable since it was listed
+            watches.append((wd, rel))
+        return watches
+
+    def register(self, watches: List[Tuple[int, str]]) -> None:
+        """Record watches added by ``add_watches`` so their events are resolved."""
+        for wd, rel in watches:
+            self._dirs[wd] = rel
+            self._wds[rel] = wd
+
+    def _forget_tree(self, rel_dir: str) -> None:
+        """Drop watches for a directory that moved away, and everything below it."""
+        prefix = rel_dir + "/"
+        for rel in [rel for rel in self._wds if rel == rel_dir or rel.startswith(prefix)]:
+            wd = self._wds.pop(rel)
+            self._dirs.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def read_events(self) -> Set[str]:
+        """Drain pending events and return the paths they touched."""
+        changed: Set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                start = offset + _EVENT_HEADER.size
+                name = os.fsdecode(data[start : start + length].rstrip(b"\0"))
+                offset = start + length
+
+                if mask & IN_Q_OVERFLOW:
+                    changed.add("")
+                    continue
+                if mask & IN_IGNORED:
+                    rel = self._dirs.pop(wd, None)
+                    if rel is not None and self._wds.get(rel) == wd:
+                        del self._wds[rel]
+                    continue
+                parent = self._dirs.get(wd)
+                if parent is None or not name:
+                    continue
+
+                rel = f"{parent}/{name}" if parent else name
+                is_dir = bool(mask & IN_ISDIR)
+                if self.ignore.is_ignored(rel, is_dir=is_dir):
+                    continue
+                if is_dir and mask & IN_MOVED_FROM:
+                    self._forget_tree(rel)
+                elif is_dir and mask & (IN_CREATE | IN_MOVED_TO):
+                    self.created_dirs.append(rel)
+                changed.add(rel)
+        return changed
+
+    async def run(self, notify: Notify) -> None:
+        loop = asyncio.get_running_loop()
+        failed = loop.create_future()
+
+        def fail(error: OSError) -> None:
+            if self._fd >= 0:
+                loop.remove_reader(self._fd)
+            if not failed.done():
+                failed.set_exception(error)
+
+        def on_watched(rel: str, future: asyncio.Future) -> None:
+            if future.cancelled() or failed.done():
+                return
+            error = future.exception()
+            if error is not None:
+                fail(error)
+                return
+            self.register(future.result())
+            # Files created before the watches existed are picked up by rescanning rel
+            notify({rel})
+
+        def on_readable():
+            try:
+                changed = self.read_events()
+            except OSError as e:
+                fail(e)
+                return
+            # Watching a new tree walks it, which would block the loop for a large one
+            created, self.created_dirs = self.created_dirs, []
+            for rel in created:
+                future = loop.run_in_executor(None, self.add_watches, rel)
+                future.add_done_callback(lambda f, rel=rel: on_watched(rel, f))
+            if changed:
+                notify(changed)
+
+        loop.add_reader(self._fd, on_readable)
+        try:
+            await failed
+        finally:
+            if self._fd >= 0:
+                loop.remove_reader(self._fd)
+            self.close()
+
+
+class PollingBackend:
+    """Re-stats the tree on an interval and reports files whose (mtime, size) changed."""
+
+    def __init__(self, root: str, ignore: IgnoreMatcher, interval: float = POLL_INTERVAL):
+        self.root = root
+        self.ignore = ignore
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, Tuple[int, int]]:
+        return {
+            entry.rel_path: (entry.stat.st_mtime_ns, entry.stat.st_size)
+            for entry in parallel_walk(self.root, ignore=self.ignore, with_stat=True)
+        }
+
+    def poll(self) -> Set[str]:
+        """Take a new snapshot and return added, modified and removed files."""
+        previous, self._snapshot = self._snapshot, self._scan()
+        changed = {rel for rel, sig in self._snapshot.items() if previous.get(rel) != sig}
+        changed.update(rel for rel in previous if rel not in self._snapshot)
+        return changed
+
+    async def run(self, notify: Notify) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.interval)
+            changed = await loop.run_in_executor(None, self.poll)
+            if changed:
+                notify(changed)
+
+
+_active: Dict[str, "FileWatcher"] = {}
+
+
+def is_watched(root) -> bool:
+    """Whether a running watcher keeps indexes under ``root`` up to date."""
+    root = os.path.realpath(str(root))
+    return any(root == watched or root.startswith(watched + os.sep) for watched in _active)
+
+
+class FileWatcher:
+    """Debounces filesystem events and applies them to the shared indexes and caches.
+
+    Args:
+        root: Directory to watch. Defaults to the current directory.
+        backend: "auto" (inotify where available, else polling), "inotify" or "poll".
+        debounce: Seconds without new events before a batch is applied.
+        poll_interval: Seconds between snapshots when polling.
+    """
+
+    def __init__(
+        self,
+        root: Optional[str] = None,
+        backend: str = "auto",
+        debounce: float = WATCH_DEBOUNCE,
+        poll_interval: float = POLL_INTERVAL,
+    ):
+        self.root = os.path.realpath(root or os.getcwd())
+        self.backend_name = backend
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.backend = None
+        self.task_id: Optional[str] = None
+        self.batches_applied = 0
+        self.paths_applied = 0
+        self._pending: Set[str] = set()
+        self._changed: Optional[asyncio.Event] = None
+
+    def _make_ignore(self) -> IgnoreMatcher:
+        # The loosest rules of any consumer; each index applies its own on top
+        return IgnoreMatcher(self.root, patterns=COMMON_IGNORE_PATTERNS)
+
+    def _create_backend(self):
+        if self.backend_name != "poll" and sys.platform.startswith("linux"):
+            backend = None
+            try:
+                backend = InotifyBackend(self.root, self._make_ignore())
+                backend.watch_tree()
+                return backend
+            except (OSError, AttributeError) as e:
+                if backend is not None:
+                    backend.close()
+                if self.backend_name == "inotify":
+                    raise
+                logger.debug(f"inotify unavailable, polling instead: {e}")
+        elif self.backend_name == "inotify":
+            raise OSError(errno.ENOSYS, "inotify is only available on Linux")
+        return PollingBackend(self.root, self._make_ignore(), self.poll_interval)
+
+    def _notify(self, paths: Set[str]) -> None:
+        for rel in paths:
+            if rel.rsplit("/", 1)[-1] == GITIGNORE_FILE:
+                # Ignore rules changed, so which files are indexed may have too
+                self.backend.ignore = self._make_ignore()
+                self._pending.add("")
+        self._pending.update(paths)
+        self._changed.set()
+
+    async def _debounce(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        while loop.time() - started < WATCH_MAX_DELAY:
+            self._changed.clear()
+            try:
+                await asyncio.wait_for(self._changed.wait(), self.debounce)
+            except asyncio.TimeoutError:
+                break
+        self._changed.clear()
+
+    async def run(self) -> None:
+        """Watch until cancelled, applying each debounced batch of changes."""
+        loop = asyncio.get_running_loop()
+        self._changed = asyncio.Event()
+        self.backend = await loop.run_in_executor(None, self._create_backend)
+        backend_task = asyncio.create_task(self.backend.run(self._notify))
+        _active[self.root] = self
+        try:
+            while True:
+                waiter = asyncio.create_task(self._changed.wait())
+                done, _ = await asyncio.wait(
+                    {waiter, backend_task}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if backend_task in done:
+                    waiter.cancel()
+                    if isinstance(self.backend, PollingBackend):
+                        backend_task.result()
+                        return
+                    # Out of inotify watches: poll instead, and resync what may have been missed
+                    error = backend_task.exception()
+                    logger.warning(f"File watcher falling back to polling: {error}")
+                    self.backend = await loop.run_in_executor(
+                        None, PollingBackend, self.root, self._make_ignore(), self.poll_interval
+                    )
+                    backend_task = asyncio.create_task(self.backend.run(self._notify))
+                    self._notify({""})
+                    continue
+
+                await self._debounce()
+                paths, self._pending = self._pending, set()
+                await loop.run_in_executor(None, self.apply_changes, paths)
+        finally:
+            _active.pop(self.root, None)
+            backend_task.cancel()
+            await asyncio.gather(backend_task, return_exceptions=True)
+
+    def apply_changes(self, paths: Set[str]) -> None:
+        """Push one batch of changed paths into the shared indexes and caches.
+
+        Only indexes that already exist are updated; ones built later start
+        from the current tree anyway. A trigram index built on its own, as an
+        indexed grep does, is updated even when the CodeIndex is not built.
+        "" refreshes everything incrementally.
+        """
+        from tunacode.core.code_index import get_code_index
+        from tunacode.core.retrieval import get_code_retriever
+
+        code_index = get_code_index(self.root, create=False)
+        retriever = get_code_retriever(self.root, create=False)
+        if "" in paths:
+            paths = {""}
+
+        for rel in sorted(paths):
+            full_path = os.path.join(self.root, rel) if rel else None
+            try:
+                FILE_CACHE.invalidate(full_path)
+                LINE_INDEX_CACHE.invalidate(full_path)
+                if code_index is not None and code_index.is_built:
+                    code_index.refresh(rel or None)
+                elif code_index is not None:
+                    trigram_index = code_index.get_trigram_index(build=False)
+                    if trigram_index is not None:
+                        trigram_index.refresh_path(rel)
+                if retriever is not None:
+                    retriever.update_path(rel)
+            except Exception as e:
+                logger.debug(f"File watcher could not apply change to {rel or '.'}: {e}")
+
+        self.batches_applied += 1
+        self.paths_applied += len(paths)
+
+    async def stop(self) -> None:
+        """Cancel the watcher task and wait for it to finish."""
+        task = BG_MANAGER.tasks.pop(self.task_id, None) if self.task_id else None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def start_file_watcher(root: Optional[str] = None, **kwargs) -> FileWatcher:
+    """Start a FileWatcher as a background task; see FileWatcher for arguments."""
+    watcher = FileWatcher(root, **kwargs)
+    watcher.task_id = BG_MANAGER.spawn(watcher.run(), name=WATCHER_TASK_NAME)
+    return watcher
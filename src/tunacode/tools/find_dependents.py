@@ -0,0 +1,92 @@
+"""
+Module: tunacode.tools.find_dependents
+
+Reverse-dependency tool for agent operations.
+Answers "what depends on this module" from the CodeIndex import graph.
+"""
+
+from typing import List
+
+from tunacode.exceptions import ToolExecutionError
+from tunacode.tools.base import BaseTool
+from tunacode.types import ToolResult
+
+MAX_DEPENDENTS = 200
+
+
+def _is_test_file(path) -> bool:
+    return path.name.startswith("test_") or path.stem.endswith("_test")
+
+
+class FindDependentsTool(BaseTool):
+    """Tool for listing the files affected by a change to a module."""
+
+    @property
+    def tool_name(self) -> str:
+        return "FindDependents"
+
+    async def _execute(
+        self, target: str, transitive: bool = True, max_results: int = MAX_DEPENDENTS
+    ) -> ToolResult:
+        """List the files that import a module, directly or transitively.
+
+        Args:
+            target: Relative file path ("src/pkg/mod.py") or dotted module name ("pkg.mod")
+            transitive: Include indirect dependents (default: True)
+            max_results: Maximum number of files to list
+
+        Returns:
+            ToolResult: Dependent files, with the test files among them listed separately
+        """
+        from tunacode.core.code_index import get_code_index
+
+        graph = get_code_index().get_dependency_graph()
+        path = graph.resolve(target.strip())
+        if path is None:
+            return f"No indexed Python module matches '{target}'"
+
+        dependents = graph.dependents(path, transitive=transitive)
+        scope = "transitively" if transitive else "directly"
+        if not dependents:
+            return f"No files {scope} depend on {path}"
+
+        tests: List = [p for p in dependents if _is_test_file(p)]
+        sources: List = [p for p in dependents if not _is_test_file(p)]
+        lines = [f"{len(dependents)} file(s) {scope} depend on {path}:"]
+        lines.extend(f"  {p}" for p in sources[:max_results])
+        if tests:
+            lines.append("")
+            lines.append(f"Tests affected ({len(tests)}):")
+            lines.extend(f"  {p}" for p in tests[:max_results])
+        if len(sources) > max_results or len(tests) > max_results:
+            lines.append(f"Note: Output limited to {max_results} files per section")
+        return "\n".join(lines)
+
+    def _get_error_context(self, target: str = None, *args, **kwargs) -> str:
+        """Get error context including the target module."""
+        if target:
+            return f"finding dependents of '{target}'"
+        return super()._get_error_context(*args, **kwargs)
+
+
+# Create the function that maintains compatibility with pydantic-ai
+async def find_dependents(target: str, transitive: bool = True, max_results: int = 200) -> str:
+    """
+    Find the files that depend on a Python module, to scope edits and test runs.
+
+    Uses the import graph from the code index, with relative imports resolved.
+
+    Args:
+        target: Relative file path (e.g. "src/pkg/mod.py") or dotted module name (e.g. "pkg.mod")
+        transitive: Include files that depend on it indirectly (default: True)
+        max_results: Maximum number of files to list per section (default: 200)
+
+    Returns:
+        str: Dependent files and the affected test files, or an error message
+    """
+    tool = FindDependentsTool(None)  # No UI for pydantic-ai compatibility
+    try:
+        return await tool.execute(target, transitive=transitive, max_results=max_results)
+    except ToolExecutionError as e:
+        # Return error message for pydantic-ai compatibility
+        return str(e)
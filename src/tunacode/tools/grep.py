@@ -4,6 +4,7 @@ Parallel grep tool for TunaCode - Enhanced content search with parallel processi
 This tool provides sophisticated grep-like functionality with:
 - Parallel file searching across multiple directories
 - Multiple search strategies (literal, regex, fuzzy)
+- Optional trigram index that narrows candidate files before searching
 - Smart result ranking and deduplication
 - Context-aware output formatting
 - Timeout handling for overly broad patterns (3 second deadline for first match)
@@ -11,17 +12,25 @@ This tool provides sophisticated grep-like functionality with:
 
 import asyncio
 import fnmatch
+import json
 import os
 import re
-import subprocess
+import shutil
 import time
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from itertools import islice
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 
 from tunacode.exceptions import ToolExecutionError, TooBroadPatternError
 from tunacode.tools.base import BaseTool
+from tunacode.utils.byte_search import (ByteHit, BytePattern, open_buffer, resolve_lines,
+                                        scan_file, scan_shard, shard_by_size)
+from tunacode.utils.ignore import COMMON_IGNORE_PATTERNS, IgnoreMatcher
+from tunacode.utils.process_pool import get_process_pool
+from tunacode.utils.process_pool import worker_count as search_worker_count
+from tunacode.utils.walker import async_walk, parallel_walk
 
 
 @dataclass
@@ -53,39 +62,55 @@ class SearchConfig:
     first_match_deadline: float = 3.0  # Timeout for finding first match
 
 
-# Fast-Glob Prefilter Configuration
-MAX_GLOB = 5_000  # Hard cap - protects memory & tokens
-GLOB_BATCH = 500  # Streaming batch size
-EXCLUDE_DIRS = {  # Common directories to skip
-    "node_modules",
-    ".git",
-    "__pycache__",
-    ".venv",
-    "venv",
-    "dist",
-    "build",
-    ".pytest_cache",
-    ".mypy_cache",
-    ".tox",
-    "target",
-    "node_modules",
-}
+# Ripgrep streaming configuration
+RG_MATCH_PREFIX = b'{"type":"match"'  # Only records starting with this are decoded
+RG_LINE_LIMIT = 1024 * 1024  # Longest JSON record read from ripgrep stdout
+RG_ARGS_BYTES = 64 * 1024  # Candidate path bytes per ripgrep command, well under ARG_MAX
 
+# Process-pool backend for the Python strategy
+PROCESS_MIN_FILES = 200  # Below this, pool dispatch costs more than the GIL contention
+PROCESS_MIN_BYTES = 32 * 1024 * 1024  # Total candidate bytes that justify worker processes
+SHARDS_PER_WORKER = 4  # Extra shards let results stream back and balance stragglers
 
-def fast_glob(root: Path, include: str, exclude: str = None) -> List[Path]:
-    """
-    Lightning-fast filename filtering using os.scandir.
 
-    Args:
-        root: Directory to search
-        include: Include pattern (e.g., "*.py", "*.{js,ts}")
-        exclude: Exclude pattern (optional)
+class RipgrepUnavailableError(Exception):
+    """ripgrep could not be started; the caller should search with Python instead."""
 
-    Returns:
-        List of matching file paths (bounded by MAX_GLOB)
+
+def _chunk_paths(paths: List[Path], max_bytes: int = RG_ARGS_BYTES) -> Iterator[List[str]]:
+    """Split candidate paths into command-line-sized chunks."""
+    chunk: List[str] = []
+    size = 0
+    for path in paths:
+        arg = str(path)
+        if chunk and size + len(arg) + 1 > max_bytes:
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(arg)
+        size += len(arg) + 1
+    if chunk:
+        yield chunk
+
+
+def choose_search_backend(file_count: int, total_bytes: int, workers: int) -> str:
+    """Pick "thread" or "process" for a Python search over the given candidates.
+
+    Regex matching holds the GIL, so threads only help with I/O. Processes pay
+    for startup and pickling, which is only worth it for large workloads.
     """
-    matches, stack = [], [root]
+    if workers < 2 or file_count < PROCESS_MIN_FILES or total_bytes < PROCESS_MIN_BYTES:
+        return "thread"
+    return "process"
+
+
+# Fast-Glob Prefilter Configuration
+MAX_GLOB = 5_000  # Hard cap - protects memory & tokens
+GLOB_BATCH = 500  # Streaming batch size
+STREAM_BATCH = 64  # Walked files per search task when searching during the walk
+
 
+def _compile_name_filter(include: str, exclude: str = None):
+    """Compile include/exclude filename patterns into a single predicate."""
     # Handle multiple extensions in include pattern like "*.{py,js,ts}"
     if "{" in include and "}" in include:
         # Convert *.{py,js,ts} to multiple patterns
@@ -101,28 +126,97 @@ def fast_glob(root: Path, include: str, exclude: str = None) -> List[Path]:
 
     exclude_rx = re.compile(fnmatch.translate(exclude), re.IGNORECASE) if exclude else None
 
-    while stack and len(matches) < MAX_GLOB:
-        current_dir = stack.pop()
+    def matches_name(name: str) -> bool:
+        if not any(regex.match(name) for regex in include_regexes):
+            return False
+        return not exclude_rx or not exclude_rx.match(name)
 
-        try:
-            with os.scandir(current_dir) as entries:
-                for entry in entries:
-                    # Skip common irrelevant directories
-                    if entry.is_dir(follow_symlinks=False):
-                        if entry.name not in EXCLUDE_DIRS:
-                            stack.append(Path(entry.path))
+    return matches_name
+
+
+def fast_glob(root: Path, include: str, exclude: str = None) -> List[Path]:
+    """
+    Lightning-fast filename filtering using a parallel os.scandir walk.
 
-                    # Check file matches
-                    elif entry.is_file(follow_symlinks=False):
-                        # Check against any include pattern
-                        matches_include = any(regex.match(entry.name) for regex in include_regexes)
+    Args:
+        root: Directory to search
+        include: Include pattern (e.g., "*.py", "*.{js,ts}")
+        exclude: Exclude pattern (optional)
 
-                        if matches_include:
-                            if not exclude_rx or not exclude_rx.match(entry.name):
-                                matches.append(Path(entry.path))
+    Returns:
+        List of matching file paths (bounded by MAX_GLOB)
+    """
+    matches_name = _compile_name_filter(include, exclude)
+    ignore = IgnoreMatcher(root, patterns=COMMON_IGNORE_PATTERNS)
+    # Skip ignored directories (.gitignore plus common build/dependency dirs) while walking
+    found = (
+        Path(root) / entry.rel_path
+        for entry in parallel_walk(root, ignore=ignore)
+        if matches_name(entry.name)
+    )
+    # Closing the generator after MAX_GLOB matches stops the walk early
+    return list(islice(found, MAX_GLOB))
 
-        except (PermissionError, OSError):
-            continue  # Skip inaccessible directories
+
+def indexed_candidates(
+    root: Path,
+    pattern: str,
+    use_regex: bool,
+    include: str,
+    exclude: str = None,
+    build: bool = False,
+) -> Optional[List[Path]]:
+    """
+    Narrow candidate files with the trigram index instead of walking the tree.
+
+    Args:
+        root: Directory to search
+        pattern: Search pattern (literal text or regex)
+        use_regex: Whether pattern is a regular expression
+        include: Include pattern (e.g., "*.py", "*.{js,ts}")
+        exclude: Exclude pattern (optional)
+        build: Build the index if missing, or bring an existing one up to date
+            when no file watcher does; otherwise only use a watched index
+
+    Returns:
+        Files that may contain a match, or None if the index cannot answer
+        (no index, an unwatched index when not building, search root outside
+        it, or no usable literals).
+    """
+    from tunacode.core.code_index import get_code_index
+    from tunacode.core.watcher import is_watched
+
+    code_index = get_code_index()
+    index_root = code_index.root_dir
+    search_root = Path(root).resolve()
+    if search_root != index_root and index_root not in search_root.parents:
+        return None
+    trigram_index = code_index.get_trigram_index(build=False)
+    if trigram_index is None:
+        if not build:
+            return None
+        trigram_index = code_index.get_trigram_index(build=True)
+    elif not is_watched(index_root):
+        # Edits made outside the tools are only seen by checking the tree
+        if not build:
+            return None
+        trigram_index.sync()
+    # Directories skipped by the index are still searched when targeted directly
+    if trigram_index.ignore.is_ignored(str(search_root.relative_to(index_root)), is_dir=True):
+        return None
+
+    rel_paths = trigram_index.candidates(pattern, use_regex)
+    if rel_paths is None:
+        return None
+
+    matches_name = _compile_name_filter(include, exclude)
+    matches = []
+    for rel_path in rel_paths:
+        full_path = index_root / rel_path
+        if search_root != index_root and search_root not in full_path.parents:
+            continue
+        if matches_name(full_path.name):
+            matches.append(Path(root) / full_path.relative_to(search_root))
 
     return matches[:MAX_GLOB]
 
@@ -148,7 +242,7 @@ class ParallelGrep(BaseTool):
         exclude_files: Optional[str] = None,
         max_results: int = 50,
         context_lines: int = 2,
-        search_type: str = "smart",  # smart, ripgrep, python, hybrid
+        search_type: str = "smart",  # smart, indexed, ripgrep, python, hybrid
     ) -> str:
         """
         Execute parallel grep search with fast-glob prefiltering and multiple strategies.
@@ -168,20 +262,77 @@ class ParallelGrep(BaseTool):
             Formatted search results
         """
         try:
-            # 1️⃣ Fast-glob prefilter to find candidate files
+            # 1️⃣ Create search configuration
+            # Note: include_patterns/exclude_patterns now only used for legacy compatibility
+            include_patterns = self._parse_patterns(include_files) if include_files else ["*"]
+            exclude_patterns = self._parse_patterns(exclude_files) if exclude_files else []
+            config = SearchConfig(
+                case_sensitive=case_sensitive,
+                use_regex=use_regex,
+                max_results=max_results,
+                context_lines=context_lines,
+                include_patterns=include_patterns,
+                exclude_patterns=exclude_patterns,
+            )
+
+            # 2️⃣ Prefilter candidate files: trigram index when available, else fast-glob
             include_pattern = include_files or "*"
             exclude_pattern = exclude_files
+            original_search_type = search_type
+            loop = asyncio.get_event_loop()
+
+            candidates = None
+            if search_type in ("smart", "indexed"):
+                candidates = await loop.run_in_executor(
+                    self._executor,
+                    indexed_candidates,
+                    Path(directory),
+                    pattern,
+                    use_regex,
+                    include_pattern,
+                    exclude_pattern,
+                    search_type == "indexed",
+                )
+                if candidates is not None:
+                    search_type = "indexed"
+                elif search_type == "indexed":
+                    # Pattern has no usable literals; fall back to a normal scan
+                    search_type = "smart"
+
+            if candidates is None and (
+                search_type == "python" or (search_type == "smart" and shutil.which("rg") is None)
+            ):
+                # The Python strategy needs no candidate count up front, so search
+                # files as the walk finds them instead of waiting for the full list
+                results, file_count = await self._python_search_stream(
+                    pattern, directory, include_pattern, exclude_pattern, config
+                )
+                if not file_count:
+                    return f"No files found matching pattern: {include_pattern}"
+                return self._format_with_strategy(
+                    results, pattern, config, "python", original_search_type, file_count
+                )
 
-            candidates = await asyncio.get_event_loop().run_in_executor(
-                self._executor, fast_glob, Path(directory), include_pattern, exclude_pattern
-            )
-
-            if not candidates:
-                return f"No files found matching pattern: {include_pattern}"
+            if candidates is None:
+                candidates = await loop.run_in_executor(
+                    self._executor, fast_glob, Path(directory), include_pattern, exclude_pattern
+                )
+                if not candidates:
+                    return f"No files found matching pattern: {include_pattern}"
+            elif not candidates:
+                return (
+                    f"No matches found for pattern: {pattern}\n\n"
+                    f"Strategy: indexed (was {original_search_type}), Files: 0"
+                )
 
-            # 2️⃣ Smart strategy selection based on candidate count
-            original_search_type = search_type
-            if search_type == "smart":
+            # 3️⃣ Smart strategy selection based on candidate count
+            if search_type == "indexed":
+                # Index already narrowed the set; verify matches with the cheapest searcher
+                if len(candidates) <= 50 or shutil.which("rg") is None:
+                    search_strategy = "python"
+                else:
+                    search_strategy = "ripgrep"
+            elif search_type == "smart":
                 if len(candidates) <= 50:
                     # Small set - Python strategy more efficient (low startup cost)
                     search_type = "python"
@@ -191,27 +342,21 @@ class ParallelGrep(BaseTool):
                 else:
                     # Large set - Hybrid for best coverage and redundancy
                     search_type = "hybrid"
-
-            # 3️⃣ Create search configuration
-            # Note: include_patterns/exclude_patterns now only used for legacy compatibility
-            include_patterns = self._parse_patterns(include_files) if include_files else ["*"]
-            exclude_patterns = self._parse_patterns(exclude_files) if exclude_files else []
-            config = SearchConfig(
-                case_sensitive=case_sensitive,
-                use_regex=use_regex,
-                max_results=max_results,
-                context_lines=context_lines,
-                include_patterns=include_patterns,
-                exclude_patterns=exclude_patterns,
-            )
+            if search_type != "indexed":
+                search_strategy = search_type
 
             # 4️⃣ Execute chosen strategy with pre-filtered candidates
             try:
-                if search_type == "ripgrep":
-                    results = await self._ripgrep_search_filtered(pattern, candidates, config)
-                elif search_type == "python":
+                if search_strategy == "ripgrep":
+                    try:
+                        results = await self._ripgrep_search_filtered(pattern, candidates, config)
+                    except RipgrepUnavailableError:
+                        results = await self._python_search_filtered(pattern, candidates, config)
+                        if search_type == "ripgrep":
+                            search_type = "python"
+                elif search_strategy == "python":
                     results = await self._python_search_filtered(pattern, candidates, config)
-                elif search_type == "hybrid":
+                elif search_strategy == "hybrid":
                     results = await self._hybrid_search_filtered(pattern, candidates, config)
                 else:
                     raise ToolExecutionError(f"Unknown search type: {search_type}")
@@ -220,18 +365,9 @@ class ParallelGrep(BaseTool):
                 raise
 
             # 5️⃣ Format and return results with strategy info
-            strategy_info = f"Strategy: {search_type} (was {original_search_type}), Files: {len(candidates)}/{MAX_GLOB}"
-            formatted_results = self._format_results(results, pattern, config)
-
-            # Add strategy info to results
-            if formatted_results.startswith("Found"):
-                lines = formatted_results.split("\n")
-                lines[1] = (
-                    f"Strategy: {search_type} | Candidates: {len(candidates)} files | " + lines[1]
-                )
-                return "\n".join(lines)
-            else:
-                return f"{formatted_results}\n\n{strategy_info}"
+            return self._format_with_strategy(
+                results, pattern, config, search_type, original_search_type, len(candidates)
+            )
 
         except TooBroadPatternError:
             # Re-raise TooBroadPatternError without wrapping it
@@ -239,6 +375,29 @@ class ParallelGrep(BaseTool):
         except Exception as e:
             raise ToolExecutionError(f"Grep search failed: {str(e)}")
 
+    def _format_with_strategy(
+        self,
+        results: List[SearchResult],
+        pattern: str,
+        config: SearchConfig,
+        search_type: str,
+        original_search_type: str,
+        file_count: int,
+    ) -> str:
+        """Format results and annotate them with the strategy and candidate count."""
+        strategy_info = (
+            f"Strategy: {search_type} (was {original_search_type}), Files: {file_count}/{MAX_GLOB}"
+        )
+        formatted_results = self._format_results(results, pattern, config)
+
+        # Add strategy info to results
+        if formatted_results.startswith("Found"):
+            lines = formatted_results.split("\n")
+            lines[1] = f"Strategy: {search_type} | Candidates: {file_count} files | " + lines[1]
+            return "\n".join(lines)
+        else:
+            return f"{formatted_results}\n\n{strategy_info}"
+
     async def _smart_search(
         self, pattern: str, directory: str, config: SearchConfig
     ) -> List[SearchResult]:
@@ -259,98 +418,96 @@ class ParallelGrep(BaseTool):
         self, pattern: str, directory: str, config: SearchConfig
     ) -> List[SearchResult]:
         """Use ripgrep for high-performance searching with first match deadline."""
+        cmd = self._ripgrep_command(config)
+
+        # Add include/exclude patterns
+        for pattern_str in config.include_patterns:
+            if pattern_str != "*":
+                cmd.extend(["--glob", pattern_str])
+        for pattern_str in config.exclude_patterns:
+            cmd.extend(["--glob", f"!{pattern_str}"])
+
+        # Add pattern and directory
+        cmd.extend(["--", pattern, directory])
+
+        deadline = asyncio.get_event_loop().time() + config.first_match_deadline
+        return await self._stream_ripgrep(cmd, pattern, config, deadline, config.max_results)
+
+    def _ripgrep_command(self, config: SearchConfig) -> List[str]:
+        """Build the common ripgrep command line for a search configuration."""
+        cmd = ["rg", "--json"]
+        if not config.case_sensitive:
+            cmd.append("--ignore-case")
+        if not config.use_regex:
+            cmd.append("--fixed-strings")
+        if config.max_results:
+            cmd.extend(["--max-count", str(config.max_results)])
+        return cmd
+
+    async def _stream_ripgrep(
+        self,
+        cmd: List[str],
+        pattern: str,
+        config: SearchConfig,
+        deadline: Optional[float],
+        max_results: int,
+    ) -> List[SearchResult]:
+        """
+        Run ripgrep and consume its JSON output line by line.
+
+        Only match records are decoded, and the process is killed as soon as
+        max_results matches are collected, so broad patterns don't produce
+        output that is thrown away. Raises TooBroadPatternError if no match
+        arrives before the deadline (event loop time; None waits indefinitely),
+        and RipgrepUnavailableError if ripgrep cannot be started.
+        """
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                limit=RG_LINE_LIMIT,
+            )
+        except OSError as e:
+            raise RipgrepUnavailableError(str(e)) from e
 
-        def run_ripgrep():
-            cmd = ["rg", "--json"]
+        loop = asyncio.get_event_loop()
+        results: List[SearchResult] = []
 
-            # Add options based on config
-            if not config.case_sensitive:
-                cmd.append("--ignore-case")
-            if config.context_lines > 0:
-                cmd.extend(["--context", str(config.context_lines)])
-            if config.max_results:
-                cmd.extend(["--max-count", str(config.max_results)])
+        try:
+            while len(results) < max_results:
+                timeout = None
+                if not results and deadline is not None:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        raise TooBroadPatternError(pattern, config.first_match_deadline)
 
-            # Add include/exclude patterns
-            for pattern_str in config.include_patterns:
-                if pattern_str != "*":
-                    cmd.extend(["--glob", pattern_str])
-            for pattern_str in config.exclude_patterns:
-                cmd.extend(["--glob", f"!{pattern_str}"])
+                try:
+                    line = await asyncio.wait_for(process.stdout.readline(), timeout)
+                except asyncio.TimeoutError:
+                    raise TooBroadPatternError(pattern, config.first_match_deadline)
+                except ValueError:
+                    # Record longer than RG_LINE_LIMIT (e.g. minified file); skip it
+                    continue
 
-            # Add pattern and directory
-            cmd.extend([pattern, directory])
+                if not line:
+                    break
+                # Cheap prefix check avoids decoding begin/end/context/summary records
+                if not line.startswith(RG_MATCH_PREFIX):
+                    continue
 
-            try:
-                # Start the process
-                process = subprocess.Popen(
-                    cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-                
-                # Monitor for first match within deadline
-                start_time = time.time()
-                output_lines = []
-                first_match_found = False
-                
-                while True:
-                    # Check if we exceeded the first match deadline
-                    if not first_match_found and (time.time() - start_time) > config.first_match_deadline:
-                        process.kill()
-                        process.wait()
-                        raise TooBroadPatternError(pattern, config.first_match_deadline)
-                    
-                    # Check if process is still running
-                    if process.poll() is not None:
-                        # Process finished, get any remaining output
-                        remaining_output, _ = process.communicate()
-                        if remaining_output:
-                            output_lines.extend(remaining_output.splitlines())
-                        break
-                    
-                    # Try to read a line (non-blocking)
-                    try:
-                        line = process.stdout.readline()
-                        if line:
-                            output_lines.append(line.rstrip())
-                            # Check if this is a match line
-                            if '"type":"match"' in line:
-                                first_match_found = True
-                    except:
-                        pass
-                    
-                    # Small sleep to avoid busy waiting
-                    time.sleep(0.01)
-                
-                # Check exit code
-                if process.returncode == 0:
-                    return "\n".join(output_lines)
-                else:
-                    return None
-                    
-            except TooBroadPatternError:
-                raise
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                return None
-            except Exception as e:
-                # Make sure to clean up the process
-                if 'process' in locals():
-                    try:
-                        process.kill()
-                        process.wait()
-                    except:
-                        pass
-                return None
+                result = self._parse_ripgrep_match(line)
+                if result is not None:
+                    results.append(result)
+        finally:
+            if process.returncode is None:
+                try:
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
 
-        # Run ripgrep with monitoring in thread pool
-        try:
-            output = await asyncio.get_event_loop().run_in_executor(self._executor, run_ripgrep)
-            return self._parse_ripgrep_output(output) if output else []
-        except TooBroadPatternError:
-            raise
+        return results
 
     async def _python_search(
         self, pattern: str, directory: str, config: SearchConfig
@@ -359,13 +516,12 @@ class ParallelGrep(BaseTool):
 
         # Find all files to search
         files = await self._find_files(directory, config)
+        sized_files = await self._sizes_for_process_search(files)
+        if sized_files is not None:
+            return await self._process_search(pattern, sized_files, config)
 
-        # Prepare search pattern
-        if config.use_regex:
-            flags = 0 if config.case_sensitive else re.IGNORECASE
-            regex_pattern = re.compile(pattern, flags)
-        else:
-            regex_pattern = None
+        # Compile once; every file is scanned as raw bytes
+        byte_pattern = BytePattern(pattern, config.use_regex, config.case_sensitive)
 
         # Track search progress
         start_time = time.time()
@@ -374,7 +530,7 @@ class ParallelGrep(BaseTool):
         async def search_with_monitoring(file_path: Path):
             """Search a file and signal when first match is found."""
             try:
-                file_results = await self._search_file(file_path, pattern, regex_pattern, config)
+                file_results = await self._search_file(file_path, byte_pattern, config)
                 if file_results and not first_match_event.is_set():
                     first_match_event.set()
                 return file_results
@@ -413,9 +569,9 @@ class ParallelGrep(BaseTool):
                 if isinstance(file_results, list):
                     results.extend(file_results)
             
-            # Sort by relevance and limit results
-            results.sort(key=lambda r: r.relevance_score, reverse=True)
-            return results[: config.max_results]
+            # Rank the raw hits, then resolve line numbers and context for the kept ones
+            results.sort(key=lambda hit: hit.score, reverse=True)
+            return await self._resolve_hits(results[: config.max_results], config)
             
         except asyncio.CancelledError:
             # Re-raise TooBroadPatternError if that's what caused the cancellation
@@ -473,96 +629,27 @@ class ParallelGrep(BaseTool):
     ) -> List[SearchResult]:
         """
         Run ripgrep on pre-filtered file list with first match deadline.
-        """
-
-        def run_ripgrep_filtered():
-            cmd = ["rg", "--json"]
 
-            # Add configuration flags
-            if not config.case_sensitive:
-                cmd.append("--ignore-case")
-            if config.context_lines > 0:
-                cmd.extend(["--context", str(config.context_lines)])
-            if config.max_results:
-                cmd.extend(["--max-count", str(config.max_results)])
-
-            # Add pattern and explicit file list
-            cmd.append(pattern)
-            cmd.extend(str(f) for f in candidates)
-
-            try:
-                # Start the process
-                process = subprocess.Popen(
+        Long candidate lists are split over several commands so no command
+        line exceeds the OS argument limit; the deadline covers all of them.
+        """
+        deadline = asyncio.get_event_loop().time() + config.first_match_deadline
+        results: List[SearchResult] = []
+        for chunk in _chunk_paths(candidates):
+            cmd = self._ripgrep_command(config)
+            cmd.extend(["--", pattern, *chunk])
+            results.extend(
+                await self._stream_ripgrep(
                     cmd,
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
+                    pattern,
+                    config,
+                    None if results else deadline,
+                    config.max_results - len(results),
                 )
-                
-                # Monitor for first match within deadline
-                start_time = time.time()
-                output_lines = []
-                first_match_found = False
-                
-                while True:
-                    # Check if we exceeded the first match deadline
-                    if not first_match_found and (time.time() - start_time) > config.first_match_deadline:
-                        process.kill()
-                        process.wait()
-                        raise TooBroadPatternError(pattern, config.first_match_deadline)
-                    
-                    # Check if process is still running
-                    if process.poll() is not None:
-                        # Process finished, get any remaining output
-                        remaining_output, _ = process.communicate()
-                        if remaining_output:
-                            output_lines.extend(remaining_output.splitlines())
-                        break
-                    
-                    # Try to read a line (non-blocking)
-                    try:
-                        # Use a small timeout to avoid blocking indefinitely
-                        line = process.stdout.readline()
-                        if line:
-                            output_lines.append(line.rstrip())
-                            # Check if this is a match line
-                            if '"type":"match"' in line:
-                                first_match_found = True
-                    except:
-                        pass
-                    
-                    # Small sleep to avoid busy waiting
-                    time.sleep(0.01)
-                
-                # Check exit code
-                if process.returncode == 0:
-                    return "\n".join(output_lines)
-                else:
-                    return None
-                    
-            except TooBroadPatternError:
-                raise
-            except (subprocess.TimeoutExpired, FileNotFoundError):
-                return None
-            except Exception as e:
-                # Make sure to clean up the process
-                if 'process' in locals():
-                    try:
-                        process.kill()
-                        process.wait()
-                    except:
-                        pass
-                return None
-
-        # Run ripgrep with monitoring in thread pool
-        try:
-            output = await asyncio.get_event_loop().run_in_executor(
-                self._executor, run_ripgrep_filtered
             )
-            return self._parse_ripgrep_output(output) if output else []
-        except TooBroadPatternError:
-            raise
+            if len(results) >= config.max_results:
+                break
+        return results
 
     async def _python_search_filtered(
         self, pattern: str, candidates: List[Path], config: SearchConfig
@@ -570,12 +657,12 @@ class ParallelGrep(BaseTool):
         """
         Run Python parallel search on pre-filtered candidates with first match deadline.
         """
-        # Prepare search pattern
-        if config.use_regex:
-            flags = 0 if config.case_sensitive else re.IGNORECASE
-            regex_pattern = re.compile(pattern, flags)
-        else:
-            regex_pattern = None
+        sized_files = await self._sizes_for_process_search(candidates)
+        if sized_files is not None:
+            return await self._process_search(pattern, sized_files, config)
+
+        # Compile once; every file is scanned as raw bytes
+        byte_pattern = BytePattern(pattern, config.use_regex, config.case_sensitive)
 
         # Track search progress
         start_time = time.time()
@@ -585,7 +672,7 @@ class ParallelGrep(BaseTool):
         async def search_with_monitoring(file_path: Path):
             """Search a file and signal when first match is found."""
             try:
-                file_results = await self._search_file(file_path, pattern, regex_pattern, config)
+                file_results = await self._search_file(file_path, byte_pattern, config)
                 if file_results and not first_match_event.is_set():
                     first_match_event.set()
                 return file_results
@@ -624,9 +711,9 @@ class ParallelGrep(BaseTool):
                 if isinstance(file_results, list):
                     results.extend(file_results)
             
-            # Sort by relevance and limit results
-            results.sort(key=lambda r: r.relevance_score, reverse=True)
-            return results[: config.max_results]
+            # Rank the raw hits, then resolve line numbers and context for the kept ones
+            results.sort(key=lambda hit: hit.score, reverse=True)
+            return await self._resolve_hits(results[: config.max_results], config)
             
         except asyncio.CancelledError:
             # Re-raise TooBroadPatternError if that's what caused the cancellation
@@ -637,6 +724,148 @@ class ParallelGrep(BaseTool):
                     raise
             return []
 
+    async def _python_search_stream(
+        self,
+        pattern: str,
+        directory: str,
+        include: str,
+        exclude: Optional[str],
+        config: SearchConfig,
+    ) -> Tuple[List[SearchResult], int]:
+        """
+        Search files while the parallel walk is still discovering them.
+
+        Each batch of walked files is searched as soon as it arrives. Batches go
+        to the thread pool until the files seen so far are large enough for
+        worker processes, after which later batches go to the process pool.
+
+        Returns:
+            (results, number of files searched)
+        """
+        loop = asyncio.get_event_loop()
+        matches_name = _compile_name_filter(include, exclude)
+        ignore = IgnoreMatcher(directory, patterns=COMMON_IGNORE_PATTERNS)
+        search_args = (pattern, config.use_regex, config.case_sensitive, config.max_results)
+        deadline = loop.time() + config.first_match_deadline
+
+        pending = set()
+        hits: List[ByteHit] = []
+        file_count = total_bytes = 0
+
+        def collect(done) -> None:
+            for future in done:
+                for hit_tuple in future.result():
+                    hit = ByteHit(*hit_tuple)
+                    hit.score = self._calculate_relevance(
+                        hit.path, hit.line, pattern, hit.match_start
+                    )
+                    hits.append(hit)
+
+        try:
+            # Sizes are taken in the walker threads, not on the event loop
+            async for entries in async_walk(
+                directory, batch_size=STREAM_BATCH, ignore=ignore, with_stat=True
+            ):
+                batch = []
+                for entry in entries:
+                    if file_count >= MAX_GLOB:
+                        break
+                    if matches_name(entry.name):
+                        file_count += 1
+                        total_bytes += entry.size
+                        batch.append(os.path.join(directory, entry.rel_path))
+                if batch:
+                    backend = choose_search_backend(file_count, total_bytes, search_worker_count())
+                    pool = (get_process_pool() if backend == "process" else None) or self._executor
+                    pending.add(loop.run_in_executor(pool, scan_shard, batch, *search_args))
+
+                done = {future for future in pending if future.done()}
+                pending -= done
+                collect(done)
+                if not hits and loop.time() > deadline:
+                    raise TooBroadPatternError(pattern, config.first_match_deadline)
+                if file_count >= MAX_GLOB:
+                    break
+
+            while pending:
+                timeout = None if hits else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise TooBroadPatternError(pattern, config.first_match_deadline)
+                collect(done)
+        finally:
+            for future in pending:
+                future.cancel()
+
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return await self._resolve_hits(hits[: config.max_results], config), file_count
+
+    async def _sizes_for_process_search(self, files: List[Path]) -> Optional[List[tuple]]:
+        """Return (path, size) pairs if the workload should go to worker processes."""
+        if len(files) < PROCESS_MIN_FILES or get_process_pool() is None:
+            return None
+
+        def stat_sync():
+            sized = []
+            for file_path in files:
+                try:
+                    sized.append((str(file_path), file_path.stat().st_size))
+                except OSError:
+                    continue
+            return sized
+
+        sized = await asyncio.get_event_loop().run_in_executor(self._executor, stat_sync)
+        total_bytes = sum(size for _, size in sized)
+        if choose_search_backend(len(sized), total_bytes, search_worker_count()) != "process":
+            return None
+        return sized
+
+    async def _process_search(
+        self, pattern: str, sized_files: List[tuple], config: SearchConfig
+    ) -> List[SearchResult]:
+        """Search size-balanced shards in worker processes, collecting hits as shards finish."""
+        pool = get_process_pool()
+        loop = asyncio.get_event_loop()
+        shards = shard_by_size(sized_files, search_worker_count() * SHARDS_PER_WORKER)
+        pending = {
+            loop.run_in_executor(
+                pool,
+                scan_shard,
+                shard,
+                pattern,
+                config.use_regex,
+                config.case_sensitive,
+                config.max_results,
+            )
+            for shard in shards
+        }
+
+        hits: List[ByteHit] = []
+        deadline = loop.time() + config.first_match_deadline
+        try:
+            while pending:
+                timeout = None if hits else max(0.0, deadline - loop.time())
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    raise TooBroadPatternError(pattern, config.first_match_deadline)
+                for future in done:
+                    for hit_tuple in future.result():
+                        hit = ByteHit(*hit_tuple)
+                        hit.score = self._calculate_relevance(
+                            hit.path, hit.line, pattern, hit.match_start
+                        )
+                        hits.append(hit)
+        finally:
+            for future in pending:
+                future.cancel()
+
+        hits.sort(key=lambda hit: hit.score, reverse=True)
+        return await self._resolve_hits(hits[: config.max_results], config)
+
     async def _hybrid_search_filtered(
         self, pattern: str, candidates: List[Path], config: SearchConfig
     ) -> List[SearchResult]:
@@ -718,84 +947,64 @@ class ParallelGrep(BaseTool):
     async def _search_file(
         self,
         file_path: Path,
-        pattern: str,
-        regex_pattern: Optional[re.Pattern],
+        pattern: BytePattern,
         config: SearchConfig,
-    ) -> List[SearchResult]:
-        """Search a single file for the pattern."""
+    ) -> List[ByteHit]:
+        """Search a single file for the pattern, returning scored byte-offset hits."""
 
         def search_file_sync():
-            try:
-                with file_path.open("r", encoding="utf-8", errors="ignore") as f:
-                    lines = f.readlines()
-
-                results = []
-                for i, line in enumerate(lines):
-                    line = line.rstrip("\n\r")
-
-                    # Search for pattern
-                    if regex_pattern:
-                        matches = list(regex_pattern.finditer(line))
-                    else:
-                        # Simple string search
-                        search_line = line if config.case_sensitive else line.lower()
-                        search_pattern = pattern if config.case_sensitive else pattern.lower()
-
-                        matches = []
-                        start = 0
-                        while True:
-                            pos = search_line.find(search_pattern, start)
-                            if pos == -1:
-                                break
-
-                            # Create a simple match object
-                            class SimpleMatch:
-                                def __init__(self, start_pos, end_pos):
-                                    self._start = start_pos
-                                    self._end = end_pos
-
-                                def start(self):
-                                    return self._start
-
-                                def end(self):
-                                    return self._end
-
-                            match = SimpleMatch(pos, pos + len(search_pattern))
-                            matches.append(match)
-                            start = pos + 1
-
-                    # Create results for each match
-                    for match in matches:
-                        # Get context lines
-                        context_start = max(0, i - config.context_lines)
-                        context_end = min(len(lines), i + config.context_lines + 1)
-
-                        context_before = [lines[j].rstrip("\n\r") for j in range(context_start, i)]
-                        context_after = [lines[j].rstrip("\n\r") for j in range(i + 1, context_end)]
-
-                        # Calculate relevance score
-                        relevance = self._calculate_relevance(str(file_path), line, pattern, match)
-
-                        result = SearchResult(
-                            file_path=str(file_path),
-                            line_number=i + 1,
-                            line_content=line,
-                            match_start=match.start() if hasattr(match, "start") else match.start(),
-                            match_end=match.end() if hasattr(match, "end") else match.end(),
-                            context_before=context_before,
-                            context_after=context_after,
-                            relevance_score=relevance,
-                        )
-                        results.append(result)
+            hits = scan_file(str(file_path), pattern, config.max_results)
+            for hit in hits:
+                hit.score = self._calculate_relevance(
+                    hit.path, hit.line, pattern.pattern, hit.match_start
+                )
+            return hits
 
-                return results
+        return await asyncio.get_event_loop().run_in_executor(self._executor, search_file_sync)
 
-            except Exception:
-                return []
+    async def _resolve_hits(self, hits: List[ByteHit], config: SearchConfig) -> List[SearchResult]:
+        """Turn ranked hits into SearchResults, reopening each file once."""
 
-        return await asyncio.get_event_loop().run_in_executor(self._executor, search_file_sync)
+        def resolve_sync():
+            by_file = {}
+            for hit in hits:
+                by_file.setdefault(hit.path, []).append(hit)
+
+            resolved = {}
+            for path, file_hits in by_file.items():
+                try:
+                    with open_buffer(path) as buf:
+                        lines = resolve_lines(buf, file_hits, config.context_lines)
+                except (OSError, ValueError):
+                    continue
+                for hit, info in zip(file_hits, lines):
+                    resolved[id(hit)] = info
+
+            results = []
+            for hit in hits:
+                info = resolved.get(id(hit))
+                if info is None:
+                    continue
+                line_number, context_before, context_after = info
+                results.append(
+                    SearchResult(
+                        file_path=hit.path,
+                        line_number=line_number,
+                        line_content=hit.line,
+                        match_start=hit.match_start,
+                        match_end=hit.match_end,
+                        context_before=context_before,
+                        context_after=context_after,
+                        relevance_score=hit.score,
+                    )
+                )
+            return results
+
+        return await asyncio.get_event_loop().run_in_executor(self._executor, resolve_sync)
 
-    def _calculate_relevance(self, file_path: str, line: str, pattern: str, match) -> float:
+    def _calculate_relevance(
+        self, file_path: str, line: str, pattern: str, match_start: int
+    ) -> float:
         """Calculate relevance score for a search result."""
         score = 0.0
 
@@ -807,7 +1016,7 @@ class ParallelGrep(BaseTool):
             score += 0.5
 
         # Boost for matches at word boundaries
-        if match.start() == 0 or not line[match.start() - 1].isalnum():
+        if match_start == 0 or not line[match_start - 1].isalnum():
             score += 0.3
 
         # Boost for certain file types
@@ -821,36 +1030,26 @@ class ParallelGrep(BaseTool):
 
         return score
 
-    def _parse_ripgrep_output(self, output: str) -> List[SearchResult]:
-        """Parse ripgrep JSON output into SearchResult objects."""
-        import json
-
-        results = []
-        for line in output.strip().split("\n"):
-            if not line:
-                continue
-
-            try:
-                data = json.loads(line)
-                if data.get("type") != "match":
-                    continue
-
-                match_data = data["data"]
-                result = SearchResult(
-                    file_path=match_data["path"]["text"],
-                    line_number=match_data["line_number"],
-                    line_content=match_data["lines"]["text"].rstrip("\n\r"),
-                    match_start=match_data["submatches"][0]["start"],
-                    match_end=match_data["submatches"][0]["end"],
-                    context_before=[],  # Ripgrep context handling would go here
-                    context_after=[],
-                    relevance_score=1.0,
-                )
-                results.append(result)
-            except (json.JSONDecodeError, KeyError):
-                continue
+    def _parse_ripgrep_match(self, line: bytes) -> Optional[SearchResult]:
+        """Parse a single ripgrep JSON match record into a SearchResult."""
+        try:
+            data = json.loads(line)
+            if data.get("type") != "match":
+                return None
 
-        return results
+            match_data = data["data"]
+            return SearchResult(
+                file_path=match_data["path"]["text"],
+                line_number=match_data["line_number"],
+                line_content=match_data["lines"]["text"].rstrip("\n\r"),
+                match_start=match_data["submatches"][0]["start"],
+                match_end=match_data["submatches"][0]["end"],
+                context_before=[],  # Ripgrep context handling would go here
+                context_after=[],
+                relevance_score=1.0,
+            )
+        except (json.JSONDecodeError, KeyError, IndexError, UnicodeDecodeError):
+            return None
 
     def _parse_patterns(self, patterns: str) -> List[str]:
         """Parse comma-separated file patterns."""
@@ -916,7 +1115,10 @@ async def grep(
         exclude_files: File patterns to exclude, comma-separated (e.g., "*.pyc,node_modules/*")
         max_results: Maximum number of results to return (default: 50)
         context_lines: Number of context lines before/after matches (default: 2)
-        search_type: Search strategy - "smart", "ripgrep", "python", or "hybrid" (default: "smart")
+        search_type: Search strategy - "smart", "indexed", "ripgrep", "python", or "hybrid"
+            (default: "smart"). "indexed" narrows candidates with the trigram index, building
+            it on first use and checking it for outside edits; "smart" uses the index
+            automatically while a file watcher keeps it current.
 
     Returns:
         Formatted search results with file paths, line numbers, and context
@@ -5,13 +5,26 @@ File reading tool for agent operations in the TunaCode application.
 Provides safe file reading with size limits and proper error handling.
 """
 
+import asyncio
 import os
+from typing import Optional
 
-from tunacode.constants import (ERROR_FILE_DECODE, ERROR_FILE_DECODE_DETAILS, ERROR_FILE_NOT_FOUND,
-                                ERROR_FILE_TOO_LARGE, MAX_FILE_SIZE, MSG_FILE_SIZE_LIMIT)
+from pydantic_ai.exceptions import ModelRetry
+
+from tunacode.constants import (DEFAULT_READ_LINE_LIMIT, ERROR_FILE_DECODE,
+                                ERROR_FILE_DECODE_DETAILS, ERROR_FILE_NOT_FOUND, MAX_FILE_SIZE,
+                                MSG_FILE_RANGE, MSG_FILE_TRUNCATED)
 from tunacode.exceptions import ToolExecutionError
 from tunacode.tools.base import FileBasedTool
 from tunacode.types import ToolResult
+from tunacode.utils.file_cache import FILE_CACHE
+from tunacode.utils.line_index import LINE_INDEX_CACHE
+
+
+def _format_size(size: int) -> str:
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f}MB"
+    return f"{size / 1024:.0f}KB"
 
 
 class ReadFileTool(FileBasedTool):
@@ -21,30 +34,56 @@ class ReadFileTool(FileBasedTool):
     def tool_name(self) -> str:
         return "Read"
 
-    async def _execute(self, filepath: str) -> ToolResult:
-        """Read the contents of a file.
+    async def _execute(
+        self, filepath: str, offset: Optional[int] = None, limit: Optional[int] = None
+    ) -> ToolResult:
+        """Read the contents of a file, or a range of its lines.
 
         Args:
             filepath: The path to the file to read.
+            offset: 1-based line to start from.
+            limit: Maximum number of lines to return.
 
         Returns:
             ToolResult: The contents of the file or an error message.
 
         Raises:
+            ModelRetry: If offset is past the end of the file
             Exception: Any file reading errors
         """
-        # Add a size limit to prevent reading huge files
-        if os.path.getsize(filepath) > MAX_FILE_SIZE:
-            err_msg = ERROR_FILE_TOO_LARGE.format(filepath=filepath) + MSG_FILE_SIZE_LIMIT
-            if self.ui:
-                await self.ui.error(err_msg)
-            raise ToolExecutionError(tool_name=self.tool_name, message=err_msg, original_error=None)
-
-        with open(filepath, "r", encoding="utf-8") as file:
-            content = file.read()
-            return content
-
-    async def _handle_error(self, error: Exception, filepath: str = None) -> ToolResult:
+        if offset is None and limit is None and os.path.getsize(filepath) <= MAX_FILE_SIZE:
+            return FILE_CACHE.read(filepath)
+
+        # Large files and ranges are served from a line index over an mmap
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._read_lines, filepath, offset, limit)
+
+    def _read_lines(self, filepath: str, offset: Optional[int], limit: Optional[int]) -> str:
+        index = LINE_INDEX_CACHE.get(filepath)
+        total = index.line_count
+        start = max(1, offset or 1)
+        if start > max(total, 1):
+            raise ModelRetry(
+                f"offset={offset} is past the end of '{filepath}', which has {total} lines."
+            )
+
+        count = limit if limit and limit > 0 else DEFAULT_READ_LINE_LIMIT
+        text, returned = index.read(start - 1, count, max_bytes=MAX_FILE_SIZE)
+        end = start + returned - 1
+
+        if offset is None and limit is None:
+            header = MSG_FILE_TRUNCATED.format(
+                filepath=filepath, size=_format_size(index.size), start=start, end=end, total=total
+            )
+            return f"{header}\n{text}"
+        if end < total:
+            footer = MSG_FILE_RANGE.format(start=start, end=end, total=total, next=end + 1)
+            return f"{text}\n{footer}" if text.endswith("\n") else f"{text}\n\n{footer}"
+        return text
+
+    async def _handle_error(
+        self, error: Exception, filepath: str = None, *args, **kwargs
+    ) -> ToolResult:
         """Handle errors with specific messages for common cases.
 
         Raises:
@@ -70,19 +109,26 @@ class ReadFileTool(FileBasedTool):
 
 
 # Create the function that maintains the existing interface
-async def read_file(filepath: str) -> str:
+async def read_file(
+    filepath: str, offset: Optional[int] = None, limit: Optional[int] = None
+) -> str:
     """
     Read the contents of a file.
 
+    Files over 100KB return their first lines with a note; pass offset and
+    limit to page through large files or jump to a known line.
+
     Args:
         filepath: The path to the file to read.
+        offset: 1-based line number to start reading from.
+        limit: Maximum number of lines to read.
 
     Returns:
         str: The contents of the file or an error message.
     """
     tool = ReadFileTool(None)  # No UI for pydantic-ai compatibility
     try:
-        return await tool.execute(filepath)
+        return await tool.execute(filepath, offset, limit)
     except ToolExecutionError as e:
         # Return error message for pydantic-ai compatibility
         return str(e)
@@ -0,0 +1,207 @@
+"""
+Module: tunacode.tools.symbol_lookup
+
+Go-to-definition and find-references tools for agent operations.
+Answers from the CodeIndex symbol and import maps instead of grepping the tree.
+The index is brought up to date before each lookup, so edits made outside the
+file tools are seen.
+"""
+
+import asyncio
+import re
+from pathlib import Path
+from typing import List, Optional, Set
+
+from tunacode.exceptions import ToolExecutionError
+from tunacode.tools.base import BaseTool
+from tunacode.types import ToolResult
+from tunacode.utils.file_cache import FILE_CACHE
+
+MAX_DEFINITIONS = 50
+MAX_REFERENCES = 100
+
+
+def _format_range(path: Path, line: int, end_line: int) -> str:
+    if end_line > line:
+        return f"{path}:{line}-{end_line}"
+    return f"{path}:{line}"
+
+
+class FindSymbolTool(BaseTool):
+    """Tool for locating symbol definitions from the code index."""
+
+    @property
+    def tool_name(self) -> str:
+        return "FindSymbol"
+
+    async def _execute(
+        self, name: str, kind: Optional[str] = None, max_results: int = MAX_DEFINITIONS
+    ) -> ToolResult:
+        """Find where a class, function, method or type is defined.
+
+        Args:
+            name: Symbol name, or a qualified name such as "Server.start"
+            kind: Optional kind filter (class, function, method, interface, struct, ...)
+            max_results: Maximum number of definitions to return
+
+        Returns:
+            ToolResult: One "path:start-end  kind qualname" line per definition
+        """
+        from tunacode.core.code_index import get_code_index
+
+        name = name.strip()
+        if not name:
+            raise ValueError("Symbol name cannot be empty")
+
+        code_index = get_code_index()
+        await asyncio.get_running_loop().run_in_executor(None, code_index.ensure_current)
+        definitions = code_index.find_definitions(name, kind=kind)
+        if not definitions:
+            suffix = f" of kind '{kind}'" if kind else ""
+            return f"No definitions found for '{name}'{suffix}"
+
+        lines = [f"Found {len(definitions)} definition(s) of '{name}':"]
+        for path, symbol in definitions[:max_results]:
+            location = _format_range(path, symbol.line, symbol.end_line)
+            lines.append(f"  {location}  {symbol.kind} {symbol.qualname}")
+        if len(definitions) > max_results:
+            lines.append(f"Note: Output limited to {max_results} definitions")
+        return "\n".join(lines)
+
+    def _get_error_context(self, name: str = None, *args, **kwargs) -> str:
+        """Get error context including the symbol name."""
+        if name:
+            return f"finding symbol '{name}'"
+        return super()._get_error_context(*args, **kwargs)
+
+
+class FindReferencesTool(BaseTool):
+    """Tool for locating the uses of a symbol or module."""
+
+    @property
+    def tool_name(self) -> str:
+        return "FindReferences"
+
+    async def _execute(self, name: str, max_results: int = MAX_REFERENCES) -> ToolResult:
+        """Find the lines that reference a symbol, and the files that import it as a module.
+
+        Candidate files come from the trigram index while a file watcher keeps
+        it current, so only files that can contain the name are read.
+        Definition sites are excluded.
+
+        Args:
+            name: Symbol or module name (the last part of a qualified name is matched)
+            max_results: Maximum number of reference lines to return
+
+        Returns:
+            ToolResult: Importing files, then one "path:line: text" line per reference
+        """
+        from tunacode.core.code_index import get_code_index
+
+        name = name.strip()
+        if not name:
+            raise ValueError("Symbol name cannot be empty")
+
+        from tunacode.core.watcher import is_watched
+
+        code_index = get_code_index()
+        await asyncio.get_running_loop().run_in_executor(None, code_index.ensure_current)
+        word = name.rsplit(".", 1)[-1]
+        importers = code_index.find_imports(name)
+        definition_lines = {
+            (path, symbol.line) for path, symbol in code_index.find_definitions(name)
+        }
+
+        candidates: Optional[List[str]] = None
+        # Without a watcher the trigram index can miss files edited outside the tools
+        if is_watched(code_index.root_dir):
+            candidates = code_index.get_trigram_index().candidates(word)
+        if candidates is None:
+            candidates = sorted(str(p) for p in code_index.get_all_files())
+
+        pattern = re.compile(rf"\b{re.escape(word)}\b")
+        references: List[str] = []
+        files: Set[str] = set()
+        truncated = False
+        for rel_path in candidates:
+            try:
+                content = FILE_CACHE.read(str(code_index.root_dir / rel_path))
+            except (OSError, UnicodeDecodeError):
+                continue
+            for line_number, text in enumerate(content.splitlines(), 1):
+                if not pattern.search(text) or (Path(rel_path), line_number) in definition_lines:
+                    continue
+                if len(references) >= max_results:
+                    truncated = True
+                    break
+                references.append(f"  {rel_path}:{line_number}: {text.strip()[:200]}")
+                files.add(rel_path)
+            if truncated:
+                break
+
+        if not references and not importers:
+            return f"No references found for '{name}'"
+
+        lines = []
+        if importers:
+            lines.append(f"Imported as a module by {len(importers)} file(s):")
+            lines.extend(f"  {path}" for path in importers)
+        if references:
+            if lines:
+                lines.append("")
+            lines.append(f"Found {len(references)} reference(s) in {len(files)} file(s):")
+            lines.extend(references)
+        if truncated:
+            lines.append(f"Note: Output limited to {max_results} references")
+        return "\n".join(lines)
+
+    def _get_error_context(self, name: str = None, *args, **kwargs) -> str:
+        """Get error context including the symbol name."""
+        if name:
+            return f"finding references to '{name}'"
+        return super()._get_error_context(*args, **kwargs)
+
+
+# Create the functions that maintain compatibility with pydantic-ai
+async def find_symbol(name: str, kind: Optional[str] = None, max_results: int = 50) -> str:
+    """
+    Find where a symbol is defined, without grepping the codebase.
+
+    Looks the name up in the code index and returns file:line ranges. Prefer this
+    over grep for "where is X defined" questions.
+
+    Args:
+        name: Class, function, method or type name; qualified names like "Server.start" work
+        kind: Optional kind filter (class, function, method, interface, struct, enum, trait, type)
+        max_results: Maximum number of definitions to return (default: 50)
+
+    Returns:
+        str: Definition locations as "path:start-end  kind qualname", or an error message
+    """
+    tool = FindSymbolTool(None)  # No UI for pydantic-ai compatibility
+    try:
+        return await tool.execute(name, kind=kind, max_results=max_results)
+    except ToolExecutionError as e:
+        # Return error message for pydantic-ai compatibility
+        return str(e)
+
+
+async def find_references(name: str, max_results: int = 100) -> str:
+    """
+    Find where a symbol or module is used, excluding its definitions.
+
+    Reads only the files the code index says can contain the name.
+
+    Args:
+        name: Symbol or module name
+        max_results: Maximum number of reference lines to return (default: 100)
+
+    Returns:
+        str: Importing files and "path:line: text" references, or an error message
+    """
+    tool = FindReferencesTool(None)  # No UI for pydantic-ai compatibility
+    try:
+        return await tool.execute(name, max_results=max_results)
+    except ToolExecutionError as e:
+        # Return error message for pydantic-ai compatibility
+        return str(e)
@@ -12,6 +12,7 @@ from pydantic_ai.exceptions import ModelRetry
 from tunacode.exceptions import ToolExecutionError
 from tunacode.tools.base import FileBasedTool
 from tunacode.types import ToolResult
+from tunacode.utils.file_cache import FILE_CACHE
 
 
 class UpdateFileTool(FileBasedTool):
@@ -36,14 +37,15 @@ class UpdateFileTool(FileBasedTool):
             ModelRetry: If file not found or target not found
             Exception: Any file operation errors
         """
+        from tunacode.core.code_index import refresh_written_file
+
         if not os.path.exists(filepath):
             raise ModelRetry(
                 f"File '{filepath}' not found. Cannot update. "
                 "Verify the filepath or use `write_file` if it's a new file."
             )
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            original = f.read()
+        original = FILE_CACHE.read(filepath)
 
         if target not in original:
             # Provide context to help the LLM find the target
@@ -68,6 +70,8 @@ class UpdateFileTool(FileBasedTool):
 
         with open(filepath, "w", encoding="utf-8") as f:
             f.write(new_content)
+        FILE_CACHE.update(filepath, new_content)
+        refresh_written_file(filepath)
 
         return f"File '{filepath}' updated successfully."
 
@@ -12,6 +12,7 @@ from pydantic_ai.exceptions import ModelRetry
 from tunacode.exceptions import ToolExecutionError
 from tunacode.tools.base import FileBasedTool
 from tunacode.types import ToolResult
+from tunacode.utils.file_cache import FILE_CACHE
 
 
 class WriteFileTool(FileBasedTool):
@@ -35,6 +36,8 @@ class WriteFileTool(FileBasedTool):
             ModelRetry: If the file already exists
             Exception: Any file writing errors
         """
+        from tunacode.core.code_index import refresh_written_file
+
         # Prevent overwriting existing files with this tool.
         if os.path.exists(filepath):
             # Use ModelRetry to guide the LLM
@@ -50,6 +53,8 @@ class WriteFileTool(FileBasedTool):
 
         with open(filepath, "w", encoding="utf-8") as file:
             file.write(content)
+        FILE_CACHE.update(filepath, content)
+        refresh_written_file(filepath)
 
         return f"Successfully wrote to new file: {filepath}"
 
@@ -55,6 +55,7 @@ class ModelConfig:
     """Configuration for a model including pricing."""
 
     pricing: ModelPricing
+    context_window: Optional[int] = None  # Max prompt + completion tokens
 
 
 ModelRegistry = Dict[str, ModelConfig]
@@ -1,7 +1,9 @@
+import heapq
 import math
 import re
+from array import array
 from collections import Counter
-from typing import Iterable, List
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
 
 
 def tokenize(text: str) -> List[str]:
@@ -9,47 +11,193 @@ def tokenize(text: str) -> List[str]:
     return re.findall(r"\w+", text.lower())
 
 
-class BM25:
-    """Minimal BM25 implementation for small corpora."""
+class SparseBM25:
+    """BM25 over a sparse term/document matrix with incremental updates.
 
-    def __init__(self, corpus: Iterable[str], k1: float = 1.5, b: float = 0.75):
+    Each term row stores its posting list as two parallel typed arrays (document
+    ids and term frequencies), and document lengths live in a flat array. A query
+    is scored in one pass over the posting lists of its terms, so cost scales with
+    the number of matching postings rather than the corpus size.
+
+    Documents are addressed by caller-supplied keys. Removal tombstones the
+    internal document id; tombstoned postings are skipped while scoring and
+    reclaimed by compaction once they outnumber live documents.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
         self.k1 = k1
         self.b = b
-        self.documents = [tokenize(doc) for doc in corpus]
-        self.doc_freqs = []
-        self.doc_lens = []
-        self.idf = {}
-        self.avgdl = 0.0
-        self._initialize()
-
-    def _initialize(self) -> None:
-        df = Counter()
-        for doc in self.documents:
-            freqs = Counter(doc)
-            self.doc_freqs.append(freqs)
-            self.doc_lens.append(len(doc))
-            for word in freqs:
-                df[word] += 1
-        self.avgdl = sum(self.doc_lens) / len(self.documents) if self.documents else 0.0
-        total_docs = len(self.documents)
-        for word, freq in df.items():
-            self.idf[word] = math.log(1 + (total_docs - freq + 0.5) / (freq + 0.5))
+
+        self._vocab: Dict[str, int] = {}
+        self._postings_docs: List[array] = []
+        self._postings_tfs: List[array] = []
+        self._df = array("l")
+
+        self._doc_lens = array("l")
+        self._doc_terms: List[Optional[array]] = []
+        self._doc_keys: List[Optional[Hashable]] = []
+        self._key_to_doc: Dict[Hashable, int] = {}
+        self._live = bytearray()
+
+        self._total_len = 0
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._key_to_doc)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._key_to_doc
+
+    @property
+    def avgdl(self) -> float:
+        return self._total_len / len(self._key_to_doc) if self._key_to_doc else 0.0
+
+    def add_document(self, key: Hashable, text: str = "", tokens: Optional[List[str]] = None):
+        """Add or replace a document.
+
+        Args:
+            key: Caller identifier for the document (e.g. a path or chunk id)
+            text: Document text, tokenized with ``tokenize`` when tokens is None
+            tokens: Pre-tokenized document terms
+        """
+        if key in self._key_to_doc:
+            self.remove_document(key)
+
+        freqs = Counter(tokens if tokens is not None else tokenize(text))
+        doc_id = len(self._doc_lens)
+        doc_len = sum(freqs.values())
+
+        term_ids = array("l")
+        for term, tf in freqs.items():
+            term_id = self._vocab.get(term)
+            if term_id is None:
+                term_id = len(self._postings_docs)
+                self._vocab[term] = term_id
+                self._postings_docs.append(array("l"))
+                self._postings_tfs.append(array("l"))
+                self._df.append(0)
+            self._postings_docs[term_id].append(doc_id)
+            self._postings_tfs[term_id].append(tf)
+            self._df[term_id] += 1
+            term_ids.append(term_id)
+
+        self._doc_lens.append(doc_len)
+        self._doc_terms.append(term_ids)
+        self._doc_keys.append(key)
+        self._live.append(1)
+        self._key_to_doc[key] = doc_id
+        self._total_len += doc_len
+
+    def remove_document(self, key: Hashable) -> bool:
+        """Remove a document by key. Returns False if the key is unknown."""
+        doc_id = self._key_to_doc.pop(key, None)
+        if doc_id is None:
+            return False
+
+        for term_id in self._doc_terms[doc_id]:
+            self._df[term_id] -= 1
+        self._total_len -= self._doc_lens[doc_id]
+        self._live[doc_id] = 0
+        self._doc_terms[doc_id] = None
+        self._doc_keys[doc_id] = None
+        self._dead += 1
+
+        if self._dead > max(64, len(self._key_to_doc)):
+            self.compact()
+        return True
+
+    def compact(self) -> None:
+        """Drop tombstoned documents and renumber the survivors."""
+        remap = array("l", [-1]) * len(self._doc_lens)
+        doc_lens = array("l")
+        doc_terms: List[Optional[array]] = []
+        doc_keys: List[Optional[Hashable]] = []
+        for old_id, live in enumerate(self._live):
+            if live:
+                remap[old_id] = len(doc_lens)
+                doc_lens.append(self._doc_lens[old_id])
+                doc_terms.append(self._doc_terms[old_id])
+                doc_keys.append(self._doc_keys[old_id])
+
+        for term_id, docs in enumerate(self._postings_docs):
+            tfs = self._postings_tfs[term_id]
+            new_docs = array("l")
+            new_tfs = array("l")
+            for doc_id, tf in zip(docs, tfs):
+                new_id = remap[doc_id]
+                if new_id >= 0:
+                    new_docs.append(new_id)
+                    new_tfs.append(tf)
+            self._postings_docs[term_id] = new_docs
+            self._postings_tfs[term_id] = new_tfs
+
+        self._doc_lens = doc_lens
+        self._doc_terms = doc_terms
+        self._doc_keys = doc_keys
+        self._live = bytearray(b"\x01") * len(doc_lens)
+        self._key_to_doc = {key: doc_id for doc_id, key in enumerate(doc_keys)}
+        self._dead = 0
+
+    def idf(self, term: str) -> float:
+        """Inverse document frequency of a term over live documents."""
+        term_id = self._vocab.get(term)
+        freq = self._df[term_id] if term_id is not None else 0
+        total_docs = len(self._key_to_doc)
+        return math.log(1 + (total_docs - freq + 0.5) / (freq + 0.5))
+
+    def _score(self, query: Iterable[str]) -> Dict[int, float]:
+        """Accumulate scores per internal document id over the query's postings."""
+        scores: Dict[int, float] = {}
+        if not self._key_to_doc:
+            return scores
+
+        k1 = self.k1
+        norm = k1 * (1 - self.b)
+        scale = k1 * self.b / self.avgdl if self.avgdl else 0.0
+        doc_lens = self._doc_lens
+        live = self._live
+
+        for term, query_tf in Counter(query).items():
+            term_id = self._vocab.get(term)
+            if term_id is None or not self._df[term_id]:
+                continue
+            weight = self.idf(term) * query_tf * (k1 + 1)
+            for doc_id, tf in zip(self._postings_docs[term_id], self._postings_tfs[term_id]):
+                if not live[doc_id]:
+                    continue
+                score = weight * tf / (tf + norm + scale * doc_lens[doc_id])
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return scores
+
+    def get_scores(self, query: Iterable[str]) -> Dict[Hashable, float]:
+        """Score a tokenized query. Only documents with a non-zero score are returned."""
+        keys = self._doc_keys
+        return {keys[doc_id]: score for doc_id, score in self._score(query).items()}
+
+    def top_k(self, query: Iterable[str], k: int = 10) -> List[Tuple[Hashable, float]]:
+        """Return the k best (key, score) pairs for a tokenized query."""
+        keys = self._doc_keys
+        best = heapq.nlargest(k, self._score(query).items(), key=lambda item: item[1])
+        return [(keys[doc_id], score) for doc_id, score in best]
+
+
+class BM25(SparseBM25):
+    """Minimal BM25 implementation for small corpora.
+
+    Documents are keyed by their position in the corpus, and ``get_scores``
+    returns a dense list aligned with it.
+    """
+
+    def __init__(self, corpus: Iterable[str], k1: float = 1.5, b: float = 0.75):
+        super().__init__(k1=k1, b=b)
+        for idx, doc in enumerate(corpus):
+            self.add_document(idx, doc)
+        self._size = len(self)
 
     def get_scores(self, query: Iterable[str]) -> List[float]:
         """Calculate BM25 scores for a query."""
-        scores = [0.0] * len(self.documents)
-        query_terms = list(query)
-        for idx, doc in enumerate(self.documents):
-            freqs = self.doc_freqs[idx]
-            doc_len = self.doc_lens[idx]
-            score = 0.0
-            for term in query_terms:
-                if term not in freqs:
-                    continue
-                idf = self.idf.get(term, 0.0)
-                tf = freqs[term]
-                numerator = tf * (self.k1 + 1)
-                denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                score += idf * numerator / denominator
-            scores[idx] = score
+        scores = [0.0] * self._size
+        for idx, score in super().get_scores(query).items():
+            if idx < self._size:
+                scores[idx] = score
         return scores
@@ -0,0 +1,240 @@
+"""Allocation-light text search over raw file bytes.
+
+Files are memory-mapped (small ones are read in one call) and a compiled
+bytes regex runs over the whole buffer, so nothing is split into lines or
+decoded until a hit is found. Hits carry byte offsets; line numbers and
+context lines are resolved afterwards, and only for the hits that are kept.
+Matches never span a line break, so ``\\s`` or ``[^x]`` behave as they do in a
+line-by-line search such as ripgrep.
+
+Bytes regexes treat ``\\w``, ``\\d``, ``\\s`` and ``\\b`` as ASCII-only. When a
+pattern relies on those classes and a file contains non-ASCII bytes, or the
+pattern is non-ASCII and not a case-sensitive literal, the file is decoded and
+searched with an equivalent str regex so results match ``re`` on text.
+"""
+
+import heapq
+import mmap
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple, Union
+
+MMAP_THRESHOLD = 64 * 1024  # Smaller files are cheaper to read than to map
+
+_UNICODE_CLASSES_RE = re.compile(r"\\[wWdDsSbB]")
+_NON_ASCII_RE = re.compile(rb"[\x80-\xff]")
+
+Buffer = Union[bytes, mmap.mmap]
+
+
+def _line_matches(regex: re.Pattern, data: Union[Buffer, str]) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) of matches confined to one line, scanning the whole buffer.
+
+    A match that crosses a newline is retried within the line it starts on,
+    which finds what a line-by-line search would find there.
+    """
+    newline = "\n" if isinstance(data, str) else b"\n"
+    pos = 0
+    while pos <= len(data):
+        match = regex.search(data, pos)
+        if match is None:
+            return
+        start, end = match.span()
+        line_end = data.find(newline, start, end)
+        if line_end != -1:
+            match = regex.search(data, start, line_end)
+            if match is None:
+                pos = line_end + 1
+                continue
+            start, end = match.span()
+        yield start, end
+        pos = end if end > start else end + 1
+
+
+@dataclass
+class ByteHit:
+    """A match located by byte offsets, with its line decoded."""
+
+    path: str
+    start: int  # Byte offset of the match in the file
+    line_start: int  # Byte offset of the line containing the match
+    line: str
+    match_start: int  # Character offsets within ``line``
+    match_end: int
+    score: float = 0.0
+
+
+class BytePattern:
+    """A search pattern compiled for bytes, with a str fallback."""
+
+    def __init__(self, pattern: str, use_regex: bool = False, case_sensitive: bool = False):
+        self.pattern = pattern
+        source = pattern if use_regex else re.escape(pattern)
+        # Anchors match at line boundaries, as they would in a line-by-line search
+        flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+        self.str_regex = re.compile(source, flags)
+
+        self.bytes_regex: Optional[re.Pattern] = None
+        self._needs_unicode = False
+        if pattern.isascii():
+            try:
+                self.bytes_regex = re.compile(source.encode("ascii"), flags)
+            except re.error:
+                self.bytes_regex = None
+            self._needs_unicode = use_regex and bool(_UNICODE_CLASSES_RE.search(pattern))
+        elif case_sensitive and not use_regex:
+            self.bytes_regex = re.compile(re.escape(pattern.encode("utf-8")), flags)
+
+    def _use_bytes(self, buf: Buffer) -> bool:
+        if self.bytes_regex is None:
+            return False
+        return not self._needs_unicode or _NON_ASCII_RE.search(buf) is None
+
+    def finditer(self, buf: Buffer) -> Iterator[Tuple[int, int]]:
+        """Yield (start, end) byte offsets of non-overlapping matches."""
+        if self._use_bytes(buf):
+            yield from _line_matches(self.bytes_regex, buf)
+            return
+
+        # Decode once and map character offsets back to bytes incrementally
+        text = bytes(buf).decode("utf-8", errors="surrogateescape")
+        char_pos = byte_pos = 0
+        for match_start, match_end in _line_matches(self.str_regex, text):
+            byte_pos += len(text[char_pos:match_start].encode("utf-8", "surrogateescape"))
+            char_pos = match_start
+            start = byte_pos
+            end = start + len(text[match_start:match_end].encode("utf-8", "surrogateescape"))
+            yield start, end
+
+
+@contextmanager
+def open_buffer(path: str):
+    """Yield the file's bytes, memory-mapped when the file is large."""
+    with open(path, "rb") as f:
+        size = f.seek(0, 2)
+        if size < MMAP_THRESHOLD:
+            f.seek(0)
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _line_bounds(buf: Buffer, pos: int) -> Tuple[int, int]:
+    start = buf.rfind(b"\n", 0, pos) + 1
+    end = buf.find(b"\n", pos)
+    if end == -1:
+        end = len(buf)
+    return start, end
+
+
+def _decode_line(raw: bytes) -> str:
+    return raw.rstrip(b"\r").decode("utf-8", errors="replace")
+
+
+def scan_buffer(path: str, buf: Buffer, pattern: BytePattern, max_hits: int) -> List[ByteHit]:
+    """Find up to ``max_hits`` matches in a buffer, decoding only matched lines."""
+    hits: List[ByteHit] = []
+    for start, end in pattern.finditer(buf):
+        line_start, line_end = _line_bounds(buf, start)
+        prefix = bytes(buf[line_start:start])
+        matched = bytes(buf[start : min(end, line_end)])
+        match_start = len(prefix.decode("utf-8", errors="replace"))
+        hits.append(
+            ByteHit(
+                path=path,
+                start=start,
+                line_start=line_start,
+                line=_decode_line(bytes(buf[line_start:line_end])),
+                match_start=match_start,
+                match_end=match_start + len(matched.decode("utf-8", errors="replace")),
+            )
+        )
+        if len(hits) >= max_hits:
+            break
+    return hits
+
+
+def scan_file(path: str, pattern: BytePattern, max_hits: int) -> List[ByteHit]:
+    """Search one file; unreadable files yield no hits."""
+    try:
+        with open_buffer(path) as buf:
+            return scan_buffer(path, buf, pattern, max_hits)
+    except (OSError, ValueError):
+        return []
+
+
+def resolve_lines(
+    buf: Buffer, hits: List[ByteHit], context_lines: int
+) -> List[Tuple[int, List[str], List[str]]]:
+    """Compute (line number, context before, context after) for hits in one buffer.
+
+    Newlines are counted incrementally between hits sorted by offset, so the
+    cost is one pass up to the last kept hit rather than a pass per hit.
+    """
+    resolved = [None] * len(hits)
+    line_number = 1
+    counted_to = 0
+    for i in sorted(range(len(hits)), key=lambda i: hits[i].line_start):
+        hit = hits[i]
+        line_number += bytes(buf[counted_to : hit.line_start]).count(b"\n")
+        counted_to = hit.line_start
+
+        before: List[str] = []
+        pos = hit.line_start
+        for _ in range(min(context_lines, line_number - 1)):
+            prev_start = buf.rfind(b"\n", 0, pos - 1) + 1
+            before.append(_decode_line(bytes(buf[prev_start : pos - 1])))
+            pos = prev_start
+        before.reverse()
+
+        after: List[str] = []
+        _, pos = _line_bounds(buf, hit.line_start)
+        for _ in range(context_lines):
+            if pos >= len(buf) - 1:
+                break
+            next_start = pos + 1
+            _, pos = _line_bounds(buf, next_start)
+            after.append(_decode_line(bytes(buf[next_start:pos])))
+
+        resolved[i] = (line_number, before, after)
+    return resolved
+
+
+# Compact, picklable form of a ByteHit sent back from worker processes:
+# (path, start, line_start, line, match_start, match_end)
+HitTuple = Tuple[str, int, int, str, int, int]
+
+
+def shard_by_size(files: List[Tuple[str, int]], shards: int) -> List[List[str]]:
+    """Split (path, size) pairs into ``shards`` groups of roughly equal total bytes.
+
+    Largest files are placed first, each into the currently lightest shard.
+    """
+    shards = max(1, min(shards, len(files)))
+    heap = [(0, i) for i in range(shards)]
+    groups: List[List[str]] = [[] for _ in range(shards)]
+    for path, size in sorted(files, key=lambda item: item[1], reverse=True):
+        total, i = heapq.heappop(heap)
+        groups[i].append(path)
+        heapq.heappush(heap, (total + size, i))
+    return [group for group in groups if group]
+
+
+@lru_cache(maxsize=16)
+def _compiled(pattern: str, use_regex: bool, case_sensitive: bool) -> BytePattern:
+    return BytePattern(pattern, use_regex, case_sensitive)
+
+
+def scan_shard(
+    paths: List[str], pattern: str, use_regex: bool, case_sensitive: bool, max_hits: int
+) -> List[HitTuple]:
+    """Worker entry point: search a shard of files and return compact hit tuples."""
+    compiled = _compiled(pattern, use_regex, case_sensitive)
+    return [
+        (hit.path, hit.start, hit.line_start, hit.line, hit.match_start, hit.match_end)
+        for path in paths
+        for hit in scan_file(path, compiled, max_hits)
+    ]
@@ -0,0 +1,109 @@
+"""Session-wide cache of decoded file contents.
+
+Entries are keyed by real path and validated against the file's (mtime_ns,
+size) on every lookup, so an external edit is picked up on the next read. The
+cache is bounded by total content size and evicts least recently used files.
+Tools that write files update their entry so a follow-up read is a hit.
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+
+def _normalize_newlines(content: str) -> str:
+    """Match what reading the file back in text mode returns."""
+    return content.replace("\r\n", "\n").replace("\r", "\n")
+
+
+class FileContentCache:
+    """LRU cache of UTF-8 file contents with a memory cap and hit/miss counters."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[int, int, str]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.realpath(path)
+
+    def _store(self, key: str, mtime_ns: int, size: int, content: str) -> None:
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= old[1]
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (mtime_ns, size, content)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self._bytes -= evicted_size
+            self.evictions += 1
+
+    def read(self, path: str) -> str:
+        """Return the file's text, reading it only if it changed since it was cached.
+
+        Raises:
+            OSError: If the file cannot be stat'ed or opened.
+            UnicodeDecodeError: If the file is not valid UTF-8.
+        """
+        key = self._key(path)
+        st = os.stat(key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        with open(key, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        with self._lock:
+            self._store(key, st.st_mtime_ns, st.st_size, content)
+        return content
+
+    def update(self, path: str, content: str) -> None:
+        """Record content just written to ``path``."""
+        key = self._key(path)
+        try:
+            st = os.stat(key)
+        except OSError:
+            self.invalidate(path)
+            return
+        with self._lock:
+            self._store(key, st.st_mtime_ns, st.st_size, _normalize_newlines(content))
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one file, or everything when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(self._key(path), None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get hit/miss counters and current memory use."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+FILE_CACHE = FileContentCache()
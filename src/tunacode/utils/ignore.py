@@ -0,0 +1,303 @@
+"""
+Module: tunacode.utils.ignore
+
+Compiled .gitignore matching shared by every directory walker.
+
+Each .gitignore (the root one, nested ones, and those of parent directories
+up to the enclosing git repository) is compiled into one combined regex for
+files and one for directories. Rules are alternated in reverse order, so the
+first alternative that matches is the last rule in the file, which is the one
+git applies; its named group says whether it was a negation. Deeper ignore
+files take precedence over shallower ones, and built-in patterns come last.
+Directory decisions are cached, so checking a path's ancestors is cheap while
+walking a tree top-down.
+"""
+
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tunacode.constants import ENV_FILE
+
+GITIGNORE_FILE = ".gitignore"
+
+# Used by list_cwd when the project has no .gitignore
+DEFAULT_IGNORE_PATTERNS = {
+    "node_modules/",
+    "env/",
+    "venv/",
+    ".git/",
+    "build/",
+    "dist/",
+    "__pycache__/",
+    "*.pyc",
+    "*.pyo",
+    "*.pyd",
+    ".DS_Store",
+    "Thumbs.db",
+    ENV_FILE,
+    ".venv",
+    "*.egg-info",
+    ".pytest_cache/",
+    ".coverage",
+    "htmlcov/",
+    ".tox/",
+    "coverage.xml",
+    "*.cover",
+    ".idea/",
+    ".vscode/",
+    "*.swp",
+    "*.swo",
+}
+
+# Dependency, build and tool directories that code search never needs
+COMMON_IGNORE_DIRS = {
+    ".git",
+    ".hg",
+    ".svn",
+    ".bzr",
+    "__pycache__",
+    ".pytest_cache",
+    ".mypy_cache",
+    ".tox",
+    "node_modules",
+    "bower_components",
+    ".venv",
+    "venv",
+    "env",
+    "build",
+    "dist",
+    "_build",
+    "target",
+    ".eggs",
+    "*.egg-info",
+}
+COMMON_IGNORE_PATTERNS = [f"{name}/" for name in sorted(COMMON_IGNORE_DIRS)]
+
+
+def _translate_glob(pattern: str) -> str:
+    """Translate the glob part of a gitignore pattern into a regex."""
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        if i == 0 and pattern.startswith("**/"):
+            out.append("(?:.*/)?")
+            i += 3
+        elif pattern.startswith("/**/", i):
+            out.append("/(?:.*/)?")
+            i += 4
+        elif pattern.startswith("/**", i) and i + 3 == n:
+            out.append("/.*")
+            i += 3
+        elif pattern.startswith("**", i):
+            out.append(".*")
+            i += 2
+        else:
+            c = pattern[i]
+            i += 1
+            if c == "*":
+                out.append("[^/]*")
+            elif c == "?":
+                out.append("[^/]")
+            elif c == "\\" and i < n:
+                out.append(re.escape(pattern[i]))
+                i += 1
+            elif c == "[":
+                end = pattern.find("]", i + 1 if pattern[i : i + 1] in ("!", "]") else i)
+                if end == -1:
+                    out.append(re.escape(c))
+                    continue
+                body = pattern[i:end]
+                i = end + 1
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+            else:
+                out.append(re.escape(c))
+    return "".join(out)
+
+
+def compile_pattern(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """Compile one gitignore line.
+
+    Returns:
+        (regex source, negated, directory only), or None for blanks and comments.
+    """
+    line = line.rstrip("\n\r")
+    if not line or line.startswith("#"):
+        return None
+    line = re.sub(r"(?<!\\) +$", "", line)
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith("\\") and line[1:2] in ("#", "!"):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to its .gitignore's directory
+    anchored = "/" in line
+    body = _translate_glob(line.lstrip("/"))
+    return ("" if anchored else "(?:.*/)?") + body, negated, dir_only
+
+
+class _RuleSet:
+    """The rules of one ignore file, compiled into combined regexes."""
+
+    def __init__(self, lines: Iterable[str]):
+        rules = [rule for rule in map(compile_pattern, lines) if rule is not None]
+        self.negated = [negated for _, negated, _ in rules]
+        self.dir_regex = self._combine(rules, include_dir_only=True)
+        self.file_regex = self._combine(rules, include_dir_only=False)
+
+    @staticmethod
+    def _combine(rules, include_dir_only: bool) -> Optional["re.Pattern"]:
+        alternatives = [
+            f"(?P<r{i}>{source})"
+            for i, (source, _, dir_only) in reversed(list(enumerate(rules)))
+            if include_dir_only or not dir_only
+        ]
+        if not alternatives:
+            return None
+        return re.compile("^(?:" + "|".join(alternatives) + ")$", re.DOTALL)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True if ignored, False if re-included, None if no rule applies."""
+        regex = self.dir_regex if is_dir else self.file_regex
+        if regex is None:
+            return None
+        m = regex.match(rel_path)
+        if m is None:
+            return None
+        return not self.negated[int(m.lastgroup[1:])]
+
+
+def _find_repo_root(path: str) -> Optional[str]:
+    current = path
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+class IgnoreMatcher:
+    """Decides whether paths under ``root`` are ignored.
+
+    Args:
+        root: Directory that relative paths passed to the matcher start from.
+        patterns: Built-in patterns applied at ``root`` with the lowest priority.
+        gitignore: Honour .gitignore files in ``root``, below it, and in parent
+            directories up to the enclosing repository root.
+        fallback_patterns: Used instead of a missing top-level .gitignore.
+    """
+
+    def __init__(
+        self,
+        root=".",
+        patterns: Optional[Iterable[str]] = None,
+        gitignore: bool = True,
+        fallback_patterns: Optional[Iterable[str]] = None,
+    ):
+        self.root = os.path.abspath(root)
+        self.gitignore = gitignore
+        self._scopes: Dict[str, Optional[_RuleSet]] = {}
+        self._dir_cache: Dict[str, bool] = {}
+
+        # Parent .gitignore files, nearest last, keyed by this root's offset within them
+        self._outer: List[Tuple[str, _RuleSet]] = []
+        repo_root = _find_repo_root(self.root) if gitignore else None
+        if repo_root and repo_root != self.root:
+            current = os.path.dirname(self.root)
+            while True:
+                rules = self._load(current)
+                if rules is not None:
+                    offset = os.path.relpath(self.root, current).replace(os.sep, "/")
+                    self._outer.insert(0, (offset, rules))
+                if current == repo_root:
+                    break
+                current = os.path.dirname(current)
+
+        base = list(patterns or ())
+        has_gitignore = self._scope("") is not None or bool(self._outer)
+        if fallback_patterns and not has_gitignore:
+            base.extend(fallback_patterns)
+        self._base = _RuleSet(base)
+
+    def _load(self, directory: str) -> Optional[_RuleSet]:
+        try:
+            with open(os.path.join(directory, GITIGNORE_FILE), "r", encoding="utf-8") as f:
+                return _RuleSet(f.read().splitlines())
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def _scope(self, rel_dir: str) -> Optional[_RuleSet]:
+        if rel_dir not in self._scopes:
+            directory = os.path.join(self.root, rel_dir) if rel_dir else self.root
+            self._scopes[rel_dir] = self._load(directory) if self.gitignore else None
+        return self._scopes[rel_dir]
+
+    def _match_own(self, rel_path: str, is_dir: bool) -> bool:
+        """Decide for this path alone, assuming its parent is not ignored."""
+        name = rel_path.rsplit("/", 1)[-1]
+        if name == ".git":
+            return True
+
+        # Nested .gitignore files, deepest first
+        parts = rel_path.split("/")
+        for depth in range(len(parts) - 1, -1, -1):
+            rel_dir = "/".join(parts[:depth])
+            rules = self._scope(rel_dir)
+            if rules is not None:
+                decision = rules.match("/".join(parts[depth:]), is_dir)
+                if decision is not None:
+                    return decision
+
+        for offset, rules in reversed(self._outer):
+            decision = rules.match(f"{offset}/{rel_path}", is_dir)
+            if decision is not None:
+                return decision
+
+        return bool(self._base.match(rel_path, is_dir))
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """Check a path relative to ``root``, including whether a parent is ignored."""
+        rel_path = rel_path.replace(os.sep, "/").strip("/")
+        if not rel_path or rel_path == ".":
+            return False
+        if is_dir and rel_path in self._dir_cache:
+            return self._dir_cache[rel_path]
+
+        parent = rel_path.rsplit("/", 1)[0] if "/" in rel_path else ""
+        ignored = (parent and self.is_ignored(parent, is_dir=True)) or self._match_own(
+            rel_path, is_dir
+        )
+        if is_dir:
+            self._dir_cache[rel_path] = ignored
+        return ignored
+
+    def walk(self, top: Optional[str] = None) -> Iterator[Tuple[str, str, List[str], List[str]]]:
+        """Like os.walk, but yields (dirpath, rel_dir, dirs, files) with ignored entries removed.
+
+        Callers may prune ``dirs`` further in place.
+        """
+        top = os.path.abspath(top) if top else self.root
+        for dirpath, dirs, files in os.walk(top):
+            rel_dir = os.path.relpath(dirpath, self.root)
+            rel_dir = "" if rel_dir == "." else rel_dir.replace(os.sep, "/")
+            prefix = f"{rel_dir}/" if rel_dir else ""
+            # Walking top-down, the current directory is already known to be kept
+            dirs[:] = [d for d in dirs if not self._cached_child(prefix + d, True)]
+            files = [f for f in files if not self._cached_child(prefix + f, False)]
+            yield dirpath, rel_dir, dirs, files
+
+    def _cached_child(self, rel_path: str, is_dir: bool) -> bool:
+        if is_dir:
+            cached = self._dir_cache.get(rel_path)
+            if cached is None:
+                cached = self._dir_cache[rel_path] = self._match_own(rel_path, True)
+            return cached
+        return self._match_own(rel_path, False)
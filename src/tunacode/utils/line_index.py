@@ -0,0 +1,130 @@
+"""Line-offset indexes for random access into large text files.
+
+The first lookup scans the file through ``mmap`` and records the byte offset
+of every line start. Later reads of any line range slice the mapping directly,
+so jumping to line N costs O(1) and never decodes the rest of the file.
+Indexes are cached per real path and rebuilt when (mtime_ns, size) changes.
+"""
+
+import codecs
+import mmap
+import os
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+LINE_INDEX_CACHE_SIZE = 32
+
+
+class LineIndex:
+    """Byte offsets of each line start in a file."""
+
+    def __init__(self, path: str, signature: Tuple[int, int], offsets: array):
+        self.path = path
+        self.signature = signature
+        self._offsets = offsets
+
+    @classmethod
+    def build(cls, path: str) -> "LineIndex":
+        st = os.stat(path)
+        offsets = array("Q")
+        if st.st_size:
+            with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offsets.append(0)
+                find = mm.find
+                pos = find(b"\n")
+                while pos != -1 and pos + 1 < st.st_size:
+                    offsets.append(pos + 1)
+                    pos = find(b"\n", pos + 1)
+        return cls(path, (st.st_mtime_ns, st.st_size), offsets)
+
+    @property
+    def line_count(self) -> int:
+        return len(self._offsets)
+
+    @property
+    def size(self) -> int:
+        return self.signature[1]
+
+    def byte_range(self, start: int, count: int) -> Tuple[int, int]:
+        """Byte span of ``count`` lines starting at 0-based line ``start``."""
+        end_line = min(start + count, self.line_count)
+        begin = self._offsets[start] if start < self.line_count else self.size
+        end = self._offsets[end_line] if end_line < self.line_count else self.size
+        return begin, end
+
+    def read(self, start: int, count: int, max_bytes: int = 0) -> Tuple[str, int]:
+        """Decode up to ``count`` lines from 0-based line ``start``.
+
+        If ``max_bytes`` is set, whole lines are dropped from the end to fit, and
+        a single line longer than the budget is cut at a character boundary.
+
+        Returns:
+            (text, number of lines returned)
+        """
+        count = max(0, min(count, self.line_count - start))
+        if count == 0:
+            return "", 0
+        begin, end = self.byte_range(start, count)
+        cut = False
+        if max_bytes and end - begin > max_bytes:
+            # Binary search for the most whole lines within the budget
+            low, high = 1, count
+            while low < high:
+                mid = (low + high + 1) // 2
+                if self.byte_range(start, mid)[1] - begin <= max_bytes:
+                    low = mid
+                else:
+                    high = mid - 1
+            count = low
+            end = self.byte_range(start, count)[1]
+            cut = end - begin > max_bytes
+            if cut:
+                end = begin + max_bytes
+
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            data = mm[begin:end]
+        if cut:
+            # Hold back a multi-byte character split by the cut
+            text = codecs.getincrementaldecoder("utf-8")().decode(data, final=False)
+        else:
+            text = data.decode("utf-8")
+        return text.replace("\r\n", "\n").replace("\r", "\n"), count
+
+
+class LineIndexCache:
+    """LRU of line indexes validated against each file's (mtime_ns, size)."""
+
+    def __init__(self, maxsize: int = LINE_INDEX_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, LineIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> LineIndex:
+        key = os.path.realpath(path)
+        st = os.stat(key)
+        with self._lock:
+            index = self._entries.get(key)
+            if index is not None and index.signature == (st.st_mtime_ns, st.st_size):
+                self._entries.move_to_end(key)
+                return index
+
+        index = LineIndex.build(key)
+        with self._lock:
+            self._entries[key] = index
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return index
+
+    def invalidate(self, path: Optional[str] = None) -> None:
+        """Drop one file's index, or every index when no path is given."""
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            self._entries.pop(os.path.realpath(path), None)
+
+
+LINE_INDEX_CACHE = LineIndexCache()
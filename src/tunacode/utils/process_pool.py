@@ -0,0 +1,55 @@
+"""Worker process pool shared by CPU-bound tools.
+
+Grep's Python strategy and CodeIndex symbol parsing both hand work to this
+one pool rather than each keeping their own. Workers are started with the
+forkserver method (spawn where it is unavailable): by the time the pool is
+first used the process already runs event-loop, executor and watcher
+threads, which a forked child would inherit in whatever state they were in.
+The pool is shut down when the interpreter exits.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def worker_count() -> int:
+    """Number of worker processes the shared pool runs."""
+    return os.cpu_count() or 1
+
+
+def _start_method() -> str:
+    methods = multiprocessing.get_all_start_methods()
+    return "forkserver" if "forkserver" in methods else "spawn"
+
+
+def get_process_pool() -> Optional[ProcessPoolExecutor]:
+    """Get the shared worker pool, or None on single-core machines."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if worker_count() < 2:
+                return None
+            _pool = ProcessPoolExecutor(
+                max_workers=worker_count(),
+                mp_context=multiprocessing.get_context(_start_method()),
+            )
+        return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Stop the shared pool's workers; the next use starts a new pool."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+atexit.register(shutdown_process_pool)
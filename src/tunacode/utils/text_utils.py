@@ -69,6 +69,7 @@ def expand_file_refs(text: str) -> Tuple[str, List[str]]:
 
     from tunacode.constants import (ERROR_FILE_NOT_FOUND, ERROR_FILE_TOO_LARGE, MAX_FILE_SIZE,
                                     MSG_FILE_SIZE_LIMIT)
+    from tunacode.utils.file_cache import FILE_CACHE
 
     pattern = re.compile(r"@([\w./_-]+)")
     expanded_files = []
@@ -81,8 +82,7 @@ def expand_file_refs(text: str) -> Tuple[str, List[str]]:
         if os.path.getsize(path) > MAX_FILE_SIZE:
             raise ValueError(ERROR_FILE_TOO_LARGE.format(filepath=path) + MSG_FILE_SIZE_LIMIT)
 
-        with open(path, "r", encoding="utf-8") as f:
-            content = f.read()
+        content = FILE_CACHE.read(path)
 
         # Track the absolute path of the file
         abs_path = os.path.abspath(path)
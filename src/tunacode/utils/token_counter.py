@@ -1,19 +1,207 @@
-"""Simple token counting utility for estimating message sizes."""
+"""Token counting utilities for sizing messages and prompts.
 
+Counting goes through a pluggable tokenizer. When ``tiktoken`` is installed it
+is used for exact counts; otherwise a pure-Python fallback splits text with a
+BPE-style pre-tokenizer and estimates the tokens of each piece, which works
+offline and tracks real tokenizers far better than a flat character ratio.
+"""
+
+import json
+import re
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Optional
+
+DEFAULT_CONTEXT_WINDOW = 128_000
+MESSAGE_OVERHEAD_TOKENS = 4  # Role and framing tokens added per message by chat APIs
+MESSAGE_CACHE_SIZE = 4096
+
+# Pre-tokenizer modelled on cl100k_base: contractions, letter runs with an optional
+# leading space, digit groups of up to three, punctuation runs and whitespace
+_PRETOKEN_RE = re.compile(
+    r"'(?:[sdmt]|ll|ve|re)|(?:[^\r\n\w]|_)?[^\W\d_]+|\d{1,3}| ?(?:[^\s\w]|_)+[\r\n]*"
+    r"|\s*[\r\n]+|\s+(?!\S)|\s+",
+    re.IGNORECASE,
+)
+
+
+class Tokenizer(ABC):
+    """Counts tokens in text for a family of models."""
+
+    name = "base"
+
+    @abstractmethod
+    def count(self, text: str) -> int:
+        """Return the number of tokens in the text."""
+        pass
+
+
+class TiktokenTokenizer(Tokenizer):
+    """Exact counts using tiktoken (optional dependency)."""
+
+    def __init__(self, encoding):
+        self._encoding = encoding
+        self.name = f"tiktoken:{encoding.name}"
+
+    def count(self, text: str) -> int:
+        return len(self._encoding.encode(text, disallowed_special=()))
 
-def estimate_tokens(text: str) -> int:
-    """
-    Estimate token count using a simple character-based approximation.
 
-    This is a rough estimate: ~4 characters per token on average.
-    For more accurate counting, we would need tiktoken or similar.
+@lru_cache(maxsize=65536)
+def _piece_tokens(piece: str) -> int:
+    """Estimate how many BPE tokens a single pre-token becomes."""
+    word = piece.strip()
+    if not word:
+        return 1
+    if len(word) > 1 and not word[0].isalnum() and word[1:].isalpha():
+        # A single leading symbol ("_name", "(arg") usually merges with the word
+        word = word[1:]
+    if not word.isascii():
+        # Non-Latin scripts average roughly one token per two UTF-8 bytes
+        return max(1, len(piece.encode("utf-8")) // 2)
+    if word.isalpha():
+        # Common words merge into a single token; long identifiers split into ~4 char units
+        return 1 if len(word) <= 6 else (len(word) + 3) // 4
+    if word.isdigit():
+        return 1
+    # Punctuation runs merge less aggressively than words
+    return (len(word) + 1) // 2
+
+
+class RegexBPETokenizer(Tokenizer):
+    """Offline fallback: BPE-style pre-tokenization with per-piece estimates."""
+
+    name = "regex-bpe"
+
+    def count(self, text: str) -> int:
+        return sum(_piece_tokens(piece) for piece in _PRETOKEN_RE.findall(text))
+
+
+_tokenizers: Dict[Optional[str], Tokenizer] = {}
+
+
+def get_tokenizer(model: Optional[str] = None) -> Tokenizer:
+    """Get the tokenizer for a model name like "openai:gpt-4o".
+
+    Uses tiktoken when available (falling back to cl100k_base for models it
+    does not know), otherwise the pure-Python RegexBPETokenizer.
     """
+    tokenizer = _tokenizers.get(model)
+    if tokenizer is not None:
+        return tokenizer
+
+    try:
+        import tiktoken
+
+        model_id = model.split(":", 1)[-1].split("/")[-1] if model else ""
+        try:
+            encoding = tiktoken.encoding_for_model(model_id)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        tokenizer = TiktokenTokenizer(encoding)
+    except Exception:
+        # tiktoken missing, or its encoding files cannot be downloaded offline
+        tokenizer = RegexBPETokenizer()
+
+    _tokenizers[model] = tokenizer
+    return tokenizer
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count tokens in a string for the given model."""
     if not text:
         return 0
+    return get_tokenizer(model).count(text)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate token count for display purposes.
+
+    Uses the default tokenizer; see count_tokens for model-specific counts.
+    """
+    return count_tokens(text)
+
+
+def message_text(message: Any) -> str:
+    """Flatten a pydantic-ai message (or a plain dict entry) into countable text."""
+    parts = getattr(message, "parts", None)
+    if parts is None:
+        if isinstance(message, str):
+            return message
+        try:
+            return json.dumps(message, default=str)
+        except (TypeError, ValueError):
+            return str(message)
+
+    chunks = []
+    for part in parts:
+        tool_name = getattr(part, "tool_name", None)
+        if tool_name:
+            chunks.append(tool_name)
+        content = getattr(part, "content", None)
+        if content is not None:
+            chunks.append(content if isinstance(content, str) else json.dumps(content, default=str))
+        args = getattr(part, "args", None)
+        if args is not None:
+            chunks.append(args if isinstance(args, str) else json.dumps(args, default=str))
+    return "\n".join(chunks)
+
+
+class MessageTokenCache:
+    """LRU cache of per-message token counts keyed by message identity.
+
+    Entries hold a reference to the message so its id cannot be reused by a
+    different object while cached. History messages are immutable once
+    appended, so identity is a safe key.
+    """
+
+    def __init__(self, maxsize: int = MESSAGE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, message: Any, model: Optional[str] = None) -> int:
+        tokenizer = get_tokenizer(model)
+        key = (id(message), tokenizer.name)
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] is message:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        tokens = tokenizer.count(message_text(message)) + MESSAGE_OVERHEAD_TOKENS
+        self._entries[key] = (message, tokens)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return tokens
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+MESSAGE_TOKEN_CACHE = MessageTokenCache()
+
+
+def count_message_tokens(messages: Iterable[Any], model: Optional[str] = None) -> int:
+    """Count the tokens a message history will occupy in the prompt."""
+    return sum(MESSAGE_TOKEN_CACHE.count(message, model) for message in messages)
+
+
+@lru_cache(maxsize=None)
+def get_context_window(model: Optional[str]) -> int:
+    """Get the context window of a model, or DEFAULT_CONTEXT_WINDOW if unknown."""
+    if model:
+        from tunacode.configuration.models import ModelRegistry
 
-    # Simple approximation: ~4 characters per token
-    # This is roughly accurate for English text
-    return len(text) // 4
+        config = ModelRegistry().get_model(model)
+        if config is not None and config.context_window:
+            return config.context_window
+    return DEFAULT_CONTEXT_WINDOW
 
 
 def format_token_count(count: int) -> str:
@@ -0,0 +1,178 @@
+"""Parallel directory walker shared by file search and indexing.
+
+Directory reads are fanned out across a shared thread pool: each worker lists
+one directory with ``os.scandir``, reusing the type information the
+``DirEntry`` already carries, and stats its files only when the caller asks
+for it. The calling thread prunes
+ignored directories before they are ever opened and yields files as soon as
+their directory has been read, so callers can start work before the walk
+finishes. Stopping iteration early cancels directories not yet read.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional, Tuple
+
+from tunacode.utils.ignore import IgnoreMatcher
+
+WALK_WORKERS = 8
+WALK_BATCH = 256  # Files per batch handed to async consumers
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Get the thread pool shared by every walk, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=WALK_WORKERS, thread_name_prefix="walk")
+        return _pool
+
+
+@dataclass
+class WalkEntry:
+    """A file found by the walker."""
+
+    path: str  # Absolute path
+    rel_path: str  # Relative to the ignore matcher's root (or the walk root), "/"-separated
+    name: str
+    stat: Optional[os.stat_result] = None  # Taken while listing when the walk used with_stat
+
+    @property
+    def size(self) -> int:
+        if self.stat is None:
+            try:
+                self.stat = os.stat(self.path)
+            except OSError:
+                return 0  # Removed since the walk listed it
+        return self.stat.st_size
+
+
+def _read_dir(
+    path: str, rel_dir: str, follow_symlinks: bool, with_stat: bool
+) -> Tuple[List[Tuple[str, str]], List[WalkEntry]]:
+    """List one directory: (subdirectories as (path, rel_path), files)."""
+    prefix = f"{rel_dir}/" if rel_dir else ""
+    dirs: List[Tuple[str, str]] = []
+    files: List[WalkEntry] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    dirs.append((entry.path, prefix + entry.name))
+                elif entry.is_file(follow_symlinks=follow_symlinks):
+                    st = entry.stat(follow_symlinks=follow_symlinks) if with_stat else None
+                    files.append(WalkEntry(entry.path, prefix + entry.name, entry.name, st))
+            except OSError:
+                continue
+    return dirs, files
+
+
+def parallel_walk(
+    top,
+    ignore: Optional[IgnoreMatcher] = None,
+    max_workers: int = WALK_WORKERS,
+    max_depth: Optional[int] = None,
+    follow_symlinks: bool = False,
+    with_stat: bool = False,
+) -> Iterator[WalkEntry]:
+    """Yield every file under ``top`` that ``ignore`` keeps, in no particular order.
+
+    Args:
+        top: Directory to walk.
+        ignore: Matcher used to prune directories and drop files. Relative
+            paths are computed from its root, which must contain ``top``.
+        max_workers: Directories this walk lists concurrently on the shared pool.
+        max_depth: Deepest directory level to descend into (``top`` is 0).
+        follow_symlinks: Descend into symlinked directories and yield symlinked files.
+        with_stat: Stat every file while listing; otherwise ``size`` stats on demand.
+    """
+    top = os.path.abspath(top)
+    rel_top = ""
+    if ignore is not None:
+        rel_top = os.path.relpath(top, ignore.root).replace(os.sep, "/")
+        rel_top = "" if rel_top == "." else rel_top
+
+    pool = _get_pool()
+    # Directories found but not yet submitted, so one walk never floods the shared pool
+    queued: List[Tuple[str, str, int]] = [(top, rel_top, 0)]
+    pending = {}
+    try:
+        while queued or pending:
+            while queued and len(pending) < max(1, max_workers):
+                path, rel_path, depth = queued.pop()
+                future = pool.submit(_read_dir, path, rel_path, follow_symlinks, with_stat)
+                pending[future] = depth
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                depth = pending.pop(future)
+                try:
+                    dirs, files = future.result()
+                except OSError:
+                    continue  # Unreadable directory
+
+                if max_depth is None or depth < max_depth:
+                    for path, rel_path in dirs:
+                        if ignore is None or not ignore.is_ignored(rel_path, is_dir=True):
+                            queued.append((path, rel_path, depth + 1))
+
+                for entry in files:
+                    if ignore is None or not ignore.is_ignored(entry.rel_path):
+                        yield entry
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+async def async_walk(top, batch_size: int = WALK_BATCH, **kwargs) -> AsyncIterator[List[WalkEntry]]:
+    """Run ``parallel_walk`` off the event loop, yielding files in batches as they are found.
+
+    Accepts the same keyword arguments as ``parallel_walk``. Leaving the loop
+    early stops the walk.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+
+    def put(item) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            stop.set()  # Event loop closed under us
+
+    def produce():
+        batch: List[WalkEntry] = []
+        try:
+            for entry in parallel_walk(top, **kwargs):
+                if stop.is_set():
+                    return
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    put(batch)
+                    batch = []
+            if batch:
+                put(batch)
+        finally:
+            put(None)
+
+    producer = loop.run_in_executor(None, produce)
+    finished = False
+    try:
+        while True:
+            batch = await queue.get()
+            if batch is None:
+                finished = True
+                break
+            yield batch
+    finally:
+        stop.set()
+        if finished:
+            await producer  # Surface errors raised by the walk
+        else:
+            producer.add_done_callback(lambda f: f.cancelled() or f.exception())
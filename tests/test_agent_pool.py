@@ -0,0 +1,60 @@
+"""Tests for the shared pool of constructed sub-agents."""
+
+from unittest.mock import MagicMock, patch
+
+from tunacode.core.agents.agent_pool import AGENT_POOL, AgentPool
+from tunacode.core.agents.readonly import ReadOnlyAgent
+from tunacode.core.state import StateManager
+
+
+def test_pool_reuses_and_evicts_least_recently_used():
+    pool = AgentPool(maxsize=2)
+    built = []
+
+    def factory(name):
+        def build():
+            built.append(name)
+            return object()
+
+        return build
+
+    a = pool.get("model-a", "readonly", factory("a"))
+    assert pool.get("model-a", "readonly", factory("a")) is a
+    b = pool.get("model-b", "readonly", factory("b"))
+    pool.get("model-a", "readonly", factory("a"))  # a is now most recent
+    pool.get("model-c", "readonly", factory("c"))  # evicts b
+
+    assert pool.get("model-a", "readonly", factory("a")) is a
+    assert pool.get("model-b", "readonly", factory("b")) is not b
+    assert built == ["a", "b", "c", "b"]
+    assert pool.get_stats() == {"agents": 2, "hits": 3, "misses": 4, "evictions": 2}
+
+    pool.invalidate("model-b")
+    assert pool.get_stats()["agents"] == 1
+
+
+def test_readonly_agents_share_one_pydantic_agent():
+    AGENT_POOL.invalidate()
+    state = StateManager()
+    with patch("tunacode.core.agents.main.get_agent_tool") as get_agent_tool:
+        Agent = MagicMock(side_effect=lambda **kwargs: MagicMock())
+        get_agent_tool.return_value = (Agent, MagicMock())
+
+        first = ReadOnlyAgent("openai:gpt-4", state)._get_agent()
+        second = ReadOnlyAgent("openai:gpt-4", state)._get_agent()
+        other = ReadOnlyAgent("anthropic:claude-3", state)._get_agent()
+
+    assert first is second
+    assert other is not first
+    assert Agent.call_count == 2
+    AGENT_POOL.invalidate()
+
+
+def test_changing_the_api_key_builds_a_new_agent(monkeypatch):
+    pool = AgentPool()
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-old")
+    old = pool.get("openai:gpt-4", "readonly", object)
+    assert pool.get("openai:gpt-4", "readonly", object) is old
+
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-new")
+    assert pool.get("openai:gpt-4", "readonly", object) is not old
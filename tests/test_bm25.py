@@ -0,0 +1,77 @@
+"""Tests for the sparse BM25 engine."""
+
+import math
+from collections import Counter
+
+import pytest
+
+from tunacode.utils.bm25 import BM25, SparseBM25, tokenize
+
+CORPUS = [
+    "def load_config(path): read the config file from path",
+    "class ConfigError(Exception): raised when config is invalid",
+    "def render_template(name): render a jinja template",
+    "README: this project renders templates and loads config",
+]
+
+
+def _reference_scores(corpus, query, k1=1.5, b=0.75):
+    """Straightforward per-document BM25, used as the expected result."""
+    docs = [Counter(tokenize(doc)) for doc in corpus]
+    lens = [sum(d.values()) for d in docs]
+    avgdl = sum(lens) / len(docs)
+    scores = []
+    for freqs, doc_len in zip(docs, lens):
+        score = 0.0
+        for term in query:
+            if term not in freqs:
+                continue
+            df = sum(1 for d in docs if term in d)
+            idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+            tf = freqs[term]
+            score += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * doc_len / avgdl))
+        scores.append(score)
+    return scores
+
+
+def test_bm25_matches_reference():
+    query = tokenize("config path template")
+    assert BM25(CORPUS).get_scores(query) == pytest.approx(_reference_scores(CORPUS, query))
+
+
+def test_add_and_remove_match_full_rebuild():
+    index = SparseBM25()
+    for i, doc in enumerate(CORPUS):
+        index.add_document(f"doc{i}", doc)
+    index.add_document("extra", "config config config")
+    index.remove_document("extra")
+    # Replacing a key re-indexes it
+    index.add_document("doc2", CORPUS[2])
+
+    query = tokenize("config template")
+    expected = _reference_scores(CORPUS, query)
+    scores = index.get_scores(query)
+    for i, score in enumerate(expected):
+        assert scores.get(f"doc{i}", 0.0) == pytest.approx(score)
+
+    assert index.top_k(query, 1)[0][0] == max(scores, key=scores.get)
+    assert index.remove_document("missing") is False
+
+
+def test_compaction_preserves_scores():
+    index = SparseBM25()
+    for i in range(200):
+        index.add_document(i, f"filler {i}")
+    for i, doc in enumerate(CORPUS):
+        index.add_document(f"doc{i}", doc)
+    for i in range(200):
+        index.remove_document(i)
+
+    assert len(index) == len(CORPUS)
+    assert len(index._doc_lens) < 200  # tombstones were compacted away
+
+    query = tokenize("render config")
+    expected = _reference_scores(CORPUS, query)
+    scores = index.get_scores(query)
+    for i, score in enumerate(expected):
+        assert scores.get(f"doc{i}", 0.0) == pytest.approx(score)
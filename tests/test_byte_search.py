@@ -0,0 +1,80 @@
+"""Tests for the mmap/bytes-regex Python search engine."""
+
+import asyncio
+import os
+import tempfile
+
+from tunacode.tools.grep import grep
+from tunacode.utils import byte_search
+from tunacode.utils.byte_search import BytePattern, open_buffer, resolve_lines, scan_file
+
+
+def _write(path, text):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_hits_decode_lines_and_resolve_context_lazily():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "m.py")
+        _write(path, "# café\nimport os\n\ndef Load():\n    return load_all()\n")
+
+        hits = scan_file(path, BytePattern("load"), max_hits=10)
+        assert [(h.line, h.match_start, h.match_end) for h in hits] == [
+            ("def Load():", 4, 8),
+            ("    return load_all()", 11, 15),
+        ]
+
+        with open_buffer(path) as buf:
+            resolved = resolve_lines(buf, hits[::-1], context_lines=1)
+        assert resolved[1] == (4, [""], ["    return load_all()"])
+        assert resolved[0] == (5, ["def Load():"], [])
+
+        # Offsets are reported in characters even after multi-byte text
+        (hit,) = scan_file(path, BytePattern("café", case_sensitive=True), max_hits=10)
+        assert (hit.line, hit.match_start, hit.match_end) == ("# café", 2, 6)
+
+
+def test_unicode_classes_fall_back_to_text_regex():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "names.txt")
+        _write(path, "naïve_name = 1\nplain = 2\n")
+
+        hits = scan_file(path, BytePattern(r"^\w+ =", use_regex=True), max_hits=10)
+        assert [h.line[h.match_start : h.match_end] for h in hits] == ["naïve_name =", "plain ="]
+        assert scan_file(path, BytePattern("NAÏVE"), max_hits=10)[0].match_end == 5
+
+
+def test_python_strategy_searches_mapped_files(monkeypatch):
+    monkeypatch.setattr(byte_search, "MMAP_THRESHOLD", 1)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _write(os.path.join(tmpdir, "a.py"), "x = 1\n" * 500 + "needle_here = True\n" + "y\n")
+        _write(os.path.join(tmpdir, "b.py"), "nothing\n")
+
+        result = asyncio.run(
+            grep("needle_here", tmpdir, search_type="python", context_lines=1, max_results=5)
+        )
+        assert "a.py:501" in result
+        assert "  500│ x = 1" in result and "  502│ y" in result
+
+
+def test_matches_stay_within_one_line():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "split.txt")
+        _write(path, "a\nb\nalpha  beta\ncafé\nx\n")
+
+        hits = scan_file(path, BytePattern(r"a\s+b", use_regex=True), max_hits=10)
+        assert [h.line for h in hits] == ["alpha  beta"]
+        # A greedy match is cut back to what the line alone allows
+        hits = scan_file(path, BytePattern(r"a[^z]*", use_regex=True), max_hits=10)
+        assert [(h.line, h.match_start, h.match_end) for h in hits] == [
+            ("a", 0, 1),
+            ("alpha  beta", 0, 11),
+            ("café", 1, 4),
+        ]
+        # The decoded-text fallback applies the same rule
+        hits = scan_file(path, BytePattern(r"é\W+x", use_regex=True), max_hits=10)
+        assert hits == []
+
+        result = asyncio.run(grep(r"a\s+b", tmpdir, use_regex=True, search_type="python"))
+        assert "Found 1 match" in result
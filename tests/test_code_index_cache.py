@@ -0,0 +1,69 @@
+"""Tests for the persisted, incrementally refreshed CodeIndex."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from tunacode.core.code_index import CodeIndex
+
+
+def _make_repo(root: Path) -> None:
+    (root / "pkg").mkdir()
+    (root / "pkg" / "models.py").write_text("import os\n\nclass User:\n    pass\n")
+    (root / "pkg" / "views.py").write_text("from pkg import models\n\ndef render():\n    pass\n")
+    (root / "README.md").write_text("# Demo\n")
+
+
+def test_second_build_reuses_cached_records():
+    """A fresh index for the same root re-parses nothing when files are unchanged."""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache:
+        _make_repo(Path(repo))
+
+        first = CodeIndex(repo, cache_dir=cache)
+        first.build_index()
+        assert first.get_stats()["files_reparsed"] == 3
+        assert first.get_stats()["files_reused"] == 0
+
+        second = CodeIndex(repo, cache_dir=cache)
+        second.build_index()
+        stats = second.get_stats()
+        assert stats["files_reused"] == 3
+        assert stats["files_reparsed"] == 0
+
+        # Cached symbol data is restored, not just the file list
+        assert second.lookup("User") == [Path("pkg/models.py")]
+        assert second.find_imports("os") == [Path("pkg/models.py")]
+
+
+def test_changed_file_is_reparsed():
+    """Only files whose size, mtime or inode changed are parsed again."""
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache:
+        _make_repo(Path(repo))
+        CodeIndex(repo, cache_dir=cache).build_index()
+
+        views = Path(repo, "pkg", "views.py")
+        views.write_text("def render():\n    pass\n\ndef paginate():\n    pass\n")
+        st = views.stat()
+        os.utime(views, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        index = CodeIndex(repo, cache_dir=cache)
+        index.build_index()
+        stats = index.get_stats()
+        assert stats["files_reparsed"] == 1
+        assert stats["files_reused"] == 2
+        assert index.lookup("paginate") == [Path("pkg/views.py")]
+
+
+def test_forced_rebuild_reuses_in_memory_records():
+    """A forced rebuild only re-stats files when nothing changed."""
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(Path(repo))
+
+        index = CodeIndex(repo, persist=False)
+        index.build_index()
+        index.build_index(force=True)
+
+        stats = index.get_stats()
+        assert stats["total_files"] == 3
+        assert stats["files_reused"] == 3
+        assert stats["files_reparsed"] == 0
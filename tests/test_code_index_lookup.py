@@ -0,0 +1,59 @@
+"""Tests for CodeIndex lookups backed by reverse and path-component indexes."""
+
+import tempfile
+from pathlib import Path
+
+from tunacode.core.code_index import CodeIndex
+
+FILES = {
+    "src/app/models.py": "import os\n\nclass User:\n    pass\n\ndef save():\n    pass\n",
+    "src/app/views.py": "from app import models\n\ndef render():\n    pass\n",
+    "src/util/strings.py": "import re\n\ndef render():\n    pass\n",
+    "tests/test_models.py": "import os\n\ndef test_user():\n    pass\n",
+    "docs/Guide.md": "# Guide\n",
+}
+
+
+def _brute_force(index: CodeIndex, query: str):
+    """The original linear-scan semantics of lookup, without symbols."""
+    query_lower = query.lower()
+    return sorted(p for p in index.get_all_files() if query_lower in str(p).lower())
+
+
+def test_substring_lookup_matches_linear_scan():
+    with tempfile.TemporaryDirectory() as repo:
+        for rel_path, content in FILES.items():
+            path = Path(repo) / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        index = CodeIndex(repo, persist=False)
+        index.build_index()
+
+        for query in ["models", "MODEL", "app", "ing", "s", "py", "guide.md", "app/mo", "", "zzz"]:
+            assert sorted(index.lookup(query)) == _brute_force(index, query), query
+
+        # Symbols still resolve exactly
+        assert index.lookup("render") == [Path("src/app/views.py"), Path("src/util/strings.py")]
+        assert index.find_imports("os") == [Path("src/app/models.py"), Path("tests/test_models.py")]
+
+
+def test_removal_touches_only_the_files_own_entries():
+    with tempfile.TemporaryDirectory() as repo:
+        for rel_path, content in FILES.items():
+            path = Path(repo) / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        index = CodeIndex(repo, persist=False)
+        index.build_index()
+
+        (Path(repo) / "src/app/models.py").unlink()
+        index.refresh("src/app/models.py")
+
+        assert index.lookup("User") == []
+        assert index.lookup("save") == []
+        assert index.lookup("render") == [Path("src/app/views.py"), Path("src/util/strings.py")]
+        assert index.find_imports("os") == [Path("tests/test_models.py")]
+        assert sorted(index.lookup("models")) == [Path("tests/test_models.py")]
+        # Components only used by the removed file are dropped entirely
+        assert "models.py" not in index._component_paths
+        assert "app" in index._component_paths
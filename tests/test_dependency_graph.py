@@ -0,0 +1,79 @@
+"""Tests for the import dependency graph and the find_dependents tool."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tunacode.core import code_index as code_index_module
+from tunacode.core.code_index import CodeIndex
+from tunacode.tools.find_dependents import find_dependents
+
+FILES = {
+    "src/pkg/__init__.py": "",
+    "src/pkg/core.py": "def run():\n    pass\n",
+    "src/pkg/api.py": "from .core import run\n",
+    "src/pkg/sub/__init__.py": "from .. import api\n",
+    "src/pkg/sub/cli.py": "from ..api import run\nimport pkg.sub\n",
+    "tests/test_cli.py": "from pkg.sub import cli\nimport os\n",
+    "scripts/tool.py": "import pkg\n",
+}
+
+
+def _write_repo(root):
+    for rel_path, content in FILES.items():
+        path = Path(root) / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+
+
+def test_graph_resolves_relative_and_absolute_imports():
+    with tempfile.TemporaryDirectory() as repo:
+        _write_repo(repo)
+        index = CodeIndex(repo, persist=False)
+        graph = index.get_dependency_graph()
+
+        assert graph.module_name(Path("src/pkg/sub/cli.py")) == "pkg.sub.cli"
+        assert graph.resolve("pkg.core") == Path("src/pkg/core.py")
+        assert graph.dependencies(Path("src/pkg/sub/cli.py")) == [
+            Path("src/pkg/api.py"),
+            Path("src/pkg/sub/__init__.py"),
+        ]
+        assert graph.dependents(Path("src/pkg/core.py")) == [Path("src/pkg/api.py")]
+        assert graph.dependents(Path("src/pkg/core.py"), transitive=True) == [
+            Path("src/pkg/api.py"),
+            Path("src/pkg/sub/__init__.py"),
+            Path("src/pkg/sub/cli.py"),
+            Path("tests/test_cli.py"),
+        ]
+        assert graph.get_stats()["cached_closures"] == 1
+
+        # Index changes drop the cached graph
+        (Path(repo) / "src/pkg/api.py").write_text("import os\n")
+        index.refresh("src/pkg/api.py")
+        new_graph = index.get_dependency_graph()
+        assert new_graph is not graph
+        assert new_graph.dependents(Path("src/pkg/core.py"), transitive=True) == []
+
+
+@pytest.mark.asyncio
+async def test_find_dependents_tool_separates_tests(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.realpath(tmp)
+        _write_repo(root)
+        index = CodeIndex(root, persist=False)
+        index.build_index()
+        code_index_module._shared_indexes[Path(root)] = index
+        monkeypatch.chdir(root)
+        try:
+            result = await find_dependents("pkg.api")
+            assert "3 file(s) transitively depend on src/pkg/api.py:" in result
+            assert "Tests affected (1):\n  tests/test_cli.py" in result
+
+            result = await find_dependents("src/pkg/api.py", transitive=False)
+            assert "2 file(s) directly depend on" in result
+
+            assert "No indexed Python module" in await find_dependents("missing.mod")
+        finally:
+            code_index_module._shared_indexes.pop(Path(root), None)
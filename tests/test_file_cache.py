@@ -0,0 +1,64 @@
+"""Tests for the session-wide file content cache."""
+
+import asyncio
+import os
+import tempfile
+
+from tunacode.tools.read_file import read_file
+from tunacode.tools.update_file import update_file
+from tunacode.utils.file_cache import FILE_CACHE, FileContentCache
+
+
+def test_cache_hits_until_file_changes():
+    cache = FileContentCache()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "a.py")
+        with open(path, "w") as f:
+            f.write("x = 1\n")
+
+        assert cache.read(path) == "x = 1\n"
+        assert cache.read(os.path.join(tmpdir, ".", "a.py")) == "x = 1\n"
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        # An external edit changes size and mtime, so the next read refreshes
+        with open(path, "w") as f:
+            f.write("x = 22\n")
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1))
+        assert cache.read(path) == "x = 22\n"
+        assert cache.misses == 2
+
+
+def test_lru_eviction_respects_memory_cap():
+    cache = FileContentCache(max_bytes=25)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(3):
+            path = os.path.join(tmpdir, f"f{i}.txt")
+            with open(path, "w") as f:
+                f.write(str(i) * 10)
+            paths.append(path)
+
+        cache.read(paths[0])
+        cache.read(paths[1])
+        cache.read(paths[0])  # f0 is now most recently used
+        cache.read(paths[2])  # evicts f1
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2 and stats["bytes"] == 20 and stats["evictions"] == 1
+        cache.read(paths[0])
+        assert cache.hits == 2
+
+
+def test_write_tools_keep_cache_current():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "mod.py")
+        with open(path, "w") as f:
+            f.write("def old():\n    pass\n")
+
+        assert asyncio.run(read_file(path)).startswith("def old")
+        asyncio.run(update_file(path, "def old", "def new"))
+
+        hits = FILE_CACHE.hits
+        assert asyncio.run(read_file(path)) == "def new():\n    pass\n"
+        assert FILE_CACHE.hits == hits + 1
+        FILE_CACHE.invalidate(path)
@@ -0,0 +1,194 @@
+"""Tests for the filesystem watcher that keeps indexes and caches live."""
+
+import asyncio
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tunacode.core import code_index as code_index_module
+from tunacode.core.code_index import CodeIndex
+from tunacode.core.watcher import FileWatcher, is_watched
+from tunacode.utils.file_cache import FILE_CACHE
+
+
+def _write(root, rel_path, content):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def _shared_index(root):
+    index = CodeIndex(root, persist=False)
+    index.build_index()
+    code_index_module._shared_indexes[Path(root).resolve()] = index
+    return index
+
+
+def test_apply_changes_updates_index_incrementally():
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.realpath(tmp)
+        _write(root, "pkg/a.py", "class Alpha:\n    pass\n")
+        index = _shared_index(root)
+        trigrams = index.get_trigram_index()
+        reparsed = index.get_stats()["files_reparsed"]
+        try:
+            _write(root, "pkg/b.py", "class Beta:\n    pass\n")
+            os.remove(os.path.join(root, "pkg/a.py"))
+            _write(root, "new/deep/c.py", "def gamma():\n    return 1\n")
+
+            FileWatcher(root).apply_changes({"pkg/b.py", "pkg/a.py", "new"})
+
+            assert index.lookup("Beta") == [Path("pkg/b.py")]
+            assert index.lookup("Alpha") == []
+            assert Path("new/deep/c.py") in index.get_all_files()
+            # Only the two new files were parsed; nothing was rebuilt
+            assert index.get_stats()["files_reparsed"] == reparsed + 2
+            assert trigrams.candidates("gamma") == ["new/deep/c.py"]
+            assert trigrams.candidates("class Alpha") == []
+
+            # Deleting a directory drops everything under it
+            os.remove(os.path.join(root, "new/deep/c.py"))
+            os.rmdir(os.path.join(root, "new/deep"))
+            FileWatcher(root).apply_changes({"new/deep"})
+            assert Path("new/deep/c.py") not in index.get_all_files()
+            assert trigrams.candidates("gamma") == []
+        finally:
+            code_index_module._shared_indexes.pop(Path(root).resolve(), None)
+
+
+@pytest.mark.parametrize(
+    "backend",
+    [
+        "poll",
+        pytest.param(
+            "inotify",
+            marks=pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only"),
+        ),
+    ],
+)
+def test_watcher_pushes_edits(backend):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.realpath(tmp)
+        _write(root, "main.py", "def old_name():\n    pass\n")
+        index = _shared_index(root)
+
+        async def scenario():
+            watcher = FileWatcher(root, backend=backend, debounce=0.05, poll_interval=0.05)
+            task = asyncio.create_task(watcher.run())
+            for _ in range(100):
+                if is_watched(root):
+                    break
+                await asyncio.sleep(0.01)
+            assert is_watched(os.path.join(root, "sub"))
+
+            assert "old_name" in FILE_CACHE.read(os.path.join(root, "main.py"))
+            _write(root, "main.py", "def new_name():\n    pass\n")
+            _write(root, "extra/util.py", "class Helper:\n    pass\n")
+            for _ in range(200):
+                if index.lookup("Helper") and index.lookup("new_name"):
+                    break
+                await asyncio.sleep(0.02)
+
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return watcher
+
+        try:
+            watcher = asyncio.run(scenario())
+            assert index.lookup("Helper") == [Path("extra/util.py")]
+            assert index.lookup("new_name") == [Path("main.py")]
+            assert index.lookup("old_name") == []
+            assert not is_watched(root)
+            assert watcher.paths_applied >= 1
+        finally:
+            code_index_module._shared_indexes.pop(Path(root).resolve(), None)
+
+
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="Linux only")
+def test_new_directories_are_watched_off_the_event_loop(monkeypatch):
+    import threading
+
+    from tunacode.core.watcher import InotifyBackend
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.realpath(tmp)
+        _write(root, "main.py", "x = 1\n")
+        index = _shared_index(root)
+        watch_threads = []
+        add_watches = InotifyBackend.add_watches
+
+        def recording_add_watches(self, rel_dir):
+            watch_threads.append(threading.current_thread())
+            return add_watches(self, rel_dir)
+
+        monkeypatch.setattr(InotifyBackend, "add_watches", recording_add_watches)
+
+        async def scenario():
+            watcher = FileWatcher(root, backend="inotify", debounce=0.05)
+            task = asyncio.create_task(watcher.run())
+            for _ in range(100):
+                if is_watched(root):
+                    break
+                await asyncio.sleep(0.01)
+
+            os.makedirs(os.path.join(root, "pkg/deep"))
+            await asyncio.sleep(0.2)
+            # Written after the new tree is watched, so only its watches can report it
+            _write(root, "pkg/deep/later.py", "class Later:\n    pass\n")
+            for _ in range(200):
+                if index.lookup("Later"):
+                    break
+                await asyncio.sleep(0.02)
+
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        try:
+            asyncio.run(scenario())
+            assert index.lookup("Later") == [Path("pkg/deep/later.py")]
+            assert watch_threads and threading.main_thread() not in watch_threads
+        finally:
+            code_index_module._shared_indexes.pop(Path(root).resolve(), None)
+
+
+def test_trigram_index_built_by_grep_follows_watched_changes(monkeypatch):
+    from tunacode.tools.grep import grep
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.realpath(tmp)
+        _write(root, "main.py", "def old_name():\n    pass\n")
+        monkeypatch.chdir(root)
+        monkeypatch.setattr(code_index_module, "_shared_indexes", {})
+
+        async def scenario():
+            # Builds only the trigram index, not the CodeIndex
+            assert "main.py" in await grep("old_name", ".", search_type="indexed")
+            index = code_index_module.get_code_index(create=False)
+            assert not index.is_built
+
+            watcher = FileWatcher(root, backend="poll", debounce=0.05, poll_interval=0.05)
+            task = asyncio.create_task(watcher.run())
+            for _ in range(100):
+                if is_watched(root):
+                    break
+                await asyncio.sleep(0.01)
+
+            _write(root, "pkg/later.py", "def zebra_unique():\n    pass\n")
+            trigram_index = index.get_trigram_index(build=False)
+            for _ in range(200):
+                if trigram_index.candidates("zebra_unique"):
+                    break
+                await asyncio.sleep(0.02)
+            result = await grep("zebra_unique", ".")
+
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            return result
+
+        result = asyncio.run(scenario())
+        assert "Strategy: indexed" in result
+        assert "later.py" in result
@@ -0,0 +1,81 @@
+"""Tests for the process-pool backend of the Python grep strategy."""
+
+import asyncio
+import os
+import tempfile
+
+from tunacode.tools import grep as grep_module
+from tunacode.tools.grep import choose_search_backend, grep
+from tunacode.utils import process_pool
+from tunacode.utils.byte_search import scan_shard, shard_by_size
+
+
+def test_shards_are_balanced_by_bytes():
+    files = [(f"f{i}", size) for i, size in enumerate([900, 500, 400, 300, 200, 100, 100])]
+    shards = shard_by_size(files, 3)
+    sizes = dict(files)
+    totals = sorted(sum(sizes[path] for path in shard) for shard in shards)
+    assert totals == [800, 800, 900]
+    assert sorted(path for shard in shards for path in shard) == sorted(p for p, _ in files)
+    assert shard_by_size(files[:2], 8) == [["f0"], ["f1"]]
+
+
+def test_backend_heuristic():
+    big = grep_module.PROCESS_MIN_BYTES
+    assert choose_search_backend(10_000, big, workers=8) == "process"
+    assert choose_search_backend(10_000, big, workers=1) == "thread"
+    assert choose_search_backend(10, big, workers=8) == "thread"
+    assert choose_search_backend(10_000, big // 2, workers=8) == "thread"
+
+
+def test_process_backend_matches_thread_backend(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(12):
+            with open(os.path.join(tmpdir, f"m{i}.py"), "w") as f:
+                f.write("pass\n" * i + ("def handle_event():\n" if i % 3 == 0 else ""))
+
+        paths = sorted(os.path.join(tmpdir, name) for name in os.listdir(tmpdir))
+        hits = scan_shard(paths, "handle_event", False, False, 10)
+        assert len(hits) == 4 and all(len(hit) == 6 for hit in hits)
+
+        threaded = asyncio.run(grep("handle_event", tmpdir, search_type="python"))
+
+        monkeypatch.setattr(grep_module, "PROCESS_MIN_FILES", 1)
+        monkeypatch.setattr(grep_module, "PROCESS_MIN_BYTES", 1)
+        monkeypatch.setattr(grep_module, "search_worker_count", lambda: 2)
+        monkeypatch.setattr(process_pool, "worker_count", lambda: 2)
+        process_pool.shutdown_process_pool()
+        try:
+            pooled = asyncio.run(grep("handle_event", tmpdir, search_type="python"))
+            assert process_pool._pool is not None
+            # Workers do not inherit this process's threads through fork
+            assert process_pool._pool._mp_context.get_start_method() != "fork"
+        finally:
+            process_pool.shutdown_process_pool()
+
+        def locations(output):
+            return sorted(line for line in output.splitlines() if "📁" in line)
+
+        assert locations(pooled) == locations(threaded)
+        assert len(locations(pooled)) == 4
+
+
+def test_streaming_search_sizes_files_in_the_walker(monkeypatch):
+    walked = []
+    original = grep_module.async_walk
+
+    async def recording_walk(*args, **kwargs):
+        async for entries in original(*args, **kwargs):
+            # Checked before the search reads any size
+            walked.extend(entry.stat is not None for entry in entries)
+            yield entries
+
+    monkeypatch.setattr(grep_module, "async_walk", recording_walk)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for i in range(3):
+            with open(os.path.join(tmpdir, f"m{i}.py"), "w") as f:
+                f.write("def handle_event():\n")
+        asyncio.run(grep("handle_event", tmpdir, search_type="python"))
+
+    # Every size was filled in off the event loop, so no lazy stat is needed
+    assert walked == [True, True, True]
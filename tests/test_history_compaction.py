@@ -0,0 +1,135 @@
+"""Tests for token-budgeted history compaction."""
+
+import asyncio
+
+import pytest
+from pydantic_ai.messages import (ModelRequest, ModelResponse, SystemPromptPart, TextPart,
+                                  ToolCallPart, ToolReturnPart, UserPromptPart)
+
+from tunacode.core.agents import compaction
+from tunacode.core.agents.compaction import (SUMMARY_HEADER, build_compacted_history,
+                                             compact_history, find_compaction_split)
+from tunacode.core.background.manager import BG_MANAGER
+from tunacode.core.state import StateManager
+
+
+def _history(turns: int):
+    messages = [ModelRequest(parts=[SystemPromptPart("You are helpful."), UserPromptPart("hi")])]
+    for i in range(turns):
+        call_id = f"call-{i}"
+        messages.append(
+            ModelResponse(parts=[ToolCallPart("read_file", {"file_path": f"f{i}.py"}, call_id)])
+        )
+        messages.append(ModelRequest(parts=[ToolReturnPart("read_file", "x = 1\n" * 50, call_id)]))
+        messages.append(ModelResponse(parts=[TextPart(f"done with turn {i}")]))
+        messages.append(ModelRequest(parts=[UserPromptPart(f"next request {i}")]))
+    return messages
+
+
+def _assert_pairs_intact(messages):
+    calls, returns = set(), set()
+    for message in messages:
+        for part in message.parts:
+            if part.part_kind == "tool-call":
+                calls.add(part.tool_call_id)
+            elif part.part_kind == "tool-return":
+                assert part.tool_call_id in calls, "tool return kept without its call"
+                returns.add(part.tool_call_id)
+
+
+def test_split_never_orphans_tool_returns():
+    messages = _history(6)
+    for keep_tokens in range(0, 2000, 25):
+        split = find_compaction_split(messages, keep_tokens)
+        assert split > 0
+        _assert_pairs_intact(messages[split:])
+
+
+def test_compacted_history_keeps_system_prompt():
+    messages = _history(3)
+    split = find_compaction_split(messages, keep_tokens=0)
+    compacted = build_compacted_history(messages[:split], messages[split:], "we read files")
+
+    first = compacted[0]
+    assert [p.content for p in first.parts] == [
+        "You are helpful.",
+        f"{SUMMARY_HEADER}\nwe read files",
+    ]
+    assert compacted[1:] == messages[split:]
+
+    # Compacting again replaces the old summary instead of stacking it
+    again = build_compacted_history(compacted, [], "newer summary")
+    assert [p.content for p in again[0].parts] == [
+        "You are helpful.",
+        f"{SUMMARY_HEADER}\nnewer summary",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_compaction_runs_in_background_then_applies(monkeypatch):
+    summarized = []
+
+    async def fake_summarize(messages, model):
+        summarized.append(len(messages))
+        return "summary of earlier turns"
+
+    monkeypatch.setattr(compaction, "summarize_messages", fake_summarize)
+    monkeypatch.setattr(compaction, "get_context_window", lambda model: 4000)
+
+    state = StateManager()
+    state.session.user_config = {"settings": {"auto_compact_threshold": 0.5}}
+    state.session.messages = _history(8)
+    original = list(state.session.messages)
+
+    # First call only starts the summary; the history is unchanged
+    assert await compact_history(state, "openai:gpt-4o") is False
+    assert state.session.messages == original
+    await asyncio.sleep(0)
+
+    # A later request swaps in the finished summary
+    assert await compact_history(state, "openai:gpt-4o") is True
+    messages = state.session.messages
+    assert len(messages) < len(original)
+    assert messages[0].parts[-1].content.startswith(SUMMARY_HEADER)
+    assert messages[-1] is original[-1]
+    _assert_pairs_intact(messages[1:])
+    assert summarized and summarized[0] == len(original) - (len(messages) - 1)
+    # Finished summaries do not pile up in the background manager
+    await asyncio.sleep(0)
+    assert state.session.pending_compaction is None
+    assert not any(name.startswith("compact-") for name in BG_MANAGER.tasks)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_summary_is_discarded(monkeypatch):
+    async def slow_summarize(messages, model):
+        await asyncio.sleep(30)
+        return "never used"
+
+    monkeypatch.setattr(compaction, "summarize_messages", slow_summarize)
+    monkeypatch.setattr(compaction, "get_context_window", lambda model: 4000)
+
+    state = StateManager()
+    state.session.user_config = {"settings": {"auto_compact_threshold": 0.5}}
+    state.session.messages = _history(8)
+    original = list(state.session.messages)
+
+    assert await compact_history(state, "openai:gpt-4o") is False
+    state.session.pending_compaction.task.cancel()
+    await asyncio.sleep(0)
+
+    # The cancelled summary is dropped and a new one is started
+    assert await compact_history(state, "openai:gpt-4o") is False
+    assert state.session.messages == original
+    state.session.pending_compaction.task.cancel()
+    await asyncio.gather(state.session.pending_compaction.task, return_exceptions=True)
+
+
+@pytest.mark.asyncio
+async def test_auto_compact_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(compaction, "get_context_window", lambda model: 100)
+    state = StateManager()
+    state.session.user_config = {"settings": {"auto_compact": False}}
+    state.session.messages = _history(4)
+    assert await compact_history(state, "openai:gpt-4o") is False
+    assert state.session.pending_compaction is None
@@ -0,0 +1,74 @@
+"""Tests for the compiled .gitignore matcher."""
+
+import os
+import tempfile
+
+from tunacode.utils.ignore import COMMON_IGNORE_PATTERNS, DEFAULT_IGNORE_PATTERNS, IgnoreMatcher
+from tunacode.utils.system import list_cwd
+
+
+def _touch(root, rel_path, content=""):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_gitignore_semantics():
+    with tempfile.TemporaryDirectory() as root:
+        _touch(
+            root,
+            ".gitignore",
+            "# comment\n*.log\n!keep.log\n/build\ncache/\ndocs/**/*.tmp\n\\#notes\n",
+        )
+        _touch(root, "pkg/.gitignore", "!debug.log\nlocal.cfg\n")
+        matcher = IgnoreMatcher(root)
+
+        assert matcher.is_ignored("app.log")
+        assert matcher.is_ignored("deep/dir/app.log")
+        assert not matcher.is_ignored("keep.log")
+        # Deeper ignore files override shallower ones
+        assert not matcher.is_ignored("pkg/debug.log")
+        assert matcher.is_ignored("pkg/local.cfg")
+        assert not matcher.is_ignored("local.cfg")
+        # Anchored patterns only match relative to their .gitignore
+        assert matcher.is_ignored("build", is_dir=True)
+        assert not matcher.is_ignored("src/build", is_dir=True)
+        # Directory-only patterns skip files of the same name but cover their contents
+        assert matcher.is_ignored("a/cache", is_dir=True)
+        assert not matcher.is_ignored("a/cache")
+        assert matcher.is_ignored("a/cache/data.bin")
+        # Files under an ignored directory cannot be re-included
+        assert matcher.is_ignored("build/keep.log")
+        assert matcher.is_ignored("docs/x/y/z.tmp") and matcher.is_ignored("docs/z.tmp")
+        assert matcher.is_ignored("#notes")
+        assert matcher.is_ignored(".git", is_dir=True)
+
+
+def test_parent_gitignore_and_builtin_patterns():
+    with tempfile.TemporaryDirectory() as repo:
+        os.mkdir(os.path.join(repo, ".git"))
+        _touch(repo, ".gitignore", "generated/\n")
+        _touch(repo, "src/pkg.egg-info/PKG-INFO")
+        sub = os.path.join(repo, "src")
+
+        matcher = IgnoreMatcher(sub, patterns=COMMON_IGNORE_PATTERNS)
+        assert matcher.is_ignored("generated", is_dir=True)
+        assert matcher.is_ignored("pkg.egg-info", is_dir=True)
+        assert not matcher.is_ignored("main.py")
+
+        # Fallback defaults only apply when no .gitignore exists
+        assert not IgnoreMatcher(sub, fallback_patterns=DEFAULT_IGNORE_PATTERNS).is_ignored("x.pyc")
+    with tempfile.TemporaryDirectory() as bare:
+        assert IgnoreMatcher(bare, fallback_patterns=DEFAULT_IGNORE_PATTERNS).is_ignored("x.pyc")
+
+
+def test_list_cwd_uses_matcher(monkeypatch):
+    with tempfile.TemporaryDirectory() as root:
+        _touch(root, ".gitignore", "*.tmp\nout/\n")
+        for rel_path in ["a.py", "b.tmp", "out/c.py", "pkg/d.py", "pkg/deep/e.py", ".git/HEAD"]:
+            _touch(root, rel_path)
+        monkeypatch.chdir(root)
+
+        assert list_cwd(max_depth=3) == [".gitignore", "a.py", "pkg/d.py", "pkg/deep/e.py"]
+        assert list_cwd(max_depth=1) == [".gitignore", "a.py", "pkg/d.py"]
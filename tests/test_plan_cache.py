@@ -0,0 +1,168 @@
+"""Tests for the planner output cache."""
+
+import tempfile
+from pathlib import Path
+
+from tunacode.core.llm.plan_cache import PlanCache, normalize_request, repo_fingerprint
+
+MODEL = "openai:gpt-4o"
+
+
+def _cache(home, **kwargs):
+    return PlanCache(path=Path(home) / "plan_cache.json", **kwargs)
+
+
+def _explain_plan(path):
+    return [
+        {"id": 1, "description": f"Read {path}", "mutate": False, "reads": [path]},
+        {"id": 2, "description": f"Summarize {path}", "mutate": False, "reads": []},
+    ]
+
+
+def test_normalize_request_abstracts_file_refs():
+    template, refs = normalize_request("  Explain   @src/foo.py and 'lib/bar.js'. ")
+    assert template == "Explain <file0> and <file1>"
+    assert refs == ["src/foo.py", "lib/bar.js"]
+
+    template, refs = normalize_request("Diff @a.py against @a.py")
+    assert template == "Diff <file0> against <file0>"
+    assert refs == ["a.py"]
+
+
+def test_repo_fingerprint_tracks_layout_and_referenced_files():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        before = repo_fingerprint(tmpdir, ["foo.py"])
+        assert repo_fingerprint(tmpdir, ["foo.py"]) == before
+
+        Path(tmpdir, "foo.py").write_text("x = 1\n")
+        after = repo_fingerprint(tmpdir, ["foo.py"])
+        assert after != before
+
+        # Editing a file does not change the fingerprint
+        Path(tmpdir, "foo.py").write_text("x = 2\n")
+        assert repo_fingerprint(tmpdir, ["foo.py"]) == after
+
+
+def test_cached_plan_is_reused_with_new_file_refs():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home)
+        assert cache.get("make_plan", "explain @foo.py", MODEL, root=tmpdir) is None
+
+        cache.put("make_plan", "explain @foo.py", MODEL, _explain_plan("foo.py"), root=tmpdir)
+        tasks = cache.get("make_plan", "explain  @bar.py", MODEL, root=tmpdir)
+        assert tasks == _explain_plan("bar.py")
+
+        # Plans are kept apart per planner and model
+        assert cache.get("constrained", "explain @bar.py", MODEL, root=tmpdir) is None
+        assert cache.get("make_plan", "explain @bar.py", "openai:gpt-4.1", root=tmpdir) is None
+        assert cache.get_stats() == {"entries": 1, "hits": 1, "similar_hits": 0, "misses": 3}
+
+
+def test_file_refs_are_substituted_only_as_whole_paths():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home)
+        plan = [
+            {
+                "id": 1,
+                "description": "Compare data.py with metadata.py and src/data.py, then read data.py.",
+                "mutate": False,
+                "reads": ["data.py", "metadata.py", "data.pyc"],
+            }
+        ]
+        cache.put("make_plan", "explain @data.py", MODEL, plan, root=tmpdir)
+
+        assert cache.get("make_plan", "explain @datb.py", MODEL, root=tmpdir) == [
+            {
+                "id": 1,
+                "description": "Compare datb.py with metadata.py and src/data.py, then read datb.py.",
+                "mutate": False,
+                "reads": ["datb.py", "metadata.py", "data.pyc"],
+            }
+        ]
+
+
+def test_repo_change_invalidates_plans():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home)
+        cache.put("make_plan", "run tests and fix failures", MODEL, [{"id": 1}], root=tmpdir)
+        assert cache.get("make_plan", "run tests and fix failures", MODEL, root=tmpdir)
+
+        Path(tmpdir, "setup.py").write_text("")
+        assert cache.get("make_plan", "run tests and fix failures", MODEL, root=tmpdir) is None
+
+
+def test_similar_requests_reuse_plan_above_threshold():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home, similarity=0.8)
+        request = "run the unit tests and fix all the failures you find in @src/app.py"
+        cache.put("make_plan", request, MODEL, _explain_plan("src/app.py"), root=tmpdir)
+
+        similar = "run the unit tests and fix all of the failures you find in @src/db.py"
+        assert cache.get("make_plan", similar, MODEL, root=tmpdir) == _explain_plan("src/db.py")
+        assert cache.get_stats()["similar_hits"] == 1
+
+        assert cache.get("make_plan", "delete the unit tests in @src/db.py", MODEL) is None
+        # A different number of file refs never matches
+        different_refs = "run the unit tests and fix all the failures you find in @a.py @b.py"
+        assert cache.get("make_plan", different_refs, MODEL, root=tmpdir) is None
+
+
+def test_similar_requests_never_reuse_mutating_plans():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home, similarity=0.8)
+        request = "set the log level to debug in the settings of @app.py"
+        plan = [
+            {"id": 1, "description": "Set level to DEBUG in app.py", "mutate": True},
+        ]
+        cache.put("make_plan", request, MODEL, plan, root=tmpdir)
+
+        # One word apart, but the plan would write the wrong value
+        similar = "set the log level to error in the settings of @app.py"
+        assert cache.get("make_plan", similar, MODEL, root=tmpdir) is None
+        assert cache.get("make_plan", request, MODEL, root=tmpdir) == plan
+
+
+def test_case_sensitive_values_do_not_share_a_plan():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home)
+        request = "rename the branch Feature-X to release and push it"
+        plan = [{"id": 1, "description": "git branch -m Feature-X release", "mutate": True}]
+        cache.put("make_plan", request, MODEL, plan, root=tmpdir)
+
+        other = "rename the branch feature-x to release and push it"
+        assert cache.get("make_plan", other, MODEL, root=tmpdir) is None
+        assert cache.get("make_plan", request, MODEL, root=tmpdir) == plan
+
+        # Read-only plans still match across case through the similarity check
+        cache.put("make_plan", "explain @Foo.py", MODEL, _explain_plan("Foo.py"), root=tmpdir)
+        tasks = cache.get("make_plan", "Explain @foo.py", MODEL, root=tmpdir)
+        assert tasks == _explain_plan("foo.py")
+        assert cache.get_stats()["similar_hits"] == 1
+
+
+def test_lru_eviction():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home, maxsize=2)
+        cache.put("make_plan", "first", MODEL, [{"id": 1}], root=tmpdir)
+        cache.put("make_plan", "second", MODEL, [{"id": 2}], root=tmpdir)
+        # Touch "first" so "second" is least recently used
+        assert cache.get("make_plan", "first", MODEL, root=tmpdir)
+        cache.put("make_plan", "third", MODEL, [{"id": 3}], root=tmpdir)
+
+        assert cache.get("make_plan", "second", MODEL, root=tmpdir) is None
+        assert cache.get("make_plan", "first", MODEL, root=tmpdir) == [{"id": 1}]
+        assert cache.get("make_plan", "third", MODEL, root=tmpdir) == [{"id": 3}]
+
+
+def test_plans_persist_across_instances():
+    with tempfile.TemporaryDirectory() as home, tempfile.TemporaryDirectory() as tmpdir:
+        cache = _cache(home)
+        cache.put("constrained", "explain @foo.py", MODEL, _explain_plan("foo.py"), root=tmpdir)
+
+        reloaded = _cache(home)
+        assert reloaded.get("constrained", "explain @x.py", MODEL, root=tmpdir) == _explain_plan(
+            "x.py"
+        )
+
+        reloaded.clear()
+        assert _cache(home).get("constrained", "explain @x.py", MODEL, root=tmpdir) is None
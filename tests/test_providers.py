@@ -0,0 +1,37 @@
+"""Tests for the shared model and HTTP client factory."""
+
+import asyncio
+import os
+from unittest.mock import patch
+
+from tunacode.core.llm import providers
+
+
+def test_models_share_one_pooled_client():
+    asyncio.run(providers.close_http_client())
+    with patch.dict(os.environ, {"OPENAI_API_KEY": "test-key", "GEMINI_API_KEY": "test-key"}):
+        first = providers.get_model("openai:gpt-4.1")
+        assert providers.get_model("openai:gpt-4.1") is first
+        other = providers.get_model("google-gla:gemini-2.0-flash")
+
+        client = providers.get_http_client()
+        assert first.client._client is client
+        assert other.client is client
+
+        # A new key builds a new model on the same client
+        with patch.dict(os.environ, {"OPENAI_API_KEY": "other-key"}):
+            assert providers.get_model("openai:gpt-4.1") is not first
+
+        stats = providers.get_pool_stats()
+        assert stats["models_cached"] == 3
+        assert stats["connections"] == 0
+
+    asyncio.run(providers.close_http_client())
+    assert providers.get_pool_stats()["models_cached"] == 0
+
+
+def test_unknown_or_unbuildable_models_fall_back_to_the_name():
+    assert providers.get_model("test") == "test"
+    assert providers.get_model("bedrock:some-model") == "bedrock:some-model"
+    with patch.dict(os.environ, {"OPENROUTER_API_KEY": ""}):
+        assert providers.get_model("openrouter:o3") == "openrouter:o3"
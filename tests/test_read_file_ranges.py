@@ -0,0 +1,69 @@
+"""Tests for line-range and large-file reads in read_file."""
+
+import asyncio
+import os
+import tempfile
+
+from tunacode.constants import DEFAULT_READ_LINE_LIMIT, MAX_FILE_SIZE
+from tunacode.tools.read_file import read_file
+from tunacode.utils.line_index import LINE_INDEX_CACHE, LineIndex
+
+
+def _write_lines(path, count, width=40):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(1, count + 1):
+            f.write(f"line {i} ".ljust(width, "x") + "\n")
+
+
+def test_line_index_offsets_and_byte_budget():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "data.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("alpha\nbeta\r\nγάμμα\nno newline at end")
+
+        index = LineIndex.build(path)
+        assert index.line_count == 4
+        assert index.read(1, 2) == ("beta\nγάμμα\n", 2)
+        assert index.read(3, 10) == ("no newline at end", 1)
+        assert index.read(4, 1) == ("", 0)
+        # Whole lines are dropped to fit; a single oversized line is cut on a char boundary
+        assert index.read(0, 3, max_bytes=12) == ("alpha\nbeta\n", 2)
+        assert index.read(2, 1, max_bytes=4) == ("γά", 1)
+
+        # The cached index is rebuilt once the file changes
+        first = LINE_INDEX_CACHE.get(path)
+        assert LINE_INDEX_CACHE.get(path) is first
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("\nmore")
+        assert LINE_INDEX_CACHE.get(path).line_count == 5
+
+
+def test_offset_and_limit_select_lines():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "small.txt")
+        _write_lines(path, 100)
+
+        result = asyncio.run(read_file(path, offset=10, limit=3))
+        lines = result.splitlines()
+        assert lines[0].startswith("line 10 ") and lines[2].startswith("line 12 ")
+        assert lines[-1] == "[Lines 10-12 of 100. Use offset=13 to read more.]"
+
+        tail = asyncio.run(read_file(path, offset=99))
+        assert tail.splitlines()[-1].startswith("line 100 ")
+        assert "Use offset" not in tail
+
+
+def test_large_file_returns_first_chunk_instead_of_failing():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "big.log")
+        _write_lines(path, 20_000)
+        assert os.path.getsize(path) > MAX_FILE_SIZE
+
+        result = asyncio.run(read_file(path))
+        header, _, body = result.partition("\n")
+        assert "of 20000" in header and "offset and limit" in header
+        assert len(body.encode()) <= MAX_FILE_SIZE
+        assert body.count("\n") <= DEFAULT_READ_LINE_LIMIT
+
+        deep = asyncio.run(read_file(path, offset=15_000, limit=1))
+        assert deep.startswith("line 15000 ")
@@ -0,0 +1,80 @@
+"""Tests for chunk-level BM25 retrieval."""
+
+import os
+import tempfile
+from pathlib import Path
+
+from tunacode.core.retrieval import CodeRetriever, chunk_source
+
+
+def _make_repo(root: Path) -> None:
+    (root / "app").mkdir()
+    (root / "app" / "auth.py").write_text(
+        "import hashlib\n"
+        "\n"
+        "def hash_password(raw):\n"
+        "    return hashlib.sha256(raw.encode()).hexdigest()\n"
+        "\n"
+        "class SessionStore:\n"
+        "    def expire_sessions(self):\n"
+        "        pass\n"
+    )
+    (root / "app" / "ui.js").write_text(
+        "function renderButton(label) {\n  return label;\n}\n\nclass Modal {\n}\n"
+    )
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "lib.js").write_text("function hash_password() {}\n")
+
+
+def test_chunk_source_python_and_regex():
+    source = Path(__file__).read_text()
+    chunks = chunk_source("test_retrieval.py", source)
+    names = [name for _, _, name in chunks]
+    assert "test_chunk_source_python_and_regex" in names
+    # Chunks cover the file without overlapping
+    assert chunks[0][0] == 1
+    for (_, end, _), (start, _, _) in zip(chunks, chunks[1:]):
+        assert start == end + 1
+
+    js = "function a() {\n}\nexport class B {\n}\n"
+    assert chunk_source("x.js", js) == [(1, 2, "a"), (3, 4, "B")]
+
+
+def test_search_returns_ranked_snippets_and_respects_ignores():
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache:
+        _make_repo(Path(repo))
+        retriever = CodeRetriever(repo, cache_dir=cache)
+
+        snippets = retriever.search("password hashing")
+        assert snippets[0].path == os.path.join("app", "auth.py")
+        assert snippets[0].name == "hash_password"
+        assert (snippets[0].start_line, snippets[0].end_line) == (3, 4)
+        assert "hexdigest" in snippets[0].text
+        assert all("node_modules" not in s.path for s in snippets)
+
+        # camelCase identifiers are split into searchable parts
+        assert retriever.search("render button")[0].name == "renderButton"
+
+
+def test_cache_reused_and_invalidated_by_mtime():
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as cache:
+        _make_repo(Path(repo))
+        CodeRetriever(repo, cache_dir=cache).refresh()
+
+        retriever = CodeRetriever(repo, cache_dir=cache)
+        assert retriever.refresh() == {"updated": 0, "removed": 0, "unchanged": 2}
+
+        ui = Path(repo, "app", "ui.js")
+        ui.write_text("function closeDialog() {\n}\n")
+        st = ui.stat()
+        os.utime(ui, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        Path(repo, "app", "auth.py").unlink()
+
+        assert CodeRetriever(repo, cache_dir=cache).refresh() == {
+            "updated": 1,
+            "removed": 1,
+            "unchanged": 0,
+        }
+        assert retriever.search("close dialog", refresh=False) == []
+        retriever.refresh()
+        assert retriever.search("close dialog", refresh=False)[0].name == "closeDialog"
@@ -0,0 +1,120 @@
+"""Tests for the streaming ripgrep consumer in ParallelGrep."""
+
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from tunacode.exceptions import TooBroadPatternError
+from tunacode.tools.grep import (
+    ParallelGrep,
+    RipgrepUnavailableError,
+    SearchConfig,
+    _chunk_paths,
+    grep,
+)
+
+FAKE_RG = """#!{python}
+import json, sys, time
+
+def emit(record):
+    sys.stdout.write(json.dumps(record, separators=(",", ":")) + "\\n")
+    sys.stdout.flush()
+
+mode = {mode!r}
+if mode == "slow":
+    time.sleep(30)
+emit({{"type": "begin", "data": {{"path": {{"text": "a.py"}}}}}})
+for i in range(1, 1000):
+    emit({{"type": "context", "data": {{}}}})
+    emit({{
+        "type": "match",
+        "data": {{
+            "path": {{"text": "a.py"}},
+            "lines": {{"text": "needle %d\\n" % i}},
+            "line_number": i,
+            "submatches": [{{"match": {{"text": "needle"}}, "start": 0, "end": 6}}],
+        }},
+    }})
+# Never exits on its own; the consumer must kill it
+time.sleep(30)
+"""
+
+
+def _install_fake_rg(bin_dir: str, mode: str) -> None:
+    path = Path(bin_dir) / "rg"
+    path.write_text(FAKE_RG.format(python=sys.executable, mode=mode))
+    path.chmod(path.stat().st_mode | stat.S_IEXEC)
+
+
+@pytest.mark.asyncio
+async def test_stops_reading_at_max_results(monkeypatch):
+    with tempfile.TemporaryDirectory() as bin_dir:
+        _install_fake_rg(bin_dir, "fast")
+        monkeypatch.setenv("PATH", bin_dir + os.pathsep + os.environ.get("PATH", ""))
+
+        config = SearchConfig(max_results=5, include_patterns=["*"], exclude_patterns=[])
+        start = time.monotonic()
+        results = await ParallelGrep()._ripgrep_search("needle", ".", config)
+
+        assert [r.line_number for r in results] == [1, 2, 3, 4, 5]
+        assert results[0].line_content == "needle 1"
+        # The process is killed instead of waiting for it to finish
+        assert time.monotonic() - start < 10
+
+
+@pytest.mark.asyncio
+async def test_first_match_deadline(monkeypatch):
+    with tempfile.TemporaryDirectory() as bin_dir:
+        _install_fake_rg(bin_dir, "slow")
+        monkeypatch.setenv("PATH", bin_dir + os.pathsep + os.environ.get("PATH", ""))
+
+        config = SearchConfig(first_match_deadline=0.5)
+        with pytest.raises(TooBroadPatternError):
+            await ParallelGrep()._ripgrep_search_filtered("needle", [Path("a.py")], config)
+
+
+def test_parse_ripgrep_match_ignores_malformed_records():
+    grep = ParallelGrep()
+    assert grep._parse_ripgrep_match(b'{"type":"match","data":{}}') is None
+    assert grep._parse_ripgrep_match(b'{"type":"match"') is None
+    record = {
+        "type": "match",
+        "data": {
+            "path": {"text": "b.py"},
+            "lines": {"text": "x = 1\r\n"},
+            "line_number": 3,
+            "submatches": [{"start": 0, "end": 1}],
+        },
+    }
+    result = grep._parse_ripgrep_match(json.dumps(record).encode())
+    assert (result.file_path, result.line_number, result.line_content) == ("b.py", 3, "x = 1")
+
+
+def test_candidate_paths_are_split_into_bounded_commands():
+    paths = [Path(f"src/module_{i}.py") for i in range(1000)]
+    chunks = list(_chunk_paths(paths, max_bytes=1024))
+
+    assert len(chunks) > 1
+    assert all(sum(len(arg) + 1 for arg in chunk) <= 1024 for chunk in chunks)
+    assert [arg for chunk in chunks for arg in chunk] == [str(p) for p in paths]
+
+
+@pytest.mark.asyncio
+async def test_missing_ripgrep_falls_back_to_python(monkeypatch):
+    with tempfile.TemporaryDirectory() as repo, tempfile.TemporaryDirectory() as bin_dir:
+        Path(repo, "a.py").write_text("needle = 1\n")
+        monkeypatch.chdir(repo)
+        monkeypatch.setenv("PATH", bin_dir)
+
+        with pytest.raises(RipgrepUnavailableError):
+            await ParallelGrep()._ripgrep_search_filtered("needle", [Path("a.py")], SearchConfig())
+
+        result = await grep("needle", ".", search_type="ripgrep")
+        assert "Found 1 match" in result
+        assert "Strategy: python" in result
@@ -0,0 +1,124 @@
+"""Tests for speculative reads that overlap LLM planning."""
+
+import asyncio
+import inspect
+import os
+import tempfile
+
+import pytest
+
+from tunacode.core.agents import speculation as speculation_module
+from tunacode.core.agents.adaptive_orchestrator import AdaptiveOrchestrator
+from tunacode.core.agents.speculation import Speculation, speculative_tasks, task_key
+from tunacode.core.analysis import FeedbackDecision
+from tunacode.core.analysis.constrained_planner import Task
+from tunacode.core.analysis.feedback_loop import FeedbackResult
+from tunacode.core.state import StateManager
+
+
+def test_keys_match_equivalent_plan_tasks():
+    assert task_key({"tool": "read_file", "args": {"file_path": "./src/a.py"}}) == task_key(
+        {"tool": "read_file", "args": {"file_path": "@src/a.py"}}
+    )
+    assert task_key({"tool": "grep", "args": {"pattern": "load_config"}}) == task_key(
+        {"tool": "grep", "args": {"pattern": "load_config", "directory": "./", "max_results": 50}}
+    )
+    assert task_key({"tool": "read_file", "args": {"file_path": "a.py", "limit": 10}}) is None
+    assert task_key({"tool": "update_file", "args": {"file_path": "a.py"}}) is None
+
+
+def test_grep_keys_only_match_identical_searches():
+    def key(**args):
+        return task_key({"tool": "grep", "args": {"pattern": "load_config", **args}})
+
+    base = key()
+    assert task_key({"tool": "grep", "args": {"pattern": r"\bload_config\b"}}) != base
+    assert task_key({"tool": "grep", "args": {"pattern": "Load_Config"}}) != base
+    assert key(case_sensitive=True) != base
+    assert key(use_regex=True) != base
+    assert key(include_files="*.py") != base
+    assert key(max_results=5) != base
+    assert key(context_lines=0) != base
+    assert key(directory="src") != base
+    assert key(unknown_option=True) is None
+
+    # The defaults the key fills in are grep's own
+    from tunacode.tools.grep import grep
+
+    parameters = inspect.signature(grep).parameters
+    defaults = {
+        name: p.default for name, p in parameters.items() if name not in ("pattern", "directory")
+    }
+    assert defaults == speculation_module.GREP_DEFAULTS
+
+
+def test_speculative_tasks_skip_missing_files_and_short_terms():
+    with tempfile.TemporaryDirectory() as root:
+        open(os.path.join(root, "main.py"), "w").close()
+        tasks = speculative_tasks(["@main.py", "missing.py", "main.py"], ["ab", "handler"], root)
+        assert [(t["tool"], t["args"]) for t in tasks] == [
+            ("read_file", {"file_path": "main.py"}),
+            ("grep", {"pattern": "handler", "directory": "."}),
+        ]
+
+
+@pytest.mark.asyncio
+async def test_claim_returns_result_once_and_cancel_stops_the_rest():
+    started = asyncio.Event()
+
+    async def run_tool(task):
+        if task["tool"] == "grep":
+            started.set()
+            await asyncio.sleep(10)
+        return f"contents of {task['args']['file_path']}"
+
+    tasks = speculative_tasks([], ["never_claimed"]) + [
+        {"tool": "read_file", "args": {"file_path": "a.py"}}
+    ]
+    speculation = Speculation(tasks, run_tool)
+    speculation.start()
+    await started.wait()
+
+    read = {"tool": "read_file", "args": {"file_path": "a.py"}}
+    assert await speculation.claim(read) == "contents of a.py"
+    assert await speculation.claim(read) is None
+    await speculation.cancel()
+    assert (speculation.started, speculation.reused) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_orchestrator_reuses_reads_started_during_planning(monkeypatch):
+    ran = []
+
+    async def run_tool(task):
+        ran.append(task_key(task))
+        return f"speculative {task['tool']}"
+
+    monkeypatch.setattr(speculation_module, "_run_tool", run_tool)
+
+    orchestrator = AdaptiveOrchestrator(StateManager())
+
+    async def plan(request, model):
+        # Speculation is already running while the planner is generating
+        await asyncio.sleep(0.01)
+        assert len(ran) == 2
+        return [
+            Task(1, "Read config", False, "read_file", {"file_path": "config.py"}),
+            Task(2, "Find uses", False, "grep", {"pattern": "load_config", "directory": "."}),
+        ]
+
+    async def analyze_results(*args, **kwargs):
+        return FeedbackResult(decision=FeedbackDecision.COMPLETE, summary="done")
+
+    monkeypatch.setattr(orchestrator.planner, "plan", plan)
+    monkeypatch.setattr(orchestrator.feedback_loop, "analyze_results", analyze_results)
+
+    with tempfile.TemporaryDirectory() as root:
+        monkeypatch.chdir(root)
+        open("config.py", "w").close()
+        results = await orchestrator.run(
+            "Refactor @config.py and every caller of 'load_config'", model="test"
+        )
+
+    assert [r.result.output for r in results] == ["speculative read_file", "speculative grep"]
+    assert orchestrator._speculation is None
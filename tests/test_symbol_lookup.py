@@ -0,0 +1,97 @@
+"""Tests for the find_symbol and find_references tools."""
+
+import os
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tunacode.core import code_index as code_index_module
+from tunacode.core.code_index import CodeIndex
+from tunacode.tools.symbol_lookup import find_references, find_symbol
+
+FILES = {
+    "app/server.py": "import os\n\nclass Server:\n    def start(self):\n        pass\n",
+    "app/main.py": "from app.server import Server\n\nServer().start()\n",
+    "web/client.ts": "export function start(): void {\n  return;\n}\n",
+}
+
+
+@pytest.fixture
+def indexed_repo(monkeypatch):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.realpath(tmp)
+        for rel_path, content in FILES.items():
+            path = Path(root) / rel_path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        index = CodeIndex(root, persist=False)
+        index.build_index()
+        code_index_module._shared_indexes[Path(root)] = index
+        monkeypatch.chdir(root)
+        try:
+            yield root
+        finally:
+            code_index_module._shared_indexes.pop(Path(root), None)
+
+
+@pytest.mark.asyncio
+async def test_find_symbol_returns_line_ranges(indexed_repo):
+    result = await find_symbol("start")
+    assert "Found 2 definition(s) of 'start':" in result
+    assert "app/server.py:4-5  method Server.start" in result
+    assert "web/client.ts:1-3  function start" in result
+
+    result = await find_symbol("Server.start")
+    assert "web/client.ts" not in result
+
+    assert "No definitions found" in await find_symbol("start", kind="class")
+
+
+@pytest.mark.asyncio
+async def test_find_references_skips_definitions(indexed_repo):
+    result = await find_references("Server")
+    assert "app/main.py:1: from app.server import Server" in result
+    assert "app/main.py:3: Server().start()" in result
+    assert "app/server.py:3" not in result
+
+    result = await find_references("os")
+    assert "Imported as a module by 1 file(s):" in result
+    assert "app/server.py" in result
+
+    assert "No references found" in await find_references("missing_name")
+
+
+@pytest.mark.asyncio
+async def test_lookups_see_edits_made_outside_the_tools(indexed_repo, monkeypatch):
+    assert "app/main.py:3" in await find_references("Server")
+    # Edit without the write tools or a watcher, once the refresh interval has passed
+    monkeypatch.setattr(code_index_module, "REFRESH_INTERVAL", 0.0)
+    server = Path(indexed_repo) / "app" / "server.py"
+    server.write_text(
+        "import os\n\n\ndef beta():\n    pass\n\n\nclass Server:\n"
+        "    def start(self):\n        beta()\n"
+    )
+    (Path(indexed_repo) / "app" / "extra.py").write_text("from app.server import Server\n")
+
+    result = await find_symbol("Server")
+    assert "app/server.py:8-10  class Server" in result
+    assert "app/server.py:4-5  function beta" in await find_symbol("beta")
+
+    result = await find_references("Server")
+    assert "app/extra.py:1: from app.server import Server" in result
+    # The moved definition is not reported as a use
+    assert "app/server.py:8" not in result
+    assert "app/server.py:10: beta()" in await find_references("beta")
+
+
+@pytest.mark.asyncio
+async def test_lookups_rescan_at_most_once_per_interval(indexed_repo):
+    index = code_index_module.get_code_index()
+    await find_symbol("start")
+    reused = index.get_stats()["files_reused"]
+
+    (Path(indexed_repo) / "app" / "late.py").write_text("def late():\n    pass\n")
+    # Within the interval the index answers without walking the tree again
+    assert "No definitions found" in await find_symbol("late")
+    assert index.get_stats()["files_reused"] == reused
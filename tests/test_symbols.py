@@ -0,0 +1,155 @@
+"""Tests for multi-language symbol extraction and CodeIndex definitions."""
+
+import tempfile
+from pathlib import Path
+
+from tunacode.core.code_index import CodeIndex
+from tunacode.core.symbols import Symbol, extract_symbols
+
+PYTHON_SOURCE = """import os
+from pkg.sub import thing
+
+class Server:
+    def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+def main():
+    def helper():
+        pass
+    return helper
+"""
+
+TS_SOURCE = """import { x } from "./x";
+
+export interface Options {
+  port: number;
+}
+
+export class Server {
+  private name = "a{";
+  start(opts: Options): void {
+    const s = "}";
+  }
+  stop() { return; }
+}
+
+export const handler = async (req) => {
+  return req;
+};
+
+function plain() {}
+"""
+
+GO_SOURCE = """package main
+
+type Server struct {
+	port int
+}
+
+func (s *Server) Start() error {
+	return nil
+}
+
+func main() {
+}
+"""
+
+RUST_SOURCE = """pub struct Point<'a> {
+    name: &'a str,
+}
+
+impl<'a> Point<'a> {
+    pub fn new(name: &'a str) -> Self {
+        Point { name }
+    }
+}
+
+pub trait Shape {
+    fn area(&self) -> f64;
+}
+
+fn main() {}
+"""
+
+
+def _summary(symbols):
+    return {(s.kind, s.qualname) for s in symbols}
+
+
+def test_python_symbols_have_qualnames_and_ranges():
+    symbols, imports = extract_symbols("a.py", PYTHON_SOURCE)
+    assert _summary(symbols) == {
+        ("class", "Server"),
+        ("method", "Server.start"),
+        ("method", "Server.stop"),
+        ("function", "main"),
+        ("function", "main.helper"),
+    }
+    server = next(s for s in symbols if s.qualname == "Server")
+    assert (server.line, server.end_line) == (4, 9)
+    assert imports == {"os", "pkg"}
+    assert Symbol.from_record(server.to_record()) == server
+
+
+def test_typescript_symbols_ignore_braces_in_strings():
+    symbols, _ = extract_symbols("a.ts", TS_SOURCE)
+    assert _summary(symbols) == {
+        ("interface", "Options"),
+        ("class", "Server"),
+        ("method", "Server.start"),
+        ("method", "Server.stop"),
+        ("function", "handler"),
+        ("function", "plain"),
+    }
+    server = next(s for s in symbols if s.qualname == "Server")
+    assert (server.line, server.end_line) == (7, 13)
+
+
+def test_go_and_rust_symbols():
+    go_symbols, _ = extract_symbols("main.go", GO_SOURCE)
+    assert _summary(go_symbols) == {
+        ("struct", "Server"),
+        ("method", "Server.Start"),
+        ("function", "main"),
+    }
+
+    rust_symbols, _ = extract_symbols("lib.rs", RUST_SOURCE)
+    assert _summary(rust_symbols) == {
+        ("struct", "Point"),
+        ("method", "Point.new"),
+        ("trait", "Shape"),
+        ("method", "Shape.area"),
+        ("function", "main"),
+    }
+
+
+def test_code_index_find_definitions_survives_cache_reload():
+    with tempfile.TemporaryDirectory() as repo:
+        root = Path(repo)
+        (root / "server.py").write_text(PYTHON_SOURCE)
+        (root / "web").mkdir()
+        (root / "web" / "server.ts").write_text(TS_SOURCE)
+
+        index = CodeIndex(repo)
+        index.build_index()
+        start = index.find_definitions("start")
+        assert [(str(path), s.qualname) for path, s in start] == [
+            ("server.py", "Server.start"),
+            ("web/server.ts", "Server.start"),
+        ]
+        assert [str(p) for p, _ in index.find_definitions("Server", kind="interface")] == []
+        assert index.lookup("Options") == [Path("web/server.ts")]
+
+        reloaded = CodeIndex(repo)
+        reloaded.build_index()
+        assert reloaded.get_stats()["files_reused"] == 2
+        assert reloaded.find_definitions("Server.stop") == index.find_definitions("Server.stop")
+        assert [s.name for s in reloaded.get_file_symbols("server.py")][:2] == ["Server", "start"]
+
+        # A rescan of an unchanged tree changes nothing, so the cache is not rewritten
+        assert reloaded.build_index(force=True) == set()
+        (root / "server.py").write_text(PYTHON_SOURCE + "\ndef extra():\n    pass\n")
+        assert reloaded.build_index(force=True) == {Path("server.py")}
@@ -0,0 +1,126 @@
+"""Tests for dependency-aware scheduling of orchestrator tasks."""
+
+import asyncio
+
+import pytest
+
+from tunacode.core.agents.planner_schema import Task
+from tunacode.core.agents.task_scheduler import build_task_graph, run_task_graph
+
+
+def _task(id, mutate, reads=(), writes=(), depends_on=()):
+    return Task(
+        id=id,
+        description=f"task {id}",
+        mutate=mutate,
+        reads=list(reads),
+        writes=list(writes),
+        depends_on=list(depends_on),
+    )
+
+
+def test_graph_orders_only_conflicting_tasks():
+    tasks = [
+        _task(1, False, reads=["src/a.py"]),
+        _task(2, True, reads=["src/a.py"], writes=["src/a.py"]),
+        _task(3, False, reads=["docs"]),
+        _task(4, True, writes=["src/b.py"]),
+        _task(5, False, reads=["src"]),
+        _task(6, True, writes=["tests/test_b.py"], depends_on=[4, 9]),
+        _task(7, True),
+    ]
+    assert build_task_graph(tasks) == {
+        0: set(),
+        1: {0},  # write after read of the same file
+        2: set(),  # read of an unrelated directory
+        3: set(),  # write to a different file
+        4: {1, 3},  # directory read waits for writes inside it
+        5: {3},  # declared dependency; unknown ids are ignored
+        6: {0, 1, 2, 3, 4, 5},  # undeclared writes are a barrier
+    }
+
+    # Reads with no declared paths keep their order around writes
+    undeclared = [_task(1, True, writes=["a.py"]), _task(2, False), _task(3, False)]
+    assert build_task_graph(undeclared) == {0: set(), 1: {0}, 2: {0}}
+
+
+@pytest.mark.asyncio
+async def test_disjoint_writes_overlap_within_limit():
+    tasks = [_task(i, True, writes=[f"f{i}.py"]) for i in range(1, 5)]
+    tasks.append(_task(5, False, reads=["f1.py", "f4.py"]))
+    active = 0
+    peak = 0
+    order = []
+
+    async def run(task):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        order.append(task.id)
+        return task.id * 10
+
+    results = await run_task_graph(tasks, run, max_parallel=3)
+    assert results == [10, 20, 30, 40, 50]
+    assert peak == 3
+    assert order[-1] == 5
+
+
+@pytest.mark.asyncio
+async def test_failure_cancels_running_tasks():
+    cancelled = []
+
+    async def run(task):
+        if task.id == 1:
+            raise RuntimeError("boom")
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(task.id)
+            raise
+
+    tasks = [_task(1, False, reads=["a"]), _task(2, False, reads=["b"])]
+    with pytest.raises(RuntimeError):
+        await run_task_graph(tasks, run, max_parallel=2)
+    assert cancelled == [2]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_writes_keep_separate_histories(monkeypatch):
+    from tunacode.core.agents import main as agent_main
+    from tunacode.core.agents.orchestrator import OrchestratorAgent
+    from tunacode.core.state import StateManager
+
+    state = StateManager()
+    state.session.messages.append("user: earlier turn")
+    seen = {}
+    active = peak = 0
+
+    async def process_request(model, message, state_manager):
+        nonlocal active, peak
+        seen[message] = list(state_manager.session.messages)
+        active += 1
+        peak = max(peak, active)
+        for step in range(3):
+            state_manager.session.messages.append(f"{message} step {step}")
+            await asyncio.sleep(0.01)
+        state_manager.session.total_cost += 0.5
+        active -= 1
+        return message
+
+    monkeypatch.setattr(agent_main, "get_or_create_agent", lambda *args: None)
+    monkeypatch.setattr(agent_main, "process_request", process_request)
+    orchestrator = OrchestratorAgent(state)
+    tasks = [_task(1, True, writes=["a.py"]), _task(2, True, writes=["b.py"])]
+    results = await run_task_graph(tasks, lambda t: orchestrator._run_sub_task(t, "model"), 2)
+
+    assert results == ["task 1", "task 2"] and peak == 2
+    # Neither write saw the other's messages, and the session gets both back whole
+    assert seen == {"task 1": ["user: earlier turn"], "task 2": ["user: earlier turn"]}
+    history = state.session.messages
+    assert history[0] == "user: earlier turn" and len(history) == 7
+    for name in ("task 1", "task 2"):
+        start = history.index(f"{name} step 0")
+        assert history[start : start + 3] == [f"{name} step {i}" for i in range(3)]
+    assert state.session.total_cost == 1.0
@@ -0,0 +1,125 @@
+"""Tests for per-node latency, token and cost telemetry."""
+
+import json
+import os
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+from pydantic_ai.usage import Usage
+
+from tunacode.core.telemetry import SessionTelemetry, compute_cost, timed_tool
+
+MODEL = "anthropic:claude-sonnet-4-20250514"
+
+
+class ModelRequestNode:
+    def __init__(self, usage):
+        self.model_response = SimpleNamespace(usage=usage)
+
+
+class CallToolsNode:
+    pass
+
+
+def test_model_nodes_record_tokens_and_cost():
+    session = SessionTelemetry()
+    usage = Usage(
+        request_tokens=2_000, response_tokens=500, details={"cache_read_input_tokens": 1_000}
+    )
+    with session.start_request(MODEL) as request:
+        metrics = request.record_node(ModelRequestNode(usage), 1)
+        request.record_node(CallToolsNode(), 2)
+
+    assert (metrics.input_tokens, metrics.output_tokens, metrics.cached_tokens) == (
+        2_000,
+        500,
+        1_000,
+    )
+    # 1000 uncached at $3, 1000 cached at $1.50 and 500 output at $15 per million
+    assert metrics.cost == pytest.approx((1_000 * 3.0 + 1_000 * 1.5 + 500 * 15.0) / 1_000_000)
+    assert metrics.model_call and not request.nodes[1].model_call
+    assert compute_cost("unknown:model", 1_000, 1_000, 0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_timed_tool_attributes_calls_to_next_node():
+    @timed_tool
+    async def read_file(path):
+        if path == "missing":
+            raise FileNotFoundError(path)
+        return "ok"
+
+    # Outside a request the wrapper is transparent
+    assert await read_file("a.py") == "ok"
+    assert read_file.__name__ == "read_file"
+
+    session = SessionTelemetry()
+    with session.start_request(MODEL) as request:
+        request.record_node(ModelRequestNode(Usage()), 1)
+        await read_file("a.py")
+        with pytest.raises(FileNotFoundError):
+            await read_file("missing")
+        node = request.record_node(CallToolsNode(), 2)
+
+    assert [(t.tool, t.error) for t in node.tools] == [("read_file", False), ("read_file", True)]
+    summary = session.summary()
+    assert summary["tools"]["read_file"]["calls"] == 2
+    assert summary["tools"]["read_file"]["errors"] == 1
+    assert summary["requests"] == 1 and summary["model_calls"] == 1
+
+
+def test_export_jsonl_appends_one_line_per_node():
+    session = SessionTelemetry()
+    for _ in range(2):
+        with session.start_request(MODEL) as request:
+            request.record_node(ModelRequestNode(Usage(request_tokens=10, response_tokens=5)), 1)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, "telemetry.jsonl")
+        session.export_jsonl(path, session.requests[-1])
+        session.export_jsonl(path)
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+
+    assert [row["request_id"] for row in rows] == [2, 1, 2]
+    assert rows[0]["input_tokens"] == 10 and rows[0]["model"] == MODEL
+
+
+@pytest.mark.asyncio
+async def test_failed_request_keeps_its_metrics(monkeypatch):
+    from pathlib import Path
+
+    from tunacode.core.agents import main as agent_main
+    from tunacode.core.state import StateManager
+    from tunacode.utils import system
+
+    class FailingRun:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def __aiter__(self):
+            node = ModelRequestNode(Usage(request_tokens=1_000, response_tokens=100))
+            node.model_response.parts = []
+            yield node
+            raise RuntimeError("provider error")
+
+    class FailingAgent:
+        def iter(self, message, message_history=None):
+            return FailingRun()
+
+    state = StateManager()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        monkeypatch.setattr(system, "get_session_dir", lambda _: Path(tmpdir))
+        monkeypatch.setattr(agent_main, "get_or_create_agent", lambda *_: FailingAgent())
+        with pytest.raises(RuntimeError):
+            await agent_main.process_request(MODEL, "hello", state)
+
+        with open(os.path.join(tmpdir, "telemetry.jsonl"), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+
+    assert [row["input_tokens"] for row in rows] == [1_000]
+    assert state.session.total_cost == pytest.approx((1_000 * 3.0 + 100 * 15.0) / 1_000_000)
@@ -0,0 +1,43 @@
+"""Tests for tokenizer-backed token accounting."""
+
+from pydantic_ai.messages import ModelRequest, ModelResponse, TextPart, UserPromptPart
+
+from tunacode.utils import token_counter
+from tunacode.utils.token_counter import (DEFAULT_CONTEXT_WINDOW, MessageTokenCache,
+                                          RegexBPETokenizer, count_message_tokens,
+                                          get_context_window)
+
+
+def test_fallback_tokenizer_is_close_to_bpe_counts():
+    tokenizer = RegexBPETokenizer()
+    # cl100k_base encodes these as 8 and 15 tokens respectively
+    assert tokenizer.count("Hello world, this is a test.") == 8
+    assert 12 <= tokenizer.count("def get_or_create_agent(model, state_manager):\n    return x\n") <= 18
+    assert tokenizer.count("") == 0
+
+
+def test_message_cache_is_keyed_by_identity():
+    cache = MessageTokenCache(maxsize=2)
+    first = ModelRequest(parts=[UserPromptPart(content="read the config file")])
+    second = ModelResponse(parts=[TextPart(content="Sure, reading it now.")])
+
+    count = cache.count(first)
+    assert cache.count(first) == count
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Equal content in a different object is counted separately
+    cache.count(ModelRequest(parts=[UserPromptPart(content="read the config file")]))
+    cache.count(second)
+    assert len(cache._entries) == 2
+    cache.count(first)
+    assert cache.misses == 4  # first was evicted by the LRU bound
+
+
+def test_history_count_and_context_window():
+    history = [
+        ModelRequest(parts=[UserPromptPart(content="hello")]),
+        {"thought": "plain dict entries are counted too"},
+    ]
+    assert count_message_tokens(history) > 2 * token_counter.MESSAGE_OVERHEAD_TOKENS
+    assert get_context_window("anthropic:claude-sonnet-4-20250514") == 200_000
+    assert get_context_window("unknown:model") == DEFAULT_CONTEXT_WINDOW
@@ -0,0 +1,91 @@
+"""Tests for ordering tool execution within one response."""
+
+import asyncio
+
+import pytest
+
+from tunacode.core.agents.tool_scheduler import ToolGate
+
+
+def _tools(gate, events, delay=0.01):
+    async def read_file(arg):
+        events.append(("start", arg))
+        await asyncio.sleep(delay)
+        events.append(("end", arg))
+        return f"read {arg}"
+
+    async def write_file(arg):
+        events.append(("start", arg))
+        await asyncio.sleep(delay)
+        events.append(("end", arg))
+        return f"wrote {arg}"
+
+    return gate.wrap(read_file), gate.wrap(write_file)
+
+
+def _peak(events):
+    running = peak = 0
+    for kind, _ in events:
+        running += 1 if kind == "start" else -1
+        peak = max(peak, running)
+    return peak
+
+
+@pytest.mark.asyncio
+async def test_reads_overlap_up_to_the_bound():
+    events = []
+    read, _ = _tools(ToolGate(max_parallel=3), events)
+
+    # Tasks started together, as pydantic-ai does for one response
+    results = await asyncio.gather(*[asyncio.create_task(read(i)) for i in range(6)])
+
+    assert results == [f"read {i}" for i in range(6)]
+    assert _peak(events) == 3
+
+
+@pytest.mark.asyncio
+async def test_writes_wait_for_earlier_calls_and_keep_their_order():
+    events = []
+    read, write = _tools(ToolGate(), events)
+
+    calls = [read(0), read(1), write(2), read(3), write(4), write(5), read(6)]
+    await asyncio.gather(*[asyncio.create_task(call) for call in calls])
+
+    order = [arg for _, arg in events]
+    # Each write runs alone, after everything issued before it
+    for arg in (2, 4, 5):
+        start = events.index(("start", arg))
+        assert events[start + 1] == ("end", arg)
+        assert all(earlier in order[:start] for earlier in range(arg))
+    # Reads between writes still overlap each other
+    assert _peak(events[:4]) == 2
+    assert order.index(6) > order.index(5)
+
+
+@pytest.mark.asyncio
+async def test_failed_write_releases_later_calls():
+    events = []
+    gate = ToolGate()
+    read, _ = _tools(gate, events)
+
+    async def write_file(arg):
+        raise RuntimeError("boom")
+
+    write = gate.wrap(write_file)
+    results = await asyncio.gather(
+        asyncio.create_task(write(0)), asyncio.create_task(read(1)), return_exceptions=True
+    )
+
+    assert isinstance(results[0], RuntimeError)
+    assert results[1] == "read 1"
+
+
+def test_wrapped_tools_keep_their_schema():
+    from pydantic_ai import Tool
+
+    from tunacode.core.telemetry import timed_tool
+    from tunacode.tools.read_file import read_file
+
+    tool = Tool(ToolGate().wrap(timed_tool(read_file)))
+    assert tool.name == "read_file"
+    assert "filepath" in tool._base_parameters_json_schema["properties"]
@@ -0,0 +1,131 @@
+"""Tests for the trigram index used to narrow grep candidates."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from tunacode.core.trigram_index import TrigramIndex, build_query
+
+
+def _make_repo(root: Path) -> None:
+    (root / "src").mkdir()
+    (root / "src" / "auth.py").write_text("def login(user):\n    return check_password(user)\n")
+    (root / "src" / "views.py").write_text("def render(request):\n    return template\n")
+    (root / "README.md").write_text("Call login() before render().\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("function login() {}\n")
+
+
+def test_build_query_extracts_required_literals():
+    """Regexes reduce to the literals every match must contain."""
+    assert build_query("login", use_regex=False) == "login"
+    assert build_query("ab", use_regex=False) is None
+    assert build_query(r"def\s+login", use_regex=True) == ("and", ["def", "login"])
+    assert build_query(r"(login|render)\(", use_regex=True) == ("or", ["login", "render"])
+    # Optional or unbounded-zero parts cannot narrow the search
+    assert build_query(r"(foo)?\w+", use_regex=True) is None
+    assert build_query(r"\blogin\b", use_regex=True) == "login"
+
+
+def test_candidates_are_narrowed_and_case_insensitive():
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(Path(repo))
+        index = TrigramIndex(repo, exclude_dirs={"node_modules"})
+        index.build()
+
+        assert index.candidates("check_password") == ["src/auth.py"]
+        assert index.candidates("LOGIN") == ["README.md", "src/auth.py"]
+        assert index.candidates(r"def\s+(login|render)", use_regex=True) == [
+            "src/auth.py",
+            "src/views.py",
+        ]
+        assert index.candidates("nonexistent_symbol") == []
+        assert index.candidates(".*", use_regex=True) is None
+
+
+def test_update_and_remove_file():
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(Path(repo))
+        index = TrigramIndex(repo)
+        index.build()
+
+        Path(repo, "src", "views.py").write_text("def logout():\n    pass\n")
+        index.update_file("src/views.py")
+        assert index.candidates("logout") == ["src/views.py"]
+        assert "src/views.py" not in index.candidates("render")
+
+        index.remove_file("src/auth.py")
+        assert index.candidates("check_password") == []
+
+
+def test_sync_picks_up_edits_made_outside_the_index():
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(Path(repo))
+        index = TrigramIndex(repo)
+        index.build()
+        assert index.sync() == 0
+
+        Path(repo, "src", "views.py").write_text("def logout():\n    pass\n")
+        Path(repo, "src", "new.py").write_text("def zebra_unique():\n    pass\n")
+        Path(repo, "src", "auth.py").unlink()
+        assert index.sync() == 3
+        assert index.candidates("logout") == ["src/views.py"]
+        assert index.candidates("zebra_unique") == ["src/new.py"]
+        assert index.candidates("check_password") == []
+
+
+@pytest.mark.asyncio
+async def test_grep_indexed_strategy(monkeypatch):
+    from tunacode.core import code_index
+    from tunacode.tools.grep import grep
+
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(Path(repo))
+        monkeypatch.chdir(repo)
+        monkeypatch.setattr(code_index, "_shared_indexes", {})
+
+        result = await grep("check_password", ".", search_type="indexed")
+        assert "auth.py" in result
+        assert "Strategy: indexed" in result
+        assert "Candidates: 1 files" in result
+
+        # Without a watcher, smart mode does not trust the index
+        Path(repo, "src", "new.py").write_text("def render_more():\n    pass\n")
+        result = await grep("render", ".")
+        assert "Strategy: indexed" not in result
+        assert "new.py" in result
+
+        # An indexed search checks the index for outside edits first
+        result = await grep("render_more", ".", search_type="indexed")
+        assert "Strategy: indexed" in result
+        assert "new.py" in result
+
+
+@pytest.mark.asyncio
+async def test_write_tools_update_the_index(monkeypatch):
+    from tunacode.core import code_index
+    from tunacode.tools.grep import grep
+    from tunacode.tools.update_file import update_file
+    from tunacode.tools.write_file import write_file
+
+    with tempfile.TemporaryDirectory() as repo:
+        _make_repo(Path(repo))
+        monkeypatch.chdir(repo)
+        monkeypatch.setattr(code_index, "_shared_indexes", {})
+
+        await grep("check_password", ".", search_type="indexed")
+        await write_file("src/new.py", "def zebra_unique():\n    pass\n")
+        await update_file("src/auth.py", "check_password", "omega_unique")
+
+        # The writes reached the index without a watcher or a sync
+        trigram_index = code_index.get_code_index().get_trigram_index(build=False)
+        assert trigram_index.candidates("zebra_unique") == ["src/new.py"]
+        assert trigram_index.candidates("omega_unique") == ["src/auth.py"]
+        assert trigram_index.sync() == 0
+
+        for word in ("zebra_unique", "omega_unique"):
+            result = await grep(word, ".", search_type="indexed")
+            assert "Strategy: indexed" in result
+            assert "No matches found" not in result
+        assert "No matches found" in await grep("check_password", ".", search_type="indexed")
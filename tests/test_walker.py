@@ -0,0 +1,95 @@
+"""Tests for the parallel directory walker and the grep search that streams from it."""
+
+import asyncio
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from tunacode.tools.grep import ParallelGrep
+from tunacode.utils.ignore import IgnoreMatcher
+from tunacode.utils.walker import WALK_WORKERS, async_walk, parallel_walk
+
+
+def _touch(root, rel_path, content=""):
+    path = os.path.join(root, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_parallel_walk_prunes_and_stats():
+    with tempfile.TemporaryDirectory() as root:
+        _touch(root, ".gitignore", "build/\n*.log\n")
+        _touch(root, "a.py", "x = 1\n")
+        _touch(root, "pkg/deep/b.py")
+        _touch(root, "pkg/app.log")
+        _touch(root, "build/out.py")
+
+        entries = list(parallel_walk(root, ignore=IgnoreMatcher(root), max_workers=4))
+        by_rel = {entry.rel_path: entry for entry in entries}
+        assert set(by_rel) == {".gitignore", "a.py", "pkg/deep/b.py"}
+        assert by_rel["a.py"].size == 6
+        assert by_rel["pkg/deep/b.py"].path == os.path.join(root, "pkg", "deep", "b.py")
+
+        # Relative paths stay rooted at the matcher when walking a subdirectory
+        sub = list(parallel_walk(os.path.join(root, "pkg"), ignore=IgnoreMatcher(root)))
+        assert [entry.rel_path for entry in sub] == ["pkg/deep/b.py"]
+
+        shallow = list(parallel_walk(root, max_depth=0))
+        assert {entry.rel_path for entry in shallow} == {".gitignore", "a.py"}
+
+
+def test_parallel_walk_stats_only_on_request_and_reuses_threads():
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(20):
+            _touch(root, f"d{i % 4}/f{i}.txt", "abc")
+
+        entries = list(parallel_walk(root))
+        assert len(entries) == 20
+        assert all(entry.stat is None for entry in entries)
+        # Sizes are still available, statted on demand
+        assert entries[0].size == 3
+
+        statted = list(parallel_walk(root, with_stat=True, max_workers=2))
+        assert all(entry.stat is not None and entry.stat.st_size == 3 for entry in statted)
+
+        for _ in range(5):
+            assert len(list(parallel_walk(root))) == 20
+        walk_threads = [t for t in threading.enumerate() if t.name.startswith("walk")]
+        assert 0 < len(walk_threads) <= WALK_WORKERS
+
+
+def test_async_walk_batches_and_early_exit():
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(25):
+            _touch(root, f"d{i % 5}/f{i}.txt")
+
+        async def collect(limit=None):
+            seen = []
+            async for batch in async_walk(root, batch_size=4):
+                assert 0 < len(batch) <= 4
+                seen.extend(batch)
+                if limit and len(seen) >= limit:
+                    break
+            return seen
+
+        assert len(asyncio.run(collect())) == 25
+        assert len(asyncio.run(collect(limit=4))) == 4
+
+
+def test_grep_searches_while_walking():
+    with tempfile.TemporaryDirectory() as root:
+        _touch(root, "src/one.py", "def target():\n    pass\n")
+        _touch(root, "src/two.py", "nothing here\n")
+        _touch(root, "node_modules/dep/index.py", "def target():\n")
+
+        grep = ParallelGrep()
+        # Without ripgrep, smart mode streams into the Python search
+        with patch("tunacode.tools.grep.shutil.which", return_value=None):
+            output = asyncio.run(
+                grep._execute("target", directory=root, include_files="*.py", search_type="smart")
+            )
+        assert "Strategy: python" in output
+        assert "Candidates: 2 files" in output
+        assert "one.py" in output and "node_modules" not in output